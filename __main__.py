@@ -11,51 +11,230 @@
 #           X <- x coordinate of robot
 #           Y <- y coordinate of robot
 #           DIRECTION <- either of the four directions that the robot faces
-# 2. MOVE
+# 2. MOVE [N]
+#           N <- number of steps to move (1 if not given)
 # 3. LEFT
 # 4. RIGHT
 # 5. REPORT
-# 6. TRAVEL <X,Y>
+# 6. TRAVEL <X,Y> [X,Y ...]
 #           X <- x coordinate of destination
 #           Y <- y coordinate of destination
+#           (the paths to several destinations are found by one search)
+# 7. BLOCK <X,Y>
+#           X, Y <- co-ordinates of the pothole to add
+# 8. UNBLOCK <X,Y>
+#           X, Y <- co-ordinates of the pothole to remove
+# 9. STATS (with --stats)
+# 10. NEAREST <X,Y> [X,Y ...]
+#           path to the nearest of the destinations
 #
 
 from simulator import Simulator
+from stream import readLines, readStream
+from sinks import SINKS
+from batch import expandPatterns, runBatch
+from server import serve
+from stats import Stats
+from checkpoint import replay
+from binlog import isBinaryLog, readRecords, BinaryLogError
+from mapfile import loadMap, MapFormatError
+from robo import Grid
+from fleet import Fleet
+import asyncio
+import json
 import argparse
+import constants
+import sys
 
 def main():
     """
     Main function of the program.
     if --inputfile is provided then the commands are read and run from the file
-    otherwise the code is run in interactive mode until 'exit' is entered from the standard input.
+    otherwise the commands are read from the standard input until 'exit' is entered or the input ends.
+    In both cases the commands are read lazily, one line at a time.
+    Results are written through an output sink, in batches of --flush-every records.
+    Commands are compiled and run in chunks of constants.PROGRAM_CHUNK lines (one line at a time
+    when a user is typing them).
+    if --batch is provided then every file matching the given paths or glob patterns is run with its
+    own simulator on a pool of --workers processes, and the results are written file by file.
+    if --serve or --socket is provided then the program serves sessions over a TCP or Unix socket,
+    each connection with its own simulator.
+    if --stats or --stats-file is provided then the commands are counted and timed; the statistics are
+    returned by the STATS command and written as JSON to the --stats-file at exit.
+    if --checkpoint is provided then the replay of the --inputfile is checkpointed every --checkpoint-every
+    lines; --resume carries on from the latest checkpoint and --seek starts at a given line.
+    if --result-codes is provided then rejected commands are only counted, without raising exceptions,
+    and their counts are written as JSON to standard error at exit.
+    if --map is provided then the dimensions and the potholes of the table are read from the map file
+    (ASCII grid or binary PGM image, see mapfile.py) instead of being taken from constants.py.
+    if --grid-cache is provided then the indexes of the table are read from the cache directory, or
+    computed and saved there for the next runs.
+    if --fleet is provided then the commands are run on a fleet of that many robots sharing the table
+    (see fleet.py), either on every robot or on the robot whose number prefixes the command.
+    An --inputfile in the binary log format (see binlog.py) is recognised and run without text parsing.
     """
-    simulator = Simulator()
-
     parser = argparse.ArgumentParser()
-    parser.add_argument("--inputfile", help="Filepath of tweets")
+    parser.add_argument("--inputfile", help="Filepath of commands")
+    parser.add_argument("--no-mmap", action="store_true",
+                        help="Read the input file through a buffered reader instead of memory mapping it")
+    parser.add_argument("--batch", nargs="+", metavar="PATTERN",
+                        help="Filepaths or glob patterns of command files to run in parallel")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of processes running the batch (number of CPUs by default)")
+    parser.add_argument("--timeout", type=float, default=constants.BATCH_TIMEOUT,
+                        help="Seconds a file of the batch may run before its process is terminated")
+    parser.add_argument("--serve", metavar="HOST:PORT",
+                        help="Serve sessions over TCP on the given address")
+    parser.add_argument("--socket", metavar="PATH",
+                        help="Serve sessions over a Unix socket at the given path")
+    parser.add_argument("--search", choices=constants.SEARCHES, default=constants.SEARCH_BFS,
+                        help="Search used by TRAVEL (hpa: hierarchical search for large tables, "
+                             "jps: jump point search, shortest paths with fewer expansions on open tables)")
+    parser.add_argument("--cluster-size", type=int, default=constants.HPA_CLUSTER_SIZE,
+                        help="Width and height of the clusters of the hierarchical search")
+    parser.add_argument("--format", choices=sorted(SINKS), default="text",
+                        help="Output format of the results")
+    parser.add_argument("--flush-every", type=int, default=None,
+                        help="Number of results buffered before they are written out")
+    parser.add_argument("--map", metavar="FILE",
+                        help="Map file of the table (ASCII grid of '.' and '#', or binary PGM image)")
+    parser.add_argument("--grid-cache", metavar="DIR",
+                        help="Directory of the cached tables and indexes, read at start up instead of computing them")
+    parser.add_argument("--stats", action="store_true",
+                        help="Collect statistics of the commands, returned by the STATS command")
+    parser.add_argument("--stats-file", metavar="FILE",
+                        help="Collect statistics of the commands and write them as JSON to FILE at exit")
+    parser.add_argument("--result-codes", action="store_true",
+                        help="Count rejected commands by status instead of reporting each of them")
+    parser.add_argument("--checkpoint", metavar="FILE",
+                        help="Write checkpoints of the replay of the input file to FILE")
+    parser.add_argument("--checkpoint-every", type=int, default=constants.CHECKPOINT_EVERY,
+                        help="Number of lines between two checkpoints")
+    parser.add_argument("--resume", action="store_true",
+                        help="Resume the replay of the input file from the latest checkpoint")
+    parser.add_argument("--seek", type=int, metavar="LINE",
+                        help="Start the replay of the input file at LINE (counted from 0), from the nearest checkpoint")
+    parser.add_argument("--fleet", type=int, metavar="N",
+                        help="Run the commands on a fleet of N robots sharing the table")
     args = parser.parse_args()
+    if (args.checkpoint or args.resume or args.seek is not None) and (not args.inputfile or args.no_mmap):
+        parser.error("--checkpoint, --resume and --seek need a memory mapped --inputfile")
+    if args.resume and not args.checkpoint:
+        parser.error("--resume needs --checkpoint")
+    binary = args.inputfile is not None and isBinaryLog(args.inputfile)
+    if binary and (args.checkpoint or args.seek is not None):
+        parser.error("--checkpoint and --seek need a text --inputfile")
+    if args.fleet is not None and (args.fleet <= 0 or binary or args.batch or args.serve or args.socket
+                                   or args.checkpoint or args.seek is not None):
+        parser.error("--fleet needs a positive number of robots and a text --inputfile or the standard input")
+    if args.stats_file and (args.batch or args.serve or args.socket):
+        parser.error("--stats-file needs a single simulator, use --stats with --batch, --serve and --socket")
+    # settings of every simulator, whatever the mode
+    settings = {"search": args.search, "cluster_size": args.cluster_size, "strict": not args.result_codes}
+    table = {}
+    if args.map:
+        # the map is read at start up so that a malformed map is reported at once
+        try:
+            width, height, cells = loadMap(args.map)
+        except (OSError, MapFormatError) as e:
+            parser.error(args.map + ": " + str(e))
+        table = {"width": width, "height": height, "potholes": []}
+    if args.serve or args.socket:
+        host, port = None, None
+        if args.serve:
+            host, _, port = args.serve.rpartition(":")
+            port = int(port)
+        try:
+            if args.map:
+                # the table and its indexes are built once and shared by the sessions, each of which
+                # copies them on its first BLOCK or UNBLOCK
+                layout = Grid(width, height, [], cells, args.grid_cache)
+                layout.rayTables()
+                table["layout"] = layout
+            def factory():
+                # every session has its own statistics
+                return Simulator(**table, **settings, stats=Stats() if args.stats else None)
+            asyncio.run(serve(host or None, port, args.socket, factory, format=args.format))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    flush_every = args.flush_every
+    if flush_every is None:
+        # results are written right away when a user is typing the commands
+        flush_every = 1 if not args.inputfile and sys.stdin.isatty() else 1024
+    sink = SINKS[args.format](sys.stdout, flush_every)
+    if args.batch:
+        rejected = {}
+        try:
+            filepaths = expandPatterns(args.batch)
+            for filepath, output, error in runBatch(filepaths, args.workers, args.format, not args.no_mmap,
+                                                    args.timeout, args.map, settings, args.stats, rejected):
+                sink.begin(filepath)
+                if error is not None: sink.error(error)
+                else: sink.extend(output)
+                # every file is written out as soon as it is reported, not held back by the next ones
+                sink.flush()
+        finally:
+            sink.close()
+            if args.result_codes:
+                # the rejected commands of all the files that finished
+                print(json.dumps({"rejected": rejected}), file=sys.stderr)
+        return
+
+    if args.map: table["cells"] = cells
+    if args.fleet:
+        fleet = Fleet(Simulator(**table, grid_cache=args.grid_cache).command, args.fleet)
+        if not args.inputfile: cmd_list = readStream(sys.stdin)
+        else: cmd_list = readLines(args.inputfile, use_mmap=not args.no_mmap)
+        try:
+            for line in cmd_list:
+                try:
+                    for result in fleet.simulate(line): sink.write(result)
+                except Exception as e:
+                    sink.error(e)
+        finally:
+            sink.close()
+        return
+
+    stats = Stats() if args.stats or args.stats_file else None
+    simulator = Simulator(**table, **settings, stats=stats, grid_cache=args.grid_cache)
+    if simulator.command.hierarchy is not None:
+        # report the cost of precomputing the hierarchy
+        print(json.dumps(simulator.command.hierarchy.stats()), file=sys.stderr)
+    chunk = constants.PROGRAM_CHUNK
     if (not args.inputfile):
-        # interactive mode
-        clip = input()
-        while("exit" != clip.lower()):
-            try :
-                # each command is simulated throught the simulator instance
-                simulator.simulate(clip)
-            except Exception as e:
-                print(e)
-            clip = input()
+        # interactive mode, or commands piped through the standard input
+        cmd_list = readStream(sys.stdin)
+        if sys.stdin.isatty(): chunk = 1
     else: 
         # non-interactive mode
-        file = open(args.inputfile, 'r')
-        cmd_list = file.readlines()
-        
-        # Strips the newline character
-        for cmd in cmd_list:
-            try :
-                # each command from the file is simulated throught the simulator instance
-                simulator.simulate(cmd)
-            except Exception as e:
-                print(e)
+        if binary:
+            # the header is checked here, so that a corrupt log or one for another table is reported at once
+            try:
+                cmd_list = readRecords(args.inputfile, simulator.command.width, simulator.command.height)
+            except BinaryLogError as e:
+                parser.error(args.inputfile + ": " + str(e))
+        else:
+            cmd_list = readLines(args.inputfile, use_mmap=not args.no_mmap, decode=False)
+
+    try:
+        if args.checkpoint or args.seek is not None:
+            # the input file is replayed from a byte offset, with checkpoints
+            replay(simulator, args.inputfile, sink, args.checkpoint, args.checkpoint_every,
+                   args.resume, args.seek)
+        else:
+            # each chunk of commands is compiled and run throught the simulator instance
+            simulator.runLines(cmd_list, sink, chunk)
+    except BinaryLogError as e:
+        # a binary log that breaks off in the middle of a record
+        parser.error(args.inputfile + ": " + str(e))
+    finally:
+        sink.close()
+        if args.stats_file:
+            stats.dump(args.stats_file, {"path_cache": simulator.command.pathCache.stats()})
+        if args.result_codes:
+            print(json.dumps({"rejected": simulator.rejections()}), file=sys.stderr)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,137 @@
+# batch.py
+# ------------------------------
+# Author: Ankita Dhar <githubid: ankitadhar>
+#
+# Batch mode: many independent command files are run in parallel, each file in its own process with
+# its own Simulator, and their results are handed back in the order the files were given. At most
+# workers processes run at a time, a new one starting as soon as another finishes; the process of a file
+# that times out is terminated.
+
+from glob import glob
+from itertools import islice
+from multiprocessing.connection import wait
+import io
+import multiprocessing
+import os
+import time
+from simulator import Simulator
+from stats import Stats
+from sinks import SINKS
+from stream import readLines
+from mapfile import loadMap
+import constants
+
+def expandPatterns(patterns):
+    """
+    returns the files matching a list of paths or glob patterns, in the order of the patterns
+    (files matching a pattern are sorted); patterns matching nothing are kept as they are so that
+    the missing file is reported.
+    """
+    filepaths = []
+    for pattern in patterns:
+        matches = sorted(glob(pattern))
+        filepaths.extend(matches if matches else [pattern])
+    return filepaths
+
+def runFile(filepath, format="text", use_mmap=True, map_path=None, settings=None, stats=False, rejected=None):
+    """
+    runs all the commands of one file on a new Simulator and returns the formatted results as a string.
+    The simulator is created on the table of the map file map_path if given, with the keyword arguments
+    settings (e.g. search or strict) and with its own statistics if stats is set. In result code mode
+    the numbers of rejected commands are added, by name of the status code, to the dictionary rejected.
+    """
+    output = io.StringIO()
+    sink = SINKS[format](output, flush_every=1024)
+    table = {}
+    if map_path is not None:
+        width, height, cells = loadMap(map_path)
+        table = {"width": width, "height": height, "potholes": [], "cells": cells}
+    simulator = Simulator(**table, **(settings or {}), stats=Stats() if stats else None)
+    simulator.runLines(readLines(filepath, use_mmap, decode=False), sink)
+    sink.close()
+    if rejected is not None: _addCounts(rejected, simulator.rejections())
+    return output.getvalue()
+
+def _addCounts(counts, more):
+    """
+    adds the counts of the dictionary more to those of counts
+    """
+    for name, count in more.items():
+        counts[name] = counts.get(name, 0) + count
+
+def _runProcess(connection, filepath, format, use_mmap, map_path, settings, stats):
+    """
+    runs one file in a worker process and sends its (output, error, rejected) triple back through connection
+    """
+    rejected = {}
+    try:
+        result = (runFile(filepath, format, use_mmap, map_path, settings, stats, rejected), None, rejected)
+    except Exception as e:
+        result = (None, e, rejected)
+    try:
+        connection.send(result)
+    finally:
+        connection.close()
+
+def runBatch(filepaths, workers=None, format="text", use_mmap=True, timeout=constants.BATCH_TIMEOUT, map_path=None,
+             settings=None, stats=False, rejected=None):
+    """
+    runs the command files in up to workers processes at a time and yields (filepath, output, error) for
+    each file in the order of filepaths. The processes are waited on all together, and the slot of a
+    process that finishes is given to the next file at once; results that finish ahead of their turn are
+    kept until the files before them are yielded. Files are run independently: one that fails yields its
+    exception as error, and one that takes more than timeout seconds (counted from the start of its
+    process, None for no limit) yields a TimeoutError and its process is terminated, while the other files
+    keep running. Every file is run as by runFile, with the map file map_path, the settings and stats;
+    the commands rejected by the files that finish are counted in the dictionary rejected if given.
+    """
+    workers = workers or os.cpu_count() or 1
+    remaining = enumerate(filepaths)
+    # (number, filepath, process, deadline) of the files running, by connection
+    running = {}
+    # (filepath, output, error) of the files finished and not yielded yet, by number
+    finished = {}
+    reported = 0
+
+    def start(number, filepath):
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=_runProcess, daemon=True,
+                                          args=(sender, filepath, format, use_mmap, map_path, settings, stats))
+        process.start()
+        sender.close()
+        running[receiver] = (number, filepath, process, None if timeout is None else time.monotonic() + timeout)
+
+    def finish(receiver, output, error, counts):
+        number, filepath, process, _ = running.pop(receiver)
+        receiver.close()
+        process.join()
+        if rejected is not None: _addCounts(rejected, counts)
+        finished[number] = (filepath, output, error)
+
+    try:
+        while True:
+            for number, filepath in islice(remaining, workers - len(running)): start(number, filepath)
+            while reported in finished:
+                yield finished.pop(reported)
+                reported += 1
+            if not running: break
+            wait_for = None
+            if timeout is not None:
+                wait_for = max(0, min(deadline for _, _, _, deadline in running.values()) - time.monotonic())
+            for receiver in wait(list(running), wait_for):
+                try:
+                    output, error, counts = receiver.recv()
+                except EOFError:
+                    # the worker died without sending its result
+                    output, error, counts = None, RuntimeError(running[receiver][1] + ": worker exited unexpectedly."), {}
+                finish(receiver, output, error, counts)
+            now = time.monotonic()
+            for receiver, (_, filepath, process, deadline) in list(running.items()):
+                if deadline is not None and deadline <= now:
+                    process.terminate()
+                    finish(receiver, None, TimeoutError(filepath + ": timed out."), {})
+    finally:
+        for receiver, (_, _, process, _) in running.items():
+            process.terminate()
+            process.join()
+            receiver.close()
@@ -0,0 +1,270 @@
+# benchmark.py
+# ------------------------------
+# Author: Ankita Dhar <githubid: ankitadhar>
+#
+# Benchmark suite of the simulator. It measures
+#   - command parsing throughput (Simulator.extractCmd, and Simulator.compile of strings and of bytes)
+#   - MOVE/LEFT/RIGHT throughput (Simulator.simulate and compiled programs)
+#   - TRAVEL latency over table sizes, pothole densities and searches
+#   - memory used by the table and its indexes (tracemalloc)
+# and writes the results as JSON. Tables and commands are generated from a fixed seed, so two runs
+# measure the same work. Every timing is measured --repeat times in each of --rounds passes over the
+# suite, so that the measurements are spread over the whole run: the best one is kept, along with its
+# spread (how much slower the slowest run was, as a fraction of the best one). --compare reports the
+# timings that got slower than a previous result file by more than the tolerance and the spreads.
+#
+# python benchmark.py --output bench.json
+# python benchmark.py --sizes 5 100 1000 10000 --densities 0 0.1 0.2 0.4 --compare bench.json
+
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from robo import Grid
+from simulator import Simulator
+import constants
+
+def randomCells(width, height, density, rng):
+    """
+    returns the cells of a table where each cell is a pothole with probability density
+    """
+    threshold = int(density * 256)
+    table = bytes(1 if value < threshold else 0 for value in range(256))
+    return bytearray(rng.randbytes(width * height).translate(table))
+
+def randomCommands(count, rng, width=constants.GRID_WIDTH, height=constants.GRID_HEIGHT):
+    """
+    returns count random command lines, mostly MOVE/LEFT/RIGHT with some PLACE and REPORT
+    """
+    lines = []
+    for _ in range(count):
+        r = rng.random()
+        if r < 0.05:
+            lines.append("PLACE %d,%d,%s" % (rng.randrange(width), rng.randrange(height),
+                                             rng.choice(constants.DIRECTIONS)))
+        elif r < 0.10:
+            lines.append("REPORT")
+        else:
+            lines.append(rng.choice(("MOVE", "MOVE", "LEFT", "RIGHT")))
+    return lines
+
+def rate(count, seconds):
+    return count / seconds if seconds > 0 else float('inf')
+
+def measure(function, repeat, setup=None):
+    """
+    runs function repeat times (on a new value returned by setup each time, if given) and returns the
+    best duration in seconds and its spread: how much longer the slowest run took, as a fraction of the best
+    """
+    durations = []
+    for _ in range(repeat):
+        value = setup() if setup is not None else None
+        # as timeit does, the garbage collector does not run in the middle of a measurement
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            function(value)
+            durations.append(time.perf_counter() - started)
+        finally:
+            if collecting: gc.enable()
+    best = min(durations)
+    return best, (max(durations) - best) / best if best > 0 else 0.0
+
+def rates(name, count, function, repeat, setup=None):
+    """
+    returns the best rate of function (count items per run) and its spread, keyed by name
+    """
+    best, spread = measure(function, repeat, setup)
+    return {name: rate(count, best), name + "_spread": spread}
+
+def benchParse(lines, repeat):
+    simulator = Simulator()
+    encoded = [line.encode('utf-8') for line in lines]
+    def extract(_):
+        for line in lines:
+            simulator.extractCmd(line)
+    result = {"lines": len(lines)}
+    result.update(rates("extract_lines_per_second", len(lines), extract, repeat))
+    result.update(rates("compile_lines_per_second", len(lines), lambda _: simulator.compile(lines), repeat))
+    result.update(rates("compile_bytes_lines_per_second", len(lines), lambda _: simulator.compile(encoded), repeat))
+    return result
+
+def benchMove(lines, repeat):
+    def simulate(simulator):
+        for line in lines:
+            try:
+                simulator.simulate(line)
+            except Exception:
+                pass
+    program = Simulator().compile(lines)
+    result = {"lines": len(lines)}
+    result.update(rates("simulate_lines_per_second", len(lines), simulate, repeat, Simulator))
+    result.update(rates("run_lines_per_second", len(lines), lambda simulator: simulator.run(program), repeat, Simulator))
+    return result
+
+def freePairs(grid, count, rng):
+    """
+    returns count pairs of free cells lying in the same region of the table
+    """
+    pairs = []
+    for _ in range(count * 100):
+        if len(pairs) == count: break
+        a = (rng.randrange(grid.width), rng.randrange(grid.height))
+        b = (rng.randrange(grid.width), rng.randrange(grid.height))
+        if a != b and grid.sameRegion(a, b): pairs.append((a, b))
+    return pairs
+
+def benchTravel(size, density, search, queries, seed, repeat):
+    rng = random.Random(seed)
+    cells = randomCells(size, size, density, rng)
+    started = time.perf_counter()
+    simulator = Simulator(size, size, [], cells, path_cache_size=0, search=search)
+    setup = time.perf_counter() - started
+    command = simulator.command
+    latencies = []
+    spreads = []
+    lengths = []
+    for start, dest in freePairs(command, queries, rng):
+        # the path cache is disabled, so every repetition searches again
+        best, spread = measure(lambda _: command.travelTo(dest, start), repeat)
+        latencies.append(best * 1000)
+        spreads.append(spread)
+        lengths.append(len(command.travelTo(dest, start)))
+    result = {"size": size, "density": density, "search": search, "queries": len(latencies),
+              "setup_seconds": setup}
+    if latencies:
+        result.update({"mean_ms": statistics.mean(latencies), "mean_ms_spread": statistics.mean(spreads),
+                       "median_ms": statistics.median(latencies), "max_ms": max(latencies),
+                       "mean_path_length": statistics.mean(lengths)})
+    return result
+
+def benchMemory(size, density, seed):
+    rng = random.Random(seed)
+    cells = randomCells(size, size, density, rng)
+    tracemalloc.start()
+    try:
+        grid = Grid(size, size, [], cells)
+        table = tracemalloc.get_traced_memory()[0]
+        grid.rayTables()
+        rays = tracemalloc.get_traced_memory()[0] - table
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"size": size, "density": density, "cells": size * size, "index_bytes": table,
+            "ray_bytes": rays, "peak_bytes": peak, "bytes_per_cell": (table + rays) / (size * size)}
+
+def _slowest(best, spread):
+    return best * (1 + spread)
+
+def mergeRounds(rounds):
+    """
+    merges the timings of several passes over the suite (a list of {"parse", "move", "travel"} results):
+    every timing keeps its best value over the passes, and a spread covering the slowest measurement of all
+    """
+    merged = {}
+    for section in ("parse", "move"):
+        entries = dict(rounds[0][section])
+        for key in entries:
+            if not key.endswith("_per_second"): continue
+            # rates are compared through the durations 1 / rate
+            durations = [(1 / entry[key], entry[key + "_spread"]) for entry in (r[section] for r in rounds)]
+            best = min(duration for duration, _ in durations)
+            entries[key] = 1 / best
+            entries[key + "_spread"] = max(_slowest(*pair) for pair in durations) / best - 1
+        merged[section] = entries
+    merged["travel"] = []
+    for entries in zip(*(r["travel"] for r in rounds)):
+        if "mean_ms" not in entries[0]:
+            merged["travel"].append(entries[0])
+            continue
+        entry = dict(min(entries, key=lambda e: e["mean_ms"]))
+        entry["mean_ms_spread"] = max(_slowest(e["mean_ms"], e["mean_ms_spread"]) for e in entries) / entry["mean_ms"] - 1
+        merged["travel"].append(entry)
+    return merged
+
+def timings(results):
+    """
+    flattens the timing metrics of a result set into {name: (value, higher is better, spread)}
+    (the spread is 0 for result files written before timings were repeated)
+    """
+    flat = {}
+    for section in ("parse", "move"):
+        entries = results.get(section, {})
+        for key, value in entries.items():
+            if key.endswith("_per_second"): flat[section + "." + key] = (value, True, entries.get(key + "_spread", 0.0))
+    for entry in results.get("travel", []):
+        if "mean_ms" in entry:
+            name = "travel.%s.%d.%g.mean_ms" % (entry["search"], entry["size"], entry["density"])
+            flat[name] = (entry["mean_ms"], False, entry.get("mean_ms_spread", 0.0))
+    return flat
+
+def compare(results, baseline, tolerance):
+    """
+    returns the descriptions of the timings worse than the baseline by more than tolerance (a fraction)
+    plus the larger spread of the two measurements, so that noisy timings are not reported
+    """
+    regressions = []
+    old = timings(baseline)
+    for name, (value, higher_is_better, spread) in timings(results).items():
+        if name not in old: continue
+        before, _, old_spread = old[name]
+        margin = tolerance + max(spread, old_spread)
+        # a rate r is as much worse as a duration 1 / r
+        worse = value * (1 + margin) < before if higher_is_better else value > before * (1 + margin)
+        if worse: regressions.append("%s: %.4g -> %.4g" % (name, before, value))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 100, 1000],
+                        help="Widths (and heights) of the tables used for TRAVEL and memory")
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.0, 0.1, 0.2, 0.4],
+                        help="Fractions of the cells that are potholes")
+    parser.add_argument("--searches", nargs="+", choices=constants.SEARCHES, default=[constants.SEARCH_BFS],
+                        help="Searches used for TRAVEL")
+    parser.add_argument("--queries", type=int, default=5, help="TRAVEL queries per table")
+    parser.add_argument("--lines", type=int, default=200000, help="Command lines for parse and move")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5, help="Number of times every timing is measured in a pass")
+    parser.add_argument("--rounds", type=int, default=3, help="Number of passes over the suite")
+    parser.add_argument("--output", help="File to write the results to (standard output by default)")
+    parser.add_argument("--compare", help="Previous result file to compare the timings with")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Fraction by which a timing may get worse before it is reported")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    lines = randomCommands(args.lines, rng)
+    rounds = [{"parse": benchParse(lines, args.repeat),
+               "move": benchMove(lines, args.repeat),
+               "travel": [benchTravel(size, density, search, args.queries, args.seed, args.repeat)
+                          for size in args.sizes for density in args.densities for search in args.searches]}
+              for _ in range(args.rounds)]
+    results = {"meta": {"python": platform.python_version(), "platform": platform.platform(),
+                        "seed": args.seed, "repeat": args.repeat, "rounds": args.rounds,
+                        "time": time.strftime("%Y-%m-%dT%H:%M:%S")}}
+    results.update(mergeRounds(rounds))
+    results["memory"] = [benchMemory(size, density, args.seed) for size in args.sizes for density in args.densities]
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print("slower: " + regression, file=sys.stderr)
+        if regressions: sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+# binlog.py
+# ------------------------------
+# Author: Ankita Dhar <githubid: ankitadhar>
+#
+# Binary command logs. A binary log starts with a header (the magic bytes JORA, the format version and
+# the width and height of the table as varints) followed by one record per command line:
+#   - one opcode byte alone for MOVE, LEFT, RIGHT, REPORT and STATS (see BARE_RECORDS); runs of these
+#     records, which make up most logs, are cut out of the log at once and decoded in C.
+#   - one opcode byte (constants.OP_PLACE, OP_MOVE, OP_TRAVEL, OP_BLOCK or OP_UNBLOCK) followed by its
+#     operands as varints: x, y and the index of the direction for PLACE, the number of steps for MOVE,
+#     x and y for TRAVEL, BLOCK and UNBLOCK. Signed operands are zigzag encoded.
+#   - REC_TEXT, the length of the line as a varint and the line itself, for the lines the tokenizer
+#     leaves to the reference parser (malformed commands, unusual spacing, ...), so that a binary log
+#     runs with exactly the same results as the text log it was converted from.
+# Binary logs are converted from and to text logs with "python binlog.py encode|decode", and run
+# directly: their records are decoded into the tokens Simulator.compile takes, without any text parsing.
+#
+# python binlog.py encode commands.txt commands.bin --width 5 --height 5
+# python binlog.py decode commands.bin commands.txt
+
+import argparse
+import mmap
+from re import compile
+from stream import readLines
+from tokenizer import tokenize
+import constants
+
+MAGIC = b"JORA"
+FORMAT_VERSION = 1
+REC_TEXT = 255 # opcode of a record holding a raw text line
+# opcodes of the records of the commands without operands, and their tokens
+BARE_RECORDS = {0x10: (constants.OP_MOVE, 1), 0x11: (constants.OP_TURN, -1), 0x12: (constants.OP_TURN, 1),
+                0x13: (constants.OP_REPORT,), 0x14: (constants.OP_STATS,)}
+
+class BinaryLogError(Exception):
+    """
+    Exception to handle malformed binary logs, or logs written for a table of other dimensions
+    """
+    pass
+
+# for every opcode of the records with operands, whether each of its operands is signed
+_operands = {constants.OP_PLACE: (True, True, False), constants.OP_MOVE: (False,), constants.OP_TRAVEL: (True, True),
+             constants.OP_BLOCK: (True, True), constants.OP_UNBLOCK: (True, True)}
+
+# commands of the opcodes taking the co-ordinates of a cell
+_cellCommands = {constants.OP_TRAVEL: constants.TRAVELCOMMAND, constants.OP_BLOCK: constants.BLOCKCOMMAND,
+                 constants.OP_UNBLOCK: constants.UNBLOCKCOMMAND}
+
+# records of the bare commands by token, tokens of the bare records by opcode, and runs of bare records
+_bareOpcodes = {token: op for op, token in BARE_RECORDS.items()}
+_bareTokens = [BARE_RECORDS.get(op) for op in range(256)]
+_bareRun = compile(b"[" + b"".join(b"\\x%02x" % op for op in BARE_RECORDS) + b"]+")
+
+def encodeVarint(value, signed=False):
+    """
+    returns the varint encoding of value (7 bits per byte, least significant first), zigzag encoded if signed
+    """
+    if signed: value = value << 1 if value >= 0 else (-value << 1) - 1
+    out = bytearray()
+    while value > 0x7f:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+def decodeVarint(data, i, signed=False):
+    """
+    returns the varint starting at index i of data and the index following it
+    """
+    value = shift = 0
+    while True:
+        if i >= len(data): raise BinaryLogError("Binary log ends in the middle of a record.")
+        byte = data[i]
+        i += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80: break
+        shift += 7
+    if signed: value = (value >> 1) ^ -(value & 1)
+    return value, i
+
+def encodeHeader(width, height):
+    return MAGIC + bytes((FORMAT_VERSION,)) + encodeVarint(width) + encodeVarint(height)
+
+def decodeHeader(data):
+    """
+    returns the width and height of the table of a binary log and the index of its first record
+    """
+    if len(data) <= len(MAGIC) or data[:len(MAGIC)] != MAGIC:
+        raise BinaryLogError("Not a binary command log.")
+    if data[len(MAGIC)] != FORMAT_VERSION:
+        raise BinaryLogError("Unsupported binary log format version " + str(data[len(MAGIC)]) + ".")
+    width, i = decodeVarint(data, len(MAGIC) + 1)
+    height, i = decodeVarint(data, i)
+    return width, height, i
+
+def isBinaryLog(filepath):
+    with open(filepath, 'rb') as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+def encodeLine(line):
+    """
+    returns the record of a text command line (a string or bytes, without the line ending)
+    """
+    token = tokenize(line)
+    if token is None:
+        if type(line) is str: line = line.encode('utf-8')
+        return bytes((REC_TEXT,)) + encodeVarint(len(line)) + line
+    if token in _bareOpcodes: return bytes((_bareOpcodes[token],))
+    op = token[0]
+    return bytes((op,)) + b"".join(encodeVarint(value, signed) for value, signed in zip(token[1:], _operands[op]))
+
+def decodeRecords(data, i):
+    """
+    yields the records of a binary log from index i on: the token of the command (as returned by
+    tokenizer.tokenize) or, for REC_TEXT records, the line as bytes
+    """
+    size = len(data)
+    operands = _operands
+    bare_run = _bareRun.match
+    bare_tokens = _bareTokens.__getitem__
+    while i < size:
+        run = bare_run(data, i)
+        if run is not None:
+            end = run.end()
+            yield from map(bare_tokens, data[i:end])
+            i = end
+            continue
+        op = data[i]
+        i += 1
+        if op == REC_TEXT:
+            length, i = decodeVarint(data, i)
+            if i + length > size: raise BinaryLogError("Binary log ends in the middle of a record.")
+            yield data[i:i + length]
+            i += length
+            continue
+        signs = operands.get(op)
+        if signs is None: raise BinaryLogError("Unknown opcode " + str(op) + " in binary log.")
+        token = [op]
+        for signed in signs:
+            value, i = decodeVarint(data, i, signed)
+            token.append(value)
+        yield tuple(token)
+
+def readRecords(filepath, width=None, height=None):
+    """
+    returns an iterator over the records of a binary log file (see decodeRecords), which is memory
+    mapped. If width and height are given, they must be the dimensions the log was written for. The
+    header is checked at once, so that a log that is not valid or is for another table raises here
+    rather than once its records are read.
+    """
+    with open(filepath, 'rb') as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        log_width, log_height, i = decodeHeader(mapped)
+        if width is not None and (log_width, log_height) != (width, height):
+            raise BinaryLogError("Binary log was written for a " + str(log_width) + "x" + str(log_height) +
+                                 " table.")
+    except:
+        mapped.close()
+        raise
+    return _mappedRecords(mapped, i)
+
+def _mappedRecords(mapped, i):
+    """
+    yields the records of a mapped binary log from index i on, and unmaps it once they are read
+    """
+    with mapped:
+        yield from decodeRecords(mapped, i)
+
+def recordToText(record):
+    """
+    returns the text command line of a record
+    """
+    if type(record) is not tuple: return str(record, 'utf-8')
+    op = record[0]
+    if op == constants.OP_PLACE:
+        return constants.PLACECOMMAND + " %d,%d,%s" % (record[1], record[2], constants.DIRECTIONS[record[3]])
+    if op == constants.OP_TURN:
+        return constants.LEFTCOMMAND if record[1] < 0 else constants.RIGHTCOMMAND
+    if op == constants.OP_MOVE:
+        return constants.MOVECOMMAND if record[1] == 1 else constants.MOVECOMMAND + " " + str(record[1])
+    if op == constants.OP_REPORT: return constants.REPORTCOMMAND
+    if op == constants.OP_STATS: return constants.STATSCOMMAND
+    return _cellCommands[op] + " %d,%d" % (record[1], record[2])
+
+def encodeFile(source, destination, width=constants.GRID_WIDTH, height=constants.GRID_HEIGHT):
+    """
+    converts a text command log into a binary log for a table of width x height
+    """
+    with open(destination, 'wb') as out:
+        out.write(encodeHeader(width, height))
+        buffer = []
+        for line in readLines(source, decode=False):
+            buffer.append(encodeLine(line))
+            if len(buffer) >= constants.PROGRAM_CHUNK:
+                out.write(b"".join(buffer))
+                buffer = []
+        out.write(b"".join(buffer))
+
+def decodeFile(source, destination):
+    """
+    converts a binary log into a text command log. Commands come back in their canonical form (e.g.
+    "TRAVEL +1,2" as "TRAVEL 1,2"), which runs with the same results; REC_TEXT lines come back unchanged.
+    """
+    with open(destination, 'w', encoding='utf-8', newline='\n') as out:
+        buffer = []
+        for record in readRecords(source):
+            buffer.append(recordToText(record))
+            if len(buffer) >= constants.PROGRAM_CHUNK:
+                out.write("\n".join(buffer) + "\n")
+                buffer = []
+        if buffer: out.write("\n".join(buffer) + "\n")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("action", choices=["encode", "decode"], help="encode a text log, or decode a binary log")
+    parser.add_argument("source")
+    parser.add_argument("destination")
+    parser.add_argument("--width", type=int, default=constants.GRID_WIDTH, help="Width of the table (encode)")
+    parser.add_argument("--height", type=int, default=constants.GRID_HEIGHT, help="Height of the table (encode)")
+    args = parser.parse_args()
+    if args.action == "encode": encodeFile(args.source, args.destination, args.width, args.height)
+    else: decodeFile(args.source, args.destination)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# checkpoint.py
+# ------------------------------
+# Author: Ankita Dhar <githubid: ankitadhar>
+#
+# Checkpoints of long replays of command files. Every checkpoint is one JSON line appended to the
+# checkpoint file, holding what is needed to carry on from the line it was taken at: the position and
+# direction of the robot, the version of the table and the cells changed by BLOCK/UNBLOCK commands,
+# the destination of the last TRAVEL command, and the byte offset and number of the next line of the
+# command file. A replay can resume from the latest checkpoint, or seek to any line by restoring the
+# nearest checkpoint before it and replaying only the lines in between.
+
+import json
+from contextlib import nullcontext
+from stream import MappedLines
+import constants
+
+class CheckpointMismatchError(Exception):
+    """
+    Exception to handle checkpoints taken on a table of other dimensions
+    """
+    pass
+
+def snapshot(simulator, reader):
+    """
+    returns the checkpoint of the simulator after the lines read so far by reader (a MappedLines)
+    """
+    command = simulator.command
+    return {"line": reader.line, "offset": reader.offset,
+            "position": list(simulator.configuration.getPosition()),
+            "direction": simulator.configuration.getDirection(),
+            "width": command.width, "height": command.height, "version": command.version,
+            "toggled": sorted(command.toggled),
+            "goal": list(command.goal) if command.goal is not None else None,
+            "plan": command.plan is not None or command.replan}
+
+def restore(simulator, checkpoint):
+    """
+    restores a checkpoint on a new simulator, created with the same table as the one it was taken on
+    """
+    command = simulator.command
+    if (command.width, command.height) != (checkpoint["width"], checkpoint["height"]):
+        raise CheckpointMismatchError("Checkpoint was taken on a table of other dimensions.")
+    for i in checkpoint["toggled"]:
+        pos = command.position(i)
+        if command.isPothole(pos): command.removePothole(pos)
+        else: command.addPothole(pos)
+    command.version = checkpoint["version"]
+    pos = tuple(checkpoint["position"])
+    simulator.configuration.setPosition(pos)
+    simulator.configuration.setDirection(checkpoint["direction"])
+    if checkpoint["goal"] is not None:
+        command.goal = tuple(checkpoint["goal"])
+        # the plan is created by the next TRAVEL command, as after the first change of the potholes
+        command.replan = checkpoint["plan"]
+
+def readCheckpoints(filepath):
+    """
+    returns the checkpoints of a checkpoint file, in the order they were taken. A line cut short
+    (e.g. when the replay was killed while writing it) is skipped.
+    """
+    checkpoints = []
+    try:
+        with open(filepath) as file:
+            for line in file:
+                try:
+                    checkpoints.append(json.loads(line))
+                except ValueError:
+                    pass
+    except FileNotFoundError:
+        pass
+    return checkpoints
+
+def findCheckpoint(checkpoints, line=None):
+    """
+    returns the latest checkpoint taken at or before line (the latest one if line is None), None if there is none
+    """
+    found = None
+    for checkpoint in checkpoints:
+        if line is None or checkpoint["line"] <= line:
+            if found is None or checkpoint["line"] > found["line"]: found = checkpoint
+    return found
+
+def _openCheckpoints(filepath, append):
+    """
+    opens the checkpoint file for writing, after its last complete checkpoint if append is True
+    """
+    if not append: return open(filepath, 'w')
+    with open(filepath, 'rb') as file:
+        file.seek(-1, 2)
+        cut = file.read(1) != b'\n'
+    file = open(filepath, 'a')
+    # the last checkpoint was cut short, the next one starts on a new line
+    if cut: file.write('\n')
+    return file
+
+def replay(simulator, filepath, sink, checkpoint_path=None, every=constants.CHECKPOINT_EVERY, resume=False,
+           seek=None, chunk=constants.PROGRAM_CHUNK):
+    """
+    runs the command file on the simulator, writing the results to the sink and a checkpoint to
+    checkpoint_path every lines (the results before a checkpoint are flushed first).
+    With resume the replay carries on from the latest checkpoint of checkpoint_path. With seek it starts
+    at that line: the state is restored from the nearest checkpoint before it and the lines in between
+    are run without writing their results. Otherwise the checkpoint file is started anew.
+    """
+    checkpoints = readCheckpoints(checkpoint_path) if checkpoint_path and (resume or seek is not None) else []
+    start = findCheckpoint(checkpoints, seek)
+    last = max((checkpoint["line"] for checkpoint in checkpoints), default=0)
+    output = _openCheckpoints(checkpoint_path, bool(checkpoints)) if checkpoint_path else nullcontext()
+    with MappedLines(filepath) as reader, output:
+        if start is not None:
+            restore(simulator, start)
+            reader.offset, reader.line = start["offset"], start["line"]
+        while seek is not None and reader.line < seek:
+            lines = reader.take(min(chunk, seek - reader.line))
+            if not lines: break
+            simulator.run(simulator.compile(lines))
+        every = max(1, every)
+        target = (reader.line // every + 1) * every
+        while True:
+            lines = reader.take(min(chunk, target - reader.line))
+            if not lines: break
+            simulator.run(simulator.compile(lines), sink)
+            if reader.line == target:
+                if checkpoint_path and target > last:
+                    sink.flush()
+                    output.write(json.dumps(snapshot(simulator, reader)) + '\n')
+                    output.flush()
+                target += every
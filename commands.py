@@ -3,8 +3,13 @@
 # Author: Ankita Dhar <githubid: ankitadhar>
 
 from robo import Grid 
+from pathcache import PathCache
+from dstar import DStarLite
+from hpa import HierarchicalPlanner
+from jps import JumpPointSearch
 import constants
 from re import compile, X
+from collections import deque
 
 class InvalidCommandFormatError(Exception):
     """
@@ -31,6 +36,9 @@ class Commands(Grid):
     # Directions
     directions = constants.DIRECTIONS
     
+    # index of every direction in directions (the integer heading used by the engine)
+    _headings = {dir: index for index, dir in enumerate(constants.DIRECTIONS)}
+
     # vector for movement towards different directions
     _directions = {constants.NORTH: (0, 1),
                    constants.SOUTH: (0, -1),
@@ -40,20 +48,47 @@ class Commands(Grid):
     # pattern to validate arguments of PLACE command
     PATTERN_PLACE = compile(
         r"""
-            (?P<x>\d+),                  # x coord
-            (?P<y>\d+),                  # y coord
+            (?P<x>[-+]?\d+),             # x coord
+            (?P<y>[-+]?\d+),             # y coord
             (?P<f>NORTH|EAST|SOUTH|WEST) # facing
             """, X
     )
 
+    PATTERN_MOVE = compile(
+        r"""
+            (?P<n>\d+)                   # number of steps
+            """, X
+    )
+
     PATTERN_TRAVEL = compile(
         r"""
-            (?P<x>\d+),                  # x coord
-            (?P<y>\d+)                   # y coord
+            (?P<x>[-+]?\d+),             # x coord
+            (?P<y>[-+]?\d+)              # y coord
             """, X
     )
 
-    v = set()
+    def __init__(self, width, height, potholes, cells=None, path_cache_size=constants.PATH_CACHE_SIZE,
+                 search=constants.SEARCH_BFS, cluster_size=constants.HPA_CLUSTER_SIZE, grid_cache=None, layout=None):
+        Grid.__init__(self, width, height, potholes, cells, grid_cache, layout)
+        if search not in constants.SEARCHES:
+            raise ValueError(str(search) + ": search not available.")
+        # search used by TRAVEL (one of constants.SEARCHES)
+        self.search = search
+        self.hierarchy = HierarchicalPlanner(self, cluster_size) if search == constants.SEARCH_HPA else None
+        self.jumpPoints = JumpPointSearch(self) if search == constants.SEARCH_JPS else None
+        # shortest paths of previous TRAVEL commands
+        self.pathCache = PathCache(path_cache_size)
+        # destination of the last TRAVEL command, and the D* Lite plan to it once potholes have changed
+        # (replan is set when they have changed and the plan is still to be created by the next TRAVEL)
+        self.goal = None
+        self.plan = None
+        self.replan = False
+        # change of the cell index for one step towards each heading (NORTH, EAST, SOUTH, WEST)
+        self.strides = (width, 1, -width, -1)
+        # number of cells expanded by the breadth first search
+        self.expanded = 0
+        # statistics of TRAVEL commands (see stats.py), None when instrumentation is disabled
+        self.stats = None
 
     def getSuccessors(self, pos):
         """
@@ -65,10 +100,8 @@ class Commands(Grid):
             (cur_x,cur_y) = pos
             dx, dy = self._directions[dir]
             x, y = cur_x+dx, cur_y+dy
-            if (x >= self.xmin and x <= self.xmax
-                and y >= self.ymin and y <= self.ymax):
-                if (x, y) not in self.potholes:
-                    successors.add((x,y))
+            if self.isFree((x, y)):
+                successors.add((x,y))
         return successors
 
         
@@ -90,15 +123,42 @@ class Commands(Grid):
         """
         given a direction, returns the direction of the robot upon turning left
         """
-        index = self.directions.index(dir)
-        return self.directions[index-1]
+        return self.directions[(self._headings[dir] - 1) & 3]
 
     def turnRight(self, dir):
         """
         given a direction, returns the direction of the robot upon turning right
         """
-        index = self.directions.index(dir)
-        return self.directions[self.nextIndex(index)]
+        return self.directions[(self._headings[dir] + 1) & 3]
+
+    def turn(self, dir, quarters):
+        """
+        given a direction, returns the direction of the robot upon turning right quarters times
+        (negative quarters turn left). Any number of turns costs the same as one.
+        """
+        return self.directions[(self._headings[dir] + quarters) & 3]
+
+    def moveBy(self, position, dir, steps):
+        """
+        given the position and direction of robot, returns the position of the robot after steps MOVE
+        commands. The robot stops on the last free cell before the edge of the table or a pothole, which
+        is the same position a sequence of single moves would leave it on. The number of free cells ahead
+        is looked up in the ray tables of the table, so any number of steps costs the same as one.
+        """
+        x, y = position
+        dx, dy = self._directions[dir]
+        ahead = self.rayTables()[self._headings[dir]][self.index(position)]
+        if steps > ahead: steps = ahead
+        return (x + dx * steps, y + dy * steps)
+
+    def moveCell(self, cell, heading, steps):
+        """
+        moveBy for the integer state of the engine: given the cell index of the robot and its heading
+        (index in constants.DIRECTIONS), returns the cell index of the robot after steps MOVE commands.
+        """
+        ahead = self.rayTables()[heading][cell]
+        if steps > ahead: steps = ahead
+        return cell + self.strides[heading] * steps
 
     def move(self, position, dir):
         """
@@ -110,79 +170,334 @@ class Commands(Grid):
         x, y = position
         dx, dy = self.directionToVector(dir)
         
-        if ((dy > 0 and y < self.ymax) or (dy < 0 and y > self.ymin)) and ((x, int(y + dy)) not in self.potholes): 
+        if ((dy > 0 and y < self.ymax) or (dy < 0 and y > self.ymin)) and self.isFree((x, int(y + dy))): 
             return x, int(y + dy)
-        if ((dx > 0 and x < self.xmax) or (dx < 0 and x > self.xmin)) and ((int(x + dx), y) not in self.potholes): 
+        if ((dx > 0 and x < self.xmax) or (dx < 0 and x > self.xmin)) and self.isFree((int(x + dx), y)): 
             return (int(x + dx), y)
         return (x,y)
     
+    def matchMove(self, cmd_str):
+        """
+        given the arguments of the move command, returns the number of steps to move (1 if no argument
+        is given), or None if the arguments are not in the valid format.
+        """
+        if not cmd_str: return 1
+        match = self.PATTERN_MOVE.fullmatch(cmd_str)
+        return int(match.group('n')) if match else None
+
+    def parseMove(self, cmd_str):
+        """
+        given the arguments of the move command, returns the number of steps to move (1 if no argument
+        is given), otherwise an exception is raised.
+        """
+        steps = self.matchMove(cmd_str)
+        if steps is None: raise InvalidCommandFormatError("Invalid MOVE command argument format.")
+        return steps
+
+    def matchPlace(self, cmd_str):
+        """
+        given the arguments of the place command, returns the x, y co-ordinates and the direction,
+        or None if the arguments are not in the valid format.
+        """
+        match = self.PATTERN_PLACE.fullmatch(cmd_str) if cmd_str else None
+        return (int(match.group('x')), int(match.group('y')), match.group('f')) if match else None
+
+    def parsePlace(self, cmd_str):
+        """
+        given the arguments of the place command, returns the x, y co-ordinates and the direction
+        if the arguments are in the valid format, otherwise an exception is raised.
+        """
+        place = self.matchPlace(cmd_str)
+        if place is None: raise InvalidCommandFormatError("Invalid PLACE command argument format.")
+        return place
+
+    def placeStatus(self, x, y):
+        """
+        returns the status code of placing the robot at the co-ordinates (constants.STATUS_OK if it can
+        be placed there), the same checks as placeAt without raising an exception.
+        """
+        return constants.STATUS_OK if self.isFree((x, y)) else constants.STATUS_ILLEGAL_COORDINATE
+
+    def placeAt(self, x, y, dir):
+        """
+        verifies that the robot can be placed at the co-ordinates and returns its new position and direction
+        """
+        if self.isPothole((x, y)): 
+            raise IllegalCoordinateError("Co-ordinates are one of the potholes.")
+        if not self.isOnTable((x, y)):
+            raise IllegalCoordinateError("Co-ordinates are out of the table.")
+        return (x, y), dir
+
     def place(self, cmd_str):
         """
         given the arguments of the place commands, it is first verified to be valid and then the robot
         is placed at the location, facing the direction as per the arguments.
         """
-        if not cmd_str: raise InvalidCommandFormatError("Invalid PLACE command argument format.")
-        isPatternValid = self.PATTERN_PLACE.search(cmd_str)
-        if isPatternValid:
-            # if the pattern of the argument is valid
-            x,y,dir = cmd_str.split(',')
-            if (int(x),int(y)) in self.potholes: 
-                raise IllegalCoordinateError("Co-ordinates are one of the potholes.")
-            if (int(x) >= self.xmin and int(x) <= self.xmax and
-                int(y) >= self.ymin and int(y) <= self.ymax):
-                # if the co-ordinates provided in the argument are valid
-                pos = (int(x),int(y))
-                return pos, dir
-            else:
-                raise IllegalCoordinateError("Co-ordinates are out of the table.")
-        else:
-            raise InvalidCommandFormatError("Invalid PLACE command argument format.")
-
-    def transit(self, start, end, path):
-        """
-        a dfs algorithm is used to find a path from start position to destination (end) position.
-        """
-        if start == end: 
-            # if destination is reached, return the accumulated path
-            path.append(end)
-            return path
-        successors = self.getSuccessors(start)
-        if start not in self.v:
-            # if the position in the transition is not visited, mark it visited and add it to the path
-            path.append(start)
-            self.v.add(start)
-            for child in successors:
-                path = self.transit(child, end, path)
-                if end == path[-1]: 
-                    # check the last element on the path recieved, if it is destination then return the path
-                    return path
-
-                if start != path[-1]:
-                    # check the last element on the path if it is not the current position in transition, then
-                    # a path shift is in process. We need to remove the last element to proceed.
-                    path = path[:-1]
-        return path
+        return self.placeAt(*self.parsePlace(cmd_str))
+
+    def transit(self, start, end):
+        """
+        a breadth first search is used to find the shortest path from start position to destination (end) position.
+        each visited cell keeps the index of the cell it was reached from, and the path is rebuilt by
+        following those pointers back from the destination. returns None if no path exists.
+        """
+        return self.transitMany(start, [end]).get(end)
+
+    def transitMany(self, start, ends, nearest=False):
+        """
+        a single breadth first search from start position finds the shortest paths to all the destination
+        (ends) positions: the search stops once every destination is reached, and every path is rebuilt from
+        the same parent pointers. With nearest, it stops at the first destination reached instead.
+        returns a dictionary of the paths by destination, without the destinations that can not be reached.
+        """
+        width = self.width
+        cells = self.cells
+        size = len(cells)
+        source = self.index(start)
+        targets = {self.index(end) for end in ends}
+        found = {}
+        parents = {source: -1}
+        frontier = deque([source])
+        while frontier:
+            i = frontier.popleft()
+            if i in targets:
+                # a destination is reached, walk the parent pointers back to the start position
+                path = []
+                j = i
+                while j != -1:
+                    path.append(self.position(j))
+                    j = parents[j]
+                path.reverse()
+                found[path[-1]] = path
+                targets.discard(i)
+                if nearest or not targets:
+                    self.expanded += len(parents) - len(frontier)
+                    return found
+            x = i % width
+            # adjacent cells towards NORTH, EAST, SOUTH and WEST, -1 if off the table
+            for j in (i + width if i + width < size else -1,
+                      i + 1 if x < width - 1 else -1,
+                      i - width,
+                      i - 1 if x > 0 else -1):
+                if j >= 0 and cells[j] == 0 and j not in parents:
+                    parents[j] = i
+                    frontier.append(j)
+        self.expanded += len(parents)
+        return found
+
+    def findPath(self, start, end):
+        """
+        finds a path from start position to destination (end) position with the search selected for
+        the table, returns None if no path exists.
+        """
+        if self.search == constants.SEARCH_HPA:
+            return self.hierarchy.path(start, end)
+        if self.search == constants.SEARCH_JPS:
+            return self.jumpPoints.path(start, end)
+        return self.transit(start, end)
+
+    def expandedNodes(self):
+        """
+        returns the number of nodes expanded so far by the searches of TRAVEL commands
+        """
+        expanded = self.expanded
+        if self.hierarchy is not None: expanded += self.hierarchy.expanded
+        if self.jumpPoints is not None: expanded += self.jumpPoints.expanded
+        if self.plan is not None: expanded += self.plan.expanded
+        return expanded
+
+    def matchTravel(self, cmd_str):
+        """
+        given the arguments of the travel command (or of another command taking the co-ordinates of a cell,
+        like BLOCK), returns the x, y co-ordinates, or None if the arguments are not in the valid format.
+        """
+        match = self.PATTERN_TRAVEL.fullmatch(cmd_str) if cmd_str else None
+        return (int(match.group('x')), int(match.group('y'))) if match else None
+
+    def matchTargets(self, cmd_str):
+        """
+        given the arguments of a command taking several destinations (TRAVEL x,y x,y ... or NEAREST),
+        kept apart by single spaces, returns the list of their x, y co-ordinates, or None if any of them
+        is not in the valid format.
+        """
+        if not cmd_str: return None
+        targets = [self.matchTravel(target) for target in cmd_str.split(" ")]
+        return None if None in targets else targets
+
+    def parseTargets(self, cmd_str, cmd=constants.TRAVELCOMMAND):
+        """
+        given the arguments of a command taking several destinations, returns the list of their x, y
+        co-ordinates if they are all in the valid format, otherwise an exception is raised.
+        """
+        targets = self.matchTargets(cmd_str)
+        if targets is None: raise InvalidCommandFormatError("Invalid " + cmd + " command argument format.")
+        return targets
+
+    def parseTravel(self, cmd_str, cmd=constants.TRAVELCOMMAND):
+        """
+        given the arguments of the travel command (or of another command taking the co-ordinates of a cell,
+        like BLOCK), returns the x, y co-ordinates if the arguments are in the valid format, otherwise an
+        exception is raised.
+        """
+        pos = self.matchTravel(cmd_str)
+        if pos is None: raise InvalidCommandFormatError("Invalid " + cmd + " command argument format.")
+        return pos
+
+    def cellStatus(self, pos, cur_pos, blocking):
+        """
+        returns the status code of adding (blocking) or removing a pothole at pos, the same checks as
+        block and unblock without raising an exception.
+        """
+        if not self.isOnTable(pos) or (blocking and pos == cur_pos):
+            return constants.STATUS_ILLEGAL_COORDINATE
+        return constants.STATUS_OK
+
+    def block(self, pos, cur_pos):
+        """
+        adds a pothole at pos, which can not be the position of the robot, and repairs the plan of the
+        last TRAVEL command.
+        """
+        if not self.isOnTable(pos):
+            raise IllegalCoordinateError("Co-ordinates are out of the table.")
+        if pos == cur_pos:
+            raise IllegalCoordinateError("Co-ordinates are the position of the robot.")
+        if self.isPothole(pos): return
+        self.addPothole(pos)
+        if pos == self.goal:
+            # the destination is gone, there is no plan to repair any more
+            self.goal = self.plan = None
+            self.replan = False
+        self._repairPlan(pos, cur_pos)
+
+    def unblock(self, pos, cur_pos):
+        """
+        removes the pothole at pos and repairs the plan of the last TRAVEL command.
+        """
+        if not self.isOnTable(pos):
+            raise IllegalCoordinateError("Co-ordinates are out of the table.")
+        if not self.isPothole(pos): return
+        self.removePothole(pos)
+        self._repairPlan(pos, cur_pos)
+
+    def _repairPlan(self, pos, cur_pos):
+        """
+        updates the plan to the destination of the last TRAVEL command after the cell at pos has changed.
+        Nothing is searched here: after the first change the plan is created by the next TRAVEL command to
+        the destination, and from then on D* Lite only revisits the cells whose distance to the destination
+        is affected by each change.
+        """
+        if self.goal is None: return
+        if self.plan is None:
+            self.replan = True
+        elif self.isFree(cur_pos):
+            self.plan.moveStart(cur_pos)
+            self.plan.updateCell(pos)
+
+    def travelStatus(self, dest, cur_pos):
+        """
+        returns the status code of travelling to the destination (constants.STATUS_OK if a path exists),
+        the same checks as travelTo without raising an exception.
+        """
+        if not self.isFree(dest): return constants.STATUS_ILLEGAL_COORDINATE
+        if not self.sameRegion(cur_pos, dest): return constants.STATUS_NO_PATH
+        return constants.STATUS_OK
+
+    def travelTo(self, dest, cur_pos):
+        """
+        given the destination, first it is verified that the destination is a free cell of the table.
+        If any path exists from current position of robot to destination, then a path is found with the
+        selected search (the shortest one by default) and returned otherwise an exception is raised if no path exists.
+        Paths are looked up in the path cache first and stored there once found. If potholes have
+        changed since the last TRAVEL command to the same destination, its repaired plan gives the path.
+        If statistics are enabled, the nodes expanded by the search and the length of the path are recorded.
+        """
+        if self.isPothole(dest): 
+            raise IllegalCoordinateError("Co-ordinates are one of the potholes.")
+        if not self.isOnTable(dest):
+            raise IllegalCoordinateError("Co-ordinates are not on the board.")
+        if not self.sameRegion(cur_pos, dest):
+            # destination lies in another region of the table, no search is needed
+            raise NoPathToDestination("Path doesn't exist")
+        if dest != self.goal:
+            self.goal, self.plan, self.replan = dest, None, False
+        if self.stats is not None: expanded = self.expandedNodes()
+        path = self.pathCache.get(cur_pos, dest, self.version)
+        if path is None:
+            if self.replan:
+                # D* Lite searches from the destination until the position of the robot is settled
+                self.plan, self.replan = DStarLite(self, cur_pos, dest), False
+            if self.plan is not None: path = self.plan.path(cur_pos)
+            else: path = self.findPath(cur_pos, dest)
+            if path is None: raise NoPathToDestination("Path doesn't exist")
+            self.pathCache.put(cur_pos, dest, self.version, path)
+        if self.stats is not None: self.stats.recordTravel(self.expandedNodes() - expanded, len(path))
+        return list(path)
+
+    def targetsStatus(self, dests, cur_pos, nearest=False):
+        """
+        returns the status code of travelling to several destinations (or to the nearest of them), the same
+        checks as travelMany and nearest without raising an exception.
+        """
+        if not all(self.isOnTable(dest) for dest in dests): return constants.STATUS_ILLEGAL_COORDINATE
+        if nearest and not any(self.sameRegion(cur_pos, dest) for dest in dests): return constants.STATUS_NO_PATH
+        return constants.STATUS_OK
+
+    def _reachable(self, dests, cur_pos):
+        """
+        verifies that the destinations are on the table and returns the ones that can be reached, without
+        duplicates, in the order they are given
+        """
+        for dest in dests:
+            if not self.isOnTable(dest):
+                raise IllegalCoordinateError("Co-ordinates are not on the board.")
+        return [dest for dest in dict.fromkeys(dests) if self.sameRegion(cur_pos, dest)]
+
+    def travelMany(self, dests, cur_pos):
+        """
+        given several destinations, returns the paths from the current position of the robot to each of
+        them, in the same order, with None for the destinations that can not be reached (potholes, or cells
+        of another region of the table). An exception is raised if any destination is off the table.
+        The paths that are not in the path cache are all found by one breadth first search (whatever the
+        search selected for the table), and are only cached when the table uses the breadth first search,
+        for single TRAVEL commands to return the paths of their own search.
+        """
+        reachable = self._reachable(dests, cur_pos)
+        cache = self.search == constants.SEARCH_BFS
+        if self.stats is not None: expanded = self.expandedNodes()
+        paths = {}
+        for dest in reachable:
+            path = self.pathCache.get(cur_pos, dest, self.version) if cache else None
+            if path is not None: paths[dest] = path
+        missing = [dest for dest in reachable if dest not in paths]
+        if missing:
+            found = self.transitMany(cur_pos, missing)
+            paths.update(found)
+            if cache:
+                for dest, path in found.items(): self.pathCache.put(cur_pos, dest, self.version, path)
+        if self.stats is not None:
+            self.stats.recordTravels(self.expandedNodes() - expanded, [len(path) for path in paths.values()])
+        return [list(paths[dest]) if dest in paths else None for dest in dests]
+
+    def nearest(self, dests, cur_pos):
+        """
+        given several destinations, returns the shortest path from the current position of the robot to the
+        nearest destination that can be reached (destinations as near as each other are told apart by the
+        order of the breadth first search). An exception is raised if any destination is off the table,
+        or if none of them can be reached.
+        """
+        reachable = self._reachable(dests, cur_pos)
+        if not reachable:
+            raise NoPathToDestination("Path doesn't exist")
+        if self.stats is not None: expanded = self.expandedNodes()
+        path = next(iter(self.transitMany(cur_pos, reachable, nearest=True).values()))
+        if self.search == constants.SEARCH_BFS:
+            self.pathCache.put(cur_pos, path[-1], self.version, path)
+        if self.stats is not None: self.stats.recordTravel(self.expandedNodes() - expanded, len(path))
+        return list(path)
 
     def travel(self, cmd_str, conf):
         """
         given the arguments of the travel command, first it is verified if the arguments for the destination
-        are valid. If so then, it is tested if the robot is already at the destination.
-        If robot is not at destination, if any path exists from current position of robot to destination, then
-        a path is found and returned otherwise an exception is raised if no path exists. 
-        """
-        if not cmd_str: raise InvalidCommandFormatError("Invalid TRAVEL command argument format.")
-        isPatternValid = self.PATTERN_TRAVEL.search(cmd_str)
-        if isPatternValid:
-            x, y = cmd_str.split(',')
-            if (int(x),int(y)) in self.potholes: 
-                raise IllegalCoordinateError("Co-ordinates are one of the potholes.")
-            if (int(x) >= self.xmin and int(x) <= self.xmax and
-                int(y) >= self.ymin and int(y) <= self.ymax):
-                cur_pos = conf.getPosition()
-                self.v = set()
-                if cur_pos == (int(x),int(y)): print("Robot already at destination")
-                path = self.transit(cur_pos, (int(x),int(y)), [])
-                if path[-1] != (int(x),int(y)): raise NoPathToDestination("Path doesn't exist")
-                return path
-            else: 
-                raise IllegalCoordinateError("Co-ordinates are not on the board.")
+        are valid. If so then the path from the current position of the robot to the destination is returned.
+        """
+        return self.travelTo(self.parseTravel(cmd_str), conf.getPosition())
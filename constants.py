@@ -13,12 +13,59 @@ RIGHTCOMMAND = "RIGHT"
 MOVECOMMAND = "MOVE"
 REPORTCOMMAND = "REPORT"
 TRAVELCOMMAND = "TRAVEL"
-COMMANDS = [PLACECOMMAND,LEFTCOMMAND,RIGHTCOMMAND,MOVECOMMAND,REPORTCOMMAND,TRAVELCOMMAND] # commands allowed
+BLOCKCOMMAND = "BLOCK"
+UNBLOCKCOMMAND = "UNBLOCK"
+STATSCOMMAND = "STATS"
+NEARESTCOMMAND = "NEAREST"
+COMMANDS = [PLACECOMMAND,LEFTCOMMAND,RIGHTCOMMAND,MOVECOMMAND,REPORTCOMMAND,TRAVELCOMMAND,
+            BLOCKCOMMAND,UNBLOCKCOMMAND,STATSCOMMAND,NEARESTCOMMAND] # commands allowed
+PATHSRESULT = "PATHS" # result of a TRAVEL command with several destinations
 INIT_DIRECTION = None # No initial direction for the robot
 INIT_POSITION = (-1,-1) # initial out of the table position of robot
+INIT_CELL = -1 # initial out of the table position of robot, packed as a cell index
+INIT_HEADING = -1 # no initial heading (index of the direction in DIRECTIONS) for the robot
 GRID_HEIGHT = 5 # height of the table
 GRID_WIDTH = 5 # width of the table
 GRID_POTHOLES = [(1,1),(2,0),(0,2),(1,2),(3,3)]
+PATH_CACHE_SIZE = 1024 # number of TRAVEL paths kept in the path cache
+SEARCH_BFS = "bfs" # breadth first search, the default search of TRAVEL
+SEARCH_HPA = "hpa" # hierarchical search over clusters of the table (see hpa.py)
+SEARCH_JPS = "jps" # jump point search, shortest paths with fewer expansions than breadth first search (see jps.py)
+SEARCHES = [SEARCH_BFS,SEARCH_HPA,SEARCH_JPS] # searches TRAVEL can use
+HPA_CLUSTER_SIZE = 32 # width and height of the clusters of the hierarchical search
+STATS_UNKNOWN = "UNKNOWN" # name under which the statistics count unknown commands
+
+# opcodes of compiled command programs (see program.py)
+OP_PLACE = 0
+OP_TURN = 1 # run of LEFT/RIGHT commands, operand is the number of quarter turns to the right
+OP_MOVE = 2 # run of MOVE commands, operand is the number of steps
+OP_REPORT = 3
+OP_TRAVEL = 4
+OP_TRAVEL_ERROR = 5 # TRAVEL command with invalid arguments
+OP_ERROR = 6 # line that can not be executed, e.g. unknown command
+OP_MOVE_ERROR = 7 # MOVE command with invalid arguments, ignored until the robot is placed
+OP_BLOCK = 8
+OP_UNBLOCK = 9
+OP_STATS = 10
+OP_TRAVEL_MANY = 11 # TRAVEL command with several destinations
+OP_NEAREST = 12
+# status codes of the commands rejected by a simulator in result code mode (strict=False), named
+# after the exceptions raised for them in strict mode
+STATUS_OK = 0
+STATUS_COMMAND_NOT_FOUND = 1
+STATUS_INVALID_FORMAT = 2
+STATUS_ILLEGAL_COORDINATE = 3
+STATUS_NOT_PLACED = 4
+STATUS_NO_PATH = 5
+STATUS_STATS_NOT_ENABLED = 6
+STATUS_ERROR = 7 # any other error
+STATUSES = ["OK", "CommandNotFoundError", "InvalidCommandFormatError", "IllegalCoordinateError",
+            "RobotNotPlacedOnTable", "NoPathToDestination", "StatsNotEnabledError", "Error"]
+MAX_STEPS = 1 << 62 # longest run of steps kept by a compiled MOVE instruction
+PROGRAM_CHUNK = 65536 # number of lines compiled and run at a time when reading a stream
+READ_BLOCK = 1 << 20 # number of bytes of a memory mapped file split into lines at a time
+CHECKPOINT_EVERY = 1000000 # number of lines between two checkpoints of a replay
+BATCH_TIMEOUT = 600.0 # seconds a file of a batch may run before its process is terminated
 
 
 ### for basic
@@ -0,0 +1,146 @@
+# dstar.py
+# ------------------------------
+# Author: Ankita Dhar <githubid: ankitadhar>
+
+from heapq import heappush, heappop
+
+INFINITY = float('inf')
+
+class DStarLite:
+    """
+    D* Lite planner (Koenig and Likhachev) from a moving start position to a fixed goal on a Grid.
+
+    The search runs backwards from the goal and keeps its cost estimates (g, rhs) between queries.
+    When potholes change, updateCell only re-examines the cells whose cost to the goal is affected,
+    and when the robot moves the estimates are reused through the key modifier km, so repairing a
+    plan costs in proportion to the change rather than to the size of the table. The first query of a
+    new plan searches from the goal only until the cost estimate of the start position is settled.
+    Cells are identified by their index in the cells of the grid.
+    """
+    def __init__(self, grid, start, goal):
+        self.grid = grid
+        self.width = grid.width
+        self.size = len(grid.cells)
+        self.start = grid.index(start)
+        self.goal = grid.index(goal)
+        self.last = self.start
+        self.km = 0
+        self.g = {}
+        self.rhs = {self.goal: 0}
+        self.queued = {}
+        self.queue = []
+        self.expanded = 0
+        self._push(self.goal)
+
+    def _h(self, a, b):
+        ya, xa = divmod(a, self.width)
+        yb, xb = divmod(b, self.width)
+        return abs(xa - xb) + abs(ya - yb)
+
+    def _neighbours(self, i):
+        """
+        returns the free cells adjacent to cell i
+        """
+        width = self.width
+        cells = self.grid.cells
+        x = i % width
+        return [j for j in (i + width if i + width < self.size else -1,
+                            i + 1 if x < width - 1 else -1,
+                            i - width,
+                            i - 1 if x > 0 else -1)
+                if j >= 0 and cells[j] == 0]
+
+    def _key(self, i):
+        m = min(self.g.get(i, INFINITY), self.rhs.get(i, INFINITY))
+        return (m + self._h(self.start, i) + self.km, m)
+
+    def _push(self, i):
+        key = self._key(i)
+        self.queued[i] = key
+        heappush(self.queue, (key, i))
+
+    def _top(self):
+        """
+        returns the smallest (key, cell) of the queue, dropping the entries that are out of date
+        """
+        queue = self.queue
+        while queue:
+            key, i = queue[0]
+            if self.queued.get(i) == key: return key, i
+            heappop(queue)
+        return (INFINITY, INFINITY), None
+
+    def _updateVertex(self, i):
+        if i != self.goal:
+            best = INFINITY
+            if self.grid.cells[i] == 0:
+                g = self.g
+                for j in self._neighbours(i):
+                    cost = g.get(j, INFINITY) + 1
+                    if cost < best: best = cost
+            self.rhs[i] = best
+        self.queued.pop(i, None)
+        if self.g.get(i, INFINITY) != self.rhs.get(i, INFINITY):
+            self._push(i)
+
+    def computeShortestPath(self):
+        """
+        expands cells until the cost estimate of the start position is consistent
+        """
+        g, rhs = self.g, self.rhs
+        start = self.start
+        while True:
+            key, i = self._top()
+            if i is None: break
+            if not (key < self._key(start) or rhs.get(start, INFINITY) != g.get(start, INFINITY)): break
+            self.expanded += 1
+            new_key = self._key(i)
+            if key < new_key:
+                self._push(i)
+            elif g.get(i, INFINITY) > rhs.get(i, INFINITY):
+                g[i] = rhs[i]
+                self.queued.pop(i, None)
+                heappop(self.queue)
+                for j in self._neighbours(i):
+                    self._updateVertex(j)
+            else:
+                g[i] = INFINITY
+                self._updateVertex(i)
+                for j in self._neighbours(i):
+                    self._updateVertex(j)
+
+    def moveStart(self, start):
+        """
+        moves the start position of the plan, e.g. after the robot has moved
+        """
+        start = self.grid.index(start)
+        if start != self.start:
+            self.km += self._h(self.last, start)
+            self.last = self.start = start
+
+    def updateCell(self, pos):
+        """
+        repairs the plan after a pothole has been added or removed at pos
+        """
+        self.km += self._h(self.last, self.start)
+        self.last = self.start
+        i = self.grid.index(pos)
+        self._updateVertex(i)
+        x = i % self.width
+        for j in (i + self.width, i + 1 if x < self.width - 1 else -1, i - self.width, i - 1 if x > 0 else -1):
+            if 0 <= j < self.size: self._updateVertex(j)
+
+    def path(self, start):
+        """
+        returns the shortest path from start to the goal, None if no path exists
+        """
+        self.moveStart(start)
+        self.computeShortestPath()
+        g = self.g
+        i = self.start
+        if g.get(i, INFINITY) == INFINITY: return None
+        path = [self.grid.position(i)]
+        while i != self.goal:
+            i = min(self._neighbours(i), key=lambda j: g.get(j, INFINITY))
+            path.append(self.grid.position(i))
+        return path
@@ -0,0 +1,154 @@
+# fleet.py
+# ------------------------------
+# Author: Ankita Dhar <githubid: ankitadhar>
+
+from array import array
+from re import compile
+from commands import IllegalCoordinateError, InvalidCommandFormatError
+from simulator import RobotNotPlacedOnTable, CommandNotFoundError, CommandNotImplementedError
+import constants
+
+class Fleet:
+    """
+    A fleet of robots sharing one table.
+
+    Instead of one Simulator per robot, the cell index and the heading of every robot are kept in two
+    parallel arrays (index -1 for a robot that is not placed yet, headings are indexes in
+    constants.DIRECTIONS), and a command is applied to the whole fleet at once.
+    Moves follow the same rules as Commands.move: a robot stops before the edge of the table and before
+    potholes, robots do not block each other, and robots which are not placed ignore every command but PLACE.
+
+    Turns are applied to all the headings in C, by translating them through a table of the turned
+    headings (the headings of robots not placed yet are turned too, they are set again by PLACE).
+    Moves look up the ray table of the heading of each robot at its own cell, a gather the standard
+    library has no vectorized form of, so they loop over the robots placed so far (placed, in the order
+    they were first placed), skipping the ones that were never placed.
+    """
+    # headings after a right turn of 0, 1, 2 or 3 quarters, as translate tables
+    _turns = [bytes((heading + quarters) & 3 for heading in range(256)) for quarters in range(4)]
+
+    # robot number prefixed to a command line for a single robot, e.g. "12: MOVE 3"
+    _robotPrefix = compile(r"\s*(\d+)\s*:(.*)")
+
+    def __init__(self, grid, size):
+        self.grid = grid
+        self.size = size
+        self.cells = array('q', [-1]) * size
+        self.headings = bytearray(size)
+        self.placed = array('q')
+        # change of the cell index for one step towards each heading
+        self.strides = (grid.width, 1, -grid.width, -1)
+
+    def __len__(self):
+        return self.size
+
+    def place(self, robot, x, y, dir):
+        """
+        places one robot of the fleet at x, y facing dir, with the same checks as the PLACE command
+        """
+        if self.grid.isPothole((x, y)):
+            raise IllegalCoordinateError("Co-ordinates are one of the potholes.")
+        if not self.grid.isOnTable((x, y)):
+            raise IllegalCoordinateError("Co-ordinates are out of the table.")
+        if self.cells[robot] < 0: self.placed.append(robot)
+        self.cells[robot] = self.grid.index((x, y))
+        self.headings[robot] = constants.DIRECTIONS.index(dir)
+
+    def report(self, robot):
+        """
+        returns the position and direction of one robot of the fleet
+        """
+        i = self.cells[robot]
+        if i < 0: raise RobotNotPlacedOnTable("Robot not found on table.")
+        return self.grid.position(i), constants.DIRECTIONS[self.headings[robot]]
+
+    def reports(self):
+        """
+        returns the position and direction of every robot of the fleet, None for robots not placed yet
+        """
+        position = self.grid.position
+        directions = constants.DIRECTIONS
+        return [(position(i), directions[h]) if i >= 0 else None
+                for i, h in zip(self.cells, self.headings)]
+
+    def turn(self, quarters):
+        """
+        turns every placed robot right by quarters quarter turns (negative quarters turn left)
+        """
+        self.headings[:] = self.headings.translate(self._turns[quarters % 4])
+
+    def move(self, steps=1):
+        """
+        moves every placed robot steps cells forward, each one stopping before the edge of the table or a pothole
+        """
+        rays = self.grid.rayTables()
+        strides = self.strides
+        cells, headings = self.cells, self.headings
+        for robot in self.placed:
+            i = cells[robot]
+            h = headings[robot]
+            ahead = rays[h][i]
+            cells[robot] = i + (steps if steps < ahead else ahead) * strides[h]
+
+    def step(self, ops, args):
+        """
+        applies one command per robot: ops[robot] is constants.OP_MOVE (args[robot] steps) or
+        constants.OP_TURN (args[robot] quarter turns to the right); robots with any other opcode stay as they are.
+        """
+        rays = self.grid.rayTables()
+        strides = self.strides
+        cells, headings = self.cells, self.headings
+        move, turn = constants.OP_MOVE, constants.OP_TURN
+        for robot in self.placed:
+            op = ops[robot]
+            if op == move:
+                i = cells[robot]
+                h = headings[robot]
+                ahead = rays[h][i]
+                steps = args[robot]
+                cells[robot] = i + (steps if steps < ahead else ahead) * strides[h]
+            elif op == turn:
+                headings[robot] = (headings[robot] + args[robot]) & 3
+
+    def simulate(self, clip):
+        """
+        runs one command line on the fleet and returns the list of its results, as (command, value) tuples
+        to be written to an output sink (see sinks.py). PLACE, MOVE [N], LEFT, RIGHT and REPORT apply to
+        every robot of the fleet (REPORT returns one result per placed robot, in the order of the robots),
+        or to a single robot when the line starts with its number and a colon, e.g. "12: PLACE 3,4,NORTH".
+        As with the Simulator, robots which are not placed ignore MOVE, LEFT and RIGHT.
+        """
+        robots = None
+        prefix = self._robotPrefix.fullmatch(clip)
+        if prefix:
+            robot, clip = int(prefix.group(1)), prefix.group(2)
+            if robot >= self.size:
+                raise InvalidCommandFormatError("Robot " + str(robot) + " is not in the fleet.")
+            robots = [robot]
+        cmd, _, cmd_str = clip.strip().partition(" ")
+        cmd_str = "".join(cmd_str.split()) or None
+        grid = self.grid
+        if cmd == constants.PLACECOMMAND:
+            x, y, dir = grid.parsePlace(cmd_str)
+            for robot in (range(self.size) if robots is None else robots):
+                self.place(robot, x, y, dir)
+        elif cmd == constants.MOVECOMMAND:
+            steps = grid.parseMove(cmd_str)
+            if robots is None: self.move(steps)
+            elif self.cells[robots[0]] >= 0:
+                robot = robots[0]
+                self.cells[robot] = grid.moveCell(self.cells[robot], self.headings[robot], steps)
+        elif cmd in (constants.LEFTCOMMAND, constants.RIGHTCOMMAND):
+            quarters = 1 if cmd == constants.RIGHTCOMMAND else -1
+            if robots is None: self.turn(quarters)
+            elif self.cells[robots[0]] >= 0:
+                robot = robots[0]
+                self.headings[robot] = (self.headings[robot] + quarters) & 3
+        elif cmd == constants.REPORTCOMMAND:
+            if robots is not None: return [(cmd, self.report(robots[0]))]
+            return [(cmd, report) for report in self.reports() if report is not None]
+        elif cmd in constants.COMMANDS:
+            raise CommandNotImplementedError(cmd + ": Command not implemented in fleet mode.")
+        else:
+            raise CommandNotFoundError(cmd + ": command not found.")
+        return []
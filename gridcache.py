@@ -0,0 +1,129 @@
+# gridcache.py
+# ------------------------------
+# Author: Ankita Dhar <githubid: ankitadhar>
+#
+# On-disk cache of tables. Labelling the components of a large table and building its ray tables
+# costs far more than the short runs that often follow, so a table and the indexes derived from it are
+# saved to a file of the cache directory, named after the hash of the layout (see layoutKey), and a
+# later process creating a table with the same layout maps that file instead of computing them again.
+# A cache file holds a fixed size header (the magic bytes JGRD, the format version, the byte order and
+# the typecodes of the arrays, the width and height of the table, the next free component label and the
+# hash of the layout) followed by the cells, the component labels, the number of cells of every label
+# (64 bit integers, one per label below the next free one) and the four ray tables, each section
+# starting at a multiple of 8 bytes. The sections are copied out of the mapping, since the table updates
+# them in place on BLOCK and UNBLOCK.
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+MAGIC = b"JGRD"
+FORMAT_VERSION = 2
+SUFFIX = ".grid"
+# magic, version, little endian, typecodes of the labels and rays, width, height, next label, layout hash
+HEADER = struct.Struct("<4sB?ccQQQ32s")
+
+def layoutKey(width, height, cells):
+    """
+    returns the hash of a table layout (its dimensions and cells) as a hexadecimal string
+    """
+    digest = hashlib.sha256(struct.pack("<QQ", width, height))
+    digest.update(cells)
+    return digest.hexdigest()
+
+def cachePath(directory, width, height, cells):
+    """
+    returns the path of the cache file of a table layout in the cache directory
+    """
+    return os.path.join(directory, layoutKey(width, height, cells) + SUFFIX)
+
+def _aligned(offset):
+    return (offset + 7) & ~7
+
+def saveGrid(grid, directory):
+    """
+    writes the table, its component labels and its ray tables (built if needed) to the cache directory
+    and returns the path of the cache file. The file is written aside and renamed, so that processes
+    sharing the cache never map a partly written file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rays = grid.rayTables()
+    key = layoutKey(grid.width, grid.height, grid.cells)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, sys.byteorder == "little",
+                         grid.components.typecode.encode(), rays[0].typecode.encode(),
+                         grid.width, grid.height, grid._nextLabel, bytes.fromhex(key))
+    handle, temp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(handle, 'wb') as file:
+            file.write(header)
+            for section in [grid.cells, grid.components, grid._sizes] + rays:
+                file.write(bytes(_aligned(file.tell()) - file.tell()))
+                file.write(section)
+        filepath = os.path.join(directory, key + SUFFIX)
+        os.replace(temp, filepath)
+    except BaseException:
+        os.remove(temp)
+        raise
+    return filepath
+
+def loadGrid(grid, directory):
+    """
+    fills the component labels and ray tables of a table (whose cells are set) from its cache file in
+    the cache directory. Returns False, leaving the table untouched, if there is no cache file for its
+    layout or if the file can not be used (written by another version or on another platform, truncated,
+    or holding other cells).
+    """
+    filepath = cachePath(directory, grid.width, grid.height, grid.cells)
+    try:
+        file = open(filepath, 'rb')
+    except FileNotFoundError:
+        return False
+    with file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files can not be mapped
+            return False
+        view = memoryview(mapped)
+        try:
+            return _fill(grid, view, len(mapped))
+        finally:
+            view.release()
+            mapped.close()
+
+def _fill(grid, view, size):
+    """
+    fills the table from the mapped cache file view of size bytes, see loadGrid
+    """
+    if size < HEADER.size: return False
+    magic, version, little, labels, rays, width, height, next_label, _ = HEADER.unpack(view[:HEADER.size])
+    if (magic != MAGIC or version != FORMAT_VERSION or little != (sys.byteorder == "little")
+            or labels not in (b"B", b"H", b"I", b"L") or rays not in (b"H", b"I")
+            or (width, height) != (grid.width, grid.height)):
+        return False
+    count = width * height
+    sections = []
+    offset = HEADER.size
+    for typecode, items in [('B', count), (labels.decode(), count), ('q', next_label)] + [(rays.decode(), count)] * 4:
+        offset = _aligned(offset)
+        end = offset + items * array(typecode).itemsize
+        if end > size: return False
+        sections.append((typecode, offset, end))
+        offset = end
+    _, start, end = sections[0]
+    if view[start:end] != grid.cells: return False
+    arrays = []
+    for typecode, start, end in sections[1:]:
+        values = array(typecode)
+        values.frombytes(view[start:end])
+        arrays.append(values)
+    grid.components = arrays[0]
+    grid._sizes = arrays[1]
+    grid._nextLabel = next_label
+    grid.rays = arrays[2:]
+    grid._counts = array(arrays[2].typecode, range(max(width, height)))
+    return True
@@ -0,0 +1,254 @@
+# hpa.py
+# ------------------------------
+# Author: Ankita Dhar <githubid: ankitadhar>
+
+from collections import deque
+from heapq import heappush, heappop
+import sys
+import time
+
+class HierarchicalPlanner:
+    """
+    Hierarchical path finding (HPA*) for large tables.
+
+    The table is split into square clusters of cluster_size cells. Along the border of every two
+    adjacent clusters, each run of cells that are free on both sides is an entrance, crossed at its
+    middle (or at both ends if it is long). The cells on both sides of the crossings are the nodes of
+    an abstract graph whose edges are the crossings themselves (cost 1) and the distances between the
+    nodes of a same cluster, found by searches limited to the cluster.
+
+    A query links the start and goal positions to the nodes of their clusters, searches the abstract
+    graph with A*, and refines each abstract edge with a search limited to one cluster. Paths are not
+    always the shortest ones, but only the cells of a few clusters are visited per query.
+    The planner is rebuilt when the version of the table changes.
+    """
+    # entrances at least this wide are crossed at both ends instead of the middle
+    WIDE_ENTRANCE = 6
+
+    def __init__(self, grid, cluster_size):
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.expanded = 0
+        self.build()
+
+    def build(self):
+        """
+        finds the entrances of the clusters and the distances between them
+        """
+        started = time.perf_counter()
+        grid = self.grid
+        self.version = grid.version
+        self.width = grid.width
+        self.height = grid.height
+        self.edges = {}
+        self.clusterNodes = {}
+        size = self.cluster_size
+        cells = grid.cells
+        width = self.width
+        columns = (self.width + size - 1) // size
+        rows = (self.height + size - 1) // size
+
+        for cy in range(rows):
+            for cx in range(columns):
+                x0, y0 = cx * size, cy * size
+                x1, y1 = min(x0 + size, self.width), min(y0 + size, self.height)
+                if x1 < self.width:
+                    # border with the cluster to the east
+                    self._addEntrances([y * width + x1 - 1 for y in range(y0, y1)], 1)
+                if y1 < self.height:
+                    # border with the cluster to the north
+                    self._addEntrances([(y1 - 1) * width + x for x in range(x0, x1)], width)
+
+        for (cx, cy), nodes in self.clusterNodes.items():
+            bounds = self._bounds(cx, cy)
+            for k, node in enumerate(nodes):
+                # distances are symmetric, only the nodes after this one are searched for
+                distances = self._distances(node, bounds, nodes[k + 1:])
+                for other, distance in distances.items():
+                    self.edges[node][other] = distance
+                    self.edges[other][node] = distance
+
+        self.precompute_seconds = time.perf_counter() - started
+
+    def _addEntrances(self, border, step):
+        """
+        adds the crossings of the runs of free cells along a border. border lists the cells on the
+        west (or south) side, the cell across is step further.
+        """
+        cells = self.grid.cells
+        run = []
+        for i in border + [None]:
+            if i is not None and cells[i] == 0 and cells[i + step] == 0:
+                run.append(i)
+                continue
+            if run:
+                crossings = [run[0], run[-1]] if len(run) >= self.WIDE_ENTRANCE else [run[len(run) // 2]]
+                for a in crossings:
+                    b = a + step
+                    self._addNode(a)
+                    self._addNode(b)
+                    self.edges[a][b] = 1
+                    self.edges[b][a] = 1
+                run = []
+
+    def _addNode(self, i):
+        if i not in self.edges:
+            self.edges[i] = {}
+            self.clusterNodes.setdefault(self._cluster(i), []).append(i)
+
+    def _cluster(self, i):
+        y, x = divmod(i, self.width)
+        return (x // self.cluster_size, y // self.cluster_size)
+
+    def _bounds(self, cx, cy):
+        size = self.cluster_size
+        return (cx * size, cy * size, min((cx + 1) * size, self.width), min((cy + 1) * size, self.height))
+
+    def _distances(self, source, bounds, targets):
+        """
+        returns the distances from source to the targets reachable within bounds. The search goes level
+        by level over a local copy of the cluster and stops as soon as every target has been reached.
+        """
+        x0, y0, x1, y1 = bounds
+        width, local_width = self.width, x1 - x0
+        cells = self.grid.cells
+        # free cells of the cluster, 1 once visited
+        visited = bytearray()
+        for y in range(y0, y1):
+            visited += cells[y * width + x0:y * width + x1]
+        wanted = {}
+        for t in targets:
+            y, x = divmod(t, width)
+            wanted[(y - y0) * local_width + x - x0] = t
+        y, x = divmod(source, width)
+        start = (y - y0) * local_width + x - x0
+        visited[start] = 1
+        size = len(visited)
+        distances = {}
+        frontier = [start]
+        d = 0
+        while frontier and len(distances) < len(wanted):
+            d += 1
+            level = []
+            for i in frontier:
+                x = i % local_width
+                for j in (i + local_width if i + local_width < size else -1, i + 1 if x + 1 < local_width else -1,
+                          i - local_width, i - 1 if x > 0 else -1):
+                    if j >= 0 and not visited[j]:
+                        visited[j] = 1
+                        level.append(j)
+                        if j in wanted: distances[wanted[j]] = d
+            self.expanded += len(frontier)
+            frontier = level
+        return distances
+
+    def _search(self, source, bounds, target=None):
+        """
+        breadth first search from source limited to the cells within bounds (x0, y0, x1, y1, the
+        upper bounds excluded). Returns the parent pointers and the distances of the visited cells;
+        the search stops early once target is reached.
+        """
+        x0, y0, x1, y1 = bounds
+        width = self.width
+        cells = self.grid.cells
+        parents = {source: -1}
+        distances = {source: 0}
+        frontier = deque([source])
+        while frontier:
+            i = frontier.popleft()
+            self.expanded += 1
+            if i == target: break
+            y, x = divmod(i, width)
+            d = distances[i] + 1
+            for j, inside in ((i + width, y + 1 < y1), (i + 1, x + 1 < x1),
+                              (i - width, y > y0), (i - 1, x > x0)):
+                if inside and cells[j] == 0 and j not in parents:
+                    parents[j] = i
+                    distances[j] = d
+                    frontier.append(j)
+        return parents, distances
+
+    def _localPath(self, source, target, bounds):
+        """
+        returns the cells of the shortest path from source to target within bounds, None if there is none
+        """
+        parents = self._search(source, bounds, target)[0]
+        if target not in parents: return None
+        path = []
+        i = target
+        while i != -1:
+            path.append(i)
+            i = parents[i]
+        path.reverse()
+        return path
+
+    def path(self, start, goal):
+        """
+        returns a path from start to goal, None if there is no path
+        """
+        if self.version != self.grid.version: self.build()
+        grid = self.grid
+        source, target = grid.index(start), grid.index(goal)
+        source_cluster, target_cluster = self._cluster(source), self._cluster(target)
+        if source_cluster == target_cluster:
+            cells = self._localPath(source, target, self._bounds(*source_cluster))
+            if cells is not None: return [grid.position(i) for i in cells]
+
+        # links from the start position to the nodes of its cluster, and from the nodes of the
+        # goal cluster to the goal position
+        distances = self._search(source, self._bounds(*source_cluster))[1]
+        start_edges = {n: distances[n] for n in self.clusterNodes.get(source_cluster, ()) if n in distances}
+        start_edges.update(self.edges.get(source, {}))
+        distances = self._search(target, self._bounds(*target_cluster))[1]
+        goal_edges = {n: distances[n] for n in self.clusterNodes.get(target_cluster, ()) if n in distances}
+
+        width = self.width
+        gy, gx = divmod(target, width)
+        def h(i):
+            y, x = divmod(i, width)
+            return abs(x - gx) + abs(y - gy)
+
+        costs = {source: 0}
+        parents = {source: None}
+        queue = [(h(source), 0, source)]
+        while queue:
+            f, g, node = heappop(queue)
+            if node == target: break
+            if g > costs[node]: continue
+            self.expanded += 1
+            links = list((start_edges if node == source else self.edges.get(node, {})).items())
+            if node in goal_edges: links.append((target, goal_edges[node]))
+            for other, cost in links:
+                new_cost = g + cost
+                if new_cost < costs.get(other, float('inf')):
+                    costs[other] = new_cost
+                    parents[other] = node
+                    heappush(queue, (new_cost + h(other), new_cost, other))
+        if target not in parents: return None
+
+        nodes = []
+        node = target
+        while node is not None:
+            nodes.append(node)
+            node = parents[node]
+        nodes.reverse()
+
+        # refine every abstract edge into cells, searching only the cluster of the edge
+        cells = [source]
+        for a, b in zip(nodes, nodes[1:]):
+            if self._cluster(a) != self._cluster(b):
+                cells.append(b)
+            else:
+                cells.extend(self._localPath(a, b, self._bounds(*self._cluster(a)))[1:])
+        return [grid.position(i) for i in cells]
+
+    def stats(self):
+        """
+        returns the size of the abstract graph, the time taken to build it and an estimate of its memory
+        """
+        memory = sys.getsizeof(self.edges) + sys.getsizeof(self.clusterNodes)
+        memory += sum(sys.getsizeof(edges) for edges in self.edges.values())
+        memory += sum(sys.getsizeof(nodes) for nodes in self.clusterNodes.values())
+        return {"cluster_size": self.cluster_size, "clusters": len(self.clusterNodes),
+                "nodes": len(self.edges), "edges": sum(len(edges) for edges in self.edges.values()),
+                "precompute_seconds": self.precompute_seconds, "memory_bytes": memory}
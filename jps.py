@@ -0,0 +1,151 @@
+# jps.py
+# ------------------------------
+# Author: Ankita Dhar <githubid: ankitadhar>
+
+from heapq import heappush, heappop
+
+class JumpPointSearch:
+    """
+    Jump Point Search for the 4-connected, uniform cost table.
+
+    Among shortest paths, only the ones that turn from a horizontal to a vertical move when they
+    have to are searched: a horizontal move may turn up (or down) only where the cell above (or
+    below) the previous cell is a pothole or off the table, while a vertical move may turn left or
+    right anywhere. Straight moves that can not reach a turn of that kind are jumped over in one
+    go, so on open tables only a few cells (jump points) are put in the A* queue.
+    The paths found are as short as the ones of breadth first search.
+    """
+    def __init__(self, grid):
+        self.grid = grid
+        self.expanded = 0
+
+    def _jumpHorizontal(self, i, step, goal):
+        """
+        moves from i along its row by step (1 or -1) and returns the first jump point, None if
+        the move runs into a pothole or the edge of the table first.
+        The row and the rows above and below are scanned with bytes searches instead of cell by cell:
+        the pothole ending the move, the goal, and the first cell whose neighbour above (or below)
+        is free while the one before it is a pothole.
+        """
+        width = self.grid.width
+        cells = self.grid.cells
+        size = len(cells)
+        row = i - i % width
+        candidates = []
+        if step == 1:
+            # cells i + 1 to end - 1 can be reached
+            end = cells.find(1, i + 1, row + width)
+            if end == -1: end = row + width
+            if end == i + 1: return None
+            if i < goal < end: candidates.append(goal)
+            for offset in (width, -width):
+                if 0 <= row + offset < size:
+                    p = cells.find(b'\x01\x00', i + offset, end + offset)
+                    if p != -1: candidates.append(p + 1 - offset)
+            return min(candidates) if candidates else None
+        # cells start + 1 to i - 1 can be reached
+        start = cells.rfind(1, row, i)
+        if start == -1: start = row - 1
+        if start == i - 1: return None
+        if start < goal < i: candidates.append(goal)
+        for offset in (width, -width):
+            if 0 <= row + offset < size:
+                p = cells.rfind(b'\x00\x01', start + 1 + offset, i + 1 + offset)
+                if p != -1: candidates.append(p - offset)
+        return max(candidates) if candidates else None
+
+    def _jumpVertical(self, i, step, goal):
+        """
+        moves from i along its column by step (width or -width) and returns the first jump point:
+        the goal, or a cell from which a horizontal jump finds a jump point
+        """
+        cells = self.grid.cells
+        size = len(cells)
+        while True:
+            n = i + step
+            if n < 0 or n >= size or cells[n]: return None
+            if n == goal: return n
+            if (self._jumpHorizontal(n, 1, goal) is not None
+                    or self._jumpHorizontal(n, -1, goal) is not None): return n
+            i = n
+
+    def _successors(self, i, step, goal):
+        """
+        returns the (jump point, step) pairs reachable from i, which was reached moving by step
+        (0 for the start position)
+        """
+        width = self.grid.width
+        cells = self.grid.cells
+        size = len(cells)
+        if step == 0:
+            horizontal, vertical = (1, -1), (width, -width)
+        elif step in (1, -1):
+            horizontal = (step,)
+            # vertical turns are only allowed where the cell next to the previous cell is blocked
+            vertical = tuple(v for v in (width, -width)
+                             if 0 <= i + v < size and cells[i + v] == 0
+                             and (not 0 <= i - step + v < size or cells[i - step + v]))
+        else:
+            horizontal, vertical = (1, -1), (step,)
+        successors = []
+        for h in horizontal:
+            n = self._jumpHorizontal(i, h, goal)
+            if n is not None: successors.append((n, h))
+        for v in vertical:
+            n = self._jumpVertical(i, v, goal)
+            if n is not None: successors.append((n, v))
+        return successors
+
+    def path(self, start, goal):
+        """
+        returns the shortest path from start to goal, None if there is no path
+        """
+        grid = self.grid
+        width = grid.width
+        source, target = grid.index(start), grid.index(goal)
+        if source == target: return [start]
+        gy, gx = divmod(target, width)
+
+        def distance(a, b):
+            ya, xa = divmod(a, width)
+            yb, xb = divmod(b, width)
+            return abs(xa - xb) + abs(ya - yb)
+
+        # states are (cell, step the cell was reached with), since the successors depend on both
+        first = (source, 0)
+        costs = {first: 0}
+        parents = {first: None}
+        # among equal estimates the deepest state is expanded first, there are many ties on open tables
+        queue = [(distance(source, target), 0, source, 0)]
+        found = None
+        while queue:
+            f, g, i, step = heappop(queue)
+            g = -g
+            if g > costs[(i, step)]: continue
+            if i == target:
+                found = (i, step)
+                break
+            self.expanded += 1
+            for n, s in self._successors(i, step, target):
+                cost = g + distance(i, n)
+                if cost < costs.get((n, s), float('inf')):
+                    costs[(n, s)] = cost
+                    parents[(n, s)] = (i, step)
+                    heappush(queue, (cost + distance(n, target), -cost, n, s))
+        if found is None: return None
+
+        jump_points = []
+        state = found
+        while state is not None:
+            jump_points.append(state[0])
+            state = parents[state]
+        jump_points.reverse()
+
+        # fill in the cells between consecutive jump points, which lie on a same row or column
+        cells = [source]
+        for a, b in zip(jump_points, jump_points[1:]):
+            step = (1 if b > a else -1) if a // width == b // width else (width if b > a else -width)
+            while a != b:
+                a += step
+                cells.append(a)
+        return [grid.position(i) for i in cells]
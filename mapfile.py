@@ -0,0 +1,160 @@
+# mapfile.py
+# ------------------------------
+# Author: Ankita Dhar <githubid: ankitadhar>
+#
+# Map files giving the dimensions and the potholes of the table, instead of constants.GRID_WIDTH,
+# GRID_HEIGHT and GRID_POTHOLES. Two formats are read, both drawn with the NORTH most row first:
+#   - ASCII grids: one line per row of the table, "." for a free cell and "#" for a pothole. All the
+#     rows have to be as long as each other; empty lines at the end of the file are ignored.
+#   - binary PGM images (P5): one pixel per cell, dark pixels (below half of the maximum value) are
+#     potholes, as in the occupancy maps of robot navigation stacks.
+# Maps are read a block of rows at a time and translated in C straight into the cells of a robo.Grid,
+# so that memory use stays close to the size of the table itself.
+#
+# python __main__.py --map floor.pgm --inputfile commands.txt
+
+import constants
+
+class MapFormatError(Exception):
+    """
+    Exception to handle malformed map files, or maps whose dimensions are not consistent
+    """
+    pass
+
+PGM_MAGIC = b"P5"
+# cell values of the characters of ASCII grids, 2 for the characters not allowed in a map
+_asciiCells = bytes(0 if c == ord(".") else 1 if c == ord("#") else 2 for c in range(256))
+
+def loadMap(filepath, block=constants.READ_BLOCK):
+    """
+    reads a map file (ASCII grid or binary PGM image) and returns the width and height of the table
+    and its cells, as taken by robo.Grid (one byte per cell indexed by y * width + x, 1 for potholes)
+    """
+    with open(filepath, 'rb') as file:
+        if file.read(2) == PGM_MAGIC:
+            return _readPGM(file, block)
+        file.seek(0)
+        return _readASCII(file, block)
+
+def _splitRows(file, block):
+    """
+    yields the lines of file without their line ending, reading it block bytes at a time
+    """
+    rest = b""
+    while True:
+        data = file.read(block)
+        if not data: break
+        if rest: data = rest + data
+        end = data.rfind(b"\n")
+        if end == -1:
+            # a line longer than the block
+            rest = data
+            continue
+        rest = data[end + 1:]
+        for row in data[:end].split(b"\n"):
+            yield row.rstrip(b"\r")
+    if rest: yield rest.rstrip(b"\r")
+
+def _readASCII(file, block):
+    """
+    reads an ASCII grid from file, block bytes at a time
+    """
+    cells = bytearray()
+    width = None
+    blank = 0
+    for number, row in enumerate(_splitRows(file, block), 1):
+        if not row:
+            blank += 1
+            continue
+        if blank:
+            raise MapFormatError("Line " + str(number - 1) + ": empty row inside the map.")
+        if width is None: width = len(row)
+        elif len(row) != width:
+            raise MapFormatError("Line " + str(number) + ": row of " + str(len(row)) +
+                                 " cells in a map " + str(width) + " cells wide.")
+        row = row.translate(_asciiCells)
+        if 2 in row:
+            raise MapFormatError("Line " + str(number) + ": cells have to be '.' or '#'.")
+        cells += row
+    if width is None:
+        raise MapFormatError("The map has no rows.")
+    height = len(cells) // width
+    _flipRows(cells, width, height)
+    return width, height, cells
+
+def _flipRows(cells, width, height):
+    """
+    reverses the order of the rows of cells in place, so that the first row drawn is the NORTH most one
+    """
+    for y in range(height // 2):
+        top, bottom = y * width, (height - 1 - y) * width
+        cells[top:top + width], cells[bottom:bottom + width] = cells[bottom:bottom + width], cells[top:top + width]
+
+def _readHeader(file, count):
+    """
+    reads count integers of a PGM header (after the magic number), skipping whitespace and comments,
+    and the single whitespace byte ending the header
+    """
+    values = []
+    token = b""
+    while True:
+        c = file.read(1)
+        if c == b"#" and not token:
+            file.readline()
+            continue
+        if c.isdigit():
+            token += c
+            continue
+        if not c or not c.isspace():
+            raise MapFormatError("Malformed PGM header.")
+        if token:
+            values.append(int(token))
+            token = b""
+            if len(values) == count: return values
+
+def _readPGM(file, block):
+    """
+    reads the header and the raster of a binary PGM image from file (after its magic number), a block
+    of rows at a time
+    """
+    width, height, maxval = _readHeader(file, 3)
+    if width <= 0 or height <= 0 or not 0 < maxval < 1 << 16:
+        raise MapFormatError("PGM dimensions or maximum value out of range.")
+    depth = 1 if maxval < 256 else 2
+    # pixels below half of maxval are potholes
+    half = (maxval + 1) // 2
+    table = bytes(1 if value < half else 0 for value in range(256))
+    if depth == 2:
+        # 16 bit pixels (big endian) are below half if their high byte is below the high byte of half,
+        # or equal to it with a low byte below the low byte of half
+        high = bytes(1 if value < half >> 8 else 0 for value in range(256))
+        boundary = bytes(1 if value == half >> 8 else 0 for value in range(256))
+        table = bytes(1 if value < half & 0xff else 0 for value in range(256))
+    cells = bytearray(width * height)
+    rows = max(1, block // (width * depth))
+    for y in range(0, height, rows):
+        count = min(rows, height - y)
+        data = file.read(count * width * depth)
+        if len(data) != count * width * depth:
+            raise MapFormatError("The PGM raster is shorter than " + str(width) + " x " + str(height) + " pixels.")
+        if depth == 2: data = _below(data[::2], data[1::2], high, boundary, table)
+        else: data = data.translate(table)
+        for r in range(count):
+            # row y + r of the image is row height - 1 - y - r of the table
+            offset = (height - 1 - y - r) * width
+            cells[offset:offset + width] = data[r * width:(r + 1) * width]
+    if file.read(1):
+        raise MapFormatError("The PGM raster is longer than " + str(width) + " x " + str(height) + " pixels.")
+    return width, height, cells
+
+def _below(highs, lows, high, boundary, low):
+    """
+    returns 1 for every 16 bit pixel (given by its high and low bytes) below a threshold, 0 otherwise:
+    the pixels whose high byte is below the one of the threshold, or equal to it (boundary) with a low
+    byte below the one of the threshold. The bytes are combined as big integers, so the whole block is
+    compared in C.
+    """
+    size = len(highs)
+    below = int.from_bytes(highs.translate(high), 'big')
+    below |= int.from_bytes(highs.translate(boundary), 'big') & int.from_bytes(lows.translate(low), 'big')
+    return below.to_bytes(size, 'big')
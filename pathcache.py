@@ -0,0 +1,66 @@
+# pathcache.py
+# ------------------------------
+# Author: Ankita Dhar <githubid: ankitadhar>
+
+from collections import OrderedDict
+
+class PathCache:
+    """
+    Bounded least recently used cache of TRAVEL paths, keyed by (start, destination, grid version).
+
+    The version of the table changes whenever a pothole is added or removed, so paths computed on an
+    older layout are never returned; the whole cache is also dropped on the first lookup after such a
+    change, since none of its entries can be used any more. Hits, misses, evictions (entries dropped
+    to make room) and invalidations (entries dropped because the layout changed) are counted.
+    A capacity of 0 disables the cache.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _checkVersion(self, version):
+        if version != self.version:
+            self.invalidations += len(self.entries)
+            self.entries.clear()
+            self.version = version
+
+    def get(self, start, end, version):
+        """
+        returns the cached path from start to end on the given version of the table, None if not cached
+        """
+        self._checkVersion(version)
+        key = (start, end, version)
+        path = self.entries.get(key)
+        if path is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return path
+
+    def put(self, start, end, version, path):
+        """
+        stores a path, dropping the least recently used one if the cache is full
+        """
+        if self.capacity <= 0: return
+        self._checkVersion(version)
+        self.entries[(start, end, version)] = path
+        self.entries.move_to_end((start, end, version))
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        """
+        returns the counters of the cache as a dictionary
+        """
+        return {"size": len(self.entries), "capacity": self.capacity, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions, "invalidations": self.invalidations}
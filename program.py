@@ -0,0 +1,76 @@
+# program.py
+# ------------------------------
+# Author: Ankita Dhar <githubid: ankitadhar>
+
+from array import array
+import constants
+
+class Program:
+    """
+    A command stream compiled into integer opcodes (see constants.OP_*) and operands.
+
+    Every instruction has one opcode in ops and three operands in args:
+        PLACE         <- x, y, index of the direction in constants.DIRECTIONS
+        TURN          <- number of quarter turns to the right (0 to 3)
+        MOVE          <- number of steps
+        TRAVEL        <- x, y of the destination
+        BLOCK         <- x, y of the new pothole
+        UNBLOCK       <- x, y of the pothole to remove
+        MOVE_ERROR    <- index of the argument error in errors
+        TRAVEL_MANY   <- index of the destinations in targets
+        NEAREST       <- index of the destinations in targets
+        TRAVEL_ERROR  <- index of the argument error in errors, index of the command in constants.COMMANDS (-1 for TRAVEL)
+        ERROR         <- index of the error in errors, index of the command in constants.COMMANDS (-1 if unknown)
+    The other instructions have no operands. Consecutive MOVE commands are stored as one MOVE
+    instruction, and consecutive LEFT/RIGHT commands as one TURN instruction. A program does not depend on the state of the robot
+    or of the table, so it can be run any number of times, from any starting configuration.
+    """
+    def __init__(self):
+        self.ops = array('B')
+        self.args = array('q')
+        self.errors = []
+        self.targets = []
+
+    def __len__(self):
+        return len(self.ops)
+
+    def append(self, op, a=0, b=0, c=0):
+        try:
+            self.args.extend((a, b, c))
+        except OverflowError:
+            # operands too large for the array, drop the ones already added
+            del self.args[3 * len(self.ops):]
+            raise
+        self.ops.append(op)
+
+    def appendMove(self, steps=1):
+        """
+        appends a MOVE command, extending the MOVE instruction at the end of the program if there is one
+        """
+        n = len(self.ops)
+        if n and self.ops[n - 1] == constants.OP_MOVE:
+            self.args[3 * n - 3] = min(self.args[3 * n - 3] + steps, constants.MAX_STEPS)
+        else:
+            self.append(constants.OP_MOVE, min(steps, constants.MAX_STEPS))
+
+    def appendTurn(self, quarters):
+        """
+        appends a turn by quarters quarter turns to the right (-1 for LEFT, 1 for RIGHT), merging it with
+        the TURN instruction at the end of the program if there is one
+        """
+        n = len(self.ops)
+        if n and self.ops[n - 1] == constants.OP_TURN:
+            self.args[3 * n - 3] = (self.args[3 * n - 3] + quarters) % 4
+        else:
+            self.append(constants.OP_TURN, quarters % 4)
+
+    def appendTargets(self, op, targets):
+        """
+        appends a command taking several destinations (TRAVEL_MANY or NEAREST), given as a list of (x, y)
+        """
+        self.append(op, len(self.targets))
+        self.targets.append(tuple(targets))
+
+    def appendError(self, op, error, command=-1):
+        self.append(op, len(self.errors), command)
+        self.errors.append(error)
@@ -2,6 +2,12 @@
 # ------------------------------
 # Author: Ankita Dhar <githubid: ankitadhar>
 
+from array import array
+from collections import deque
+from re import compile
+import gridcache
+import constants
+
 class IllegalGridStructure(Exception):
     """
     Exception to handle illegal grid structures
@@ -11,17 +17,420 @@ class IllegalGridStructure(Exception):
 class Grid:
     """
     Object to store the table structure
+
+    The table is kept as a bytearray with one byte per cell, indexed by y * width + x, where 1 marks
+    a pothole and 0 a free cell. Free cells are also labelled with the connected region (component)
+    they belong to, so that it can be told in constant time whether one cell can be reached from another.
+    Label 0 is used for potholes. The number of cells of every region is kept by label, so that when a
+    removed pothole joins regions only the smaller ones are labelled again.
+
+    For multi-step moves the table also keeps ray tables: for every free cell and each heading
+    (NORTH, EAST, SOUTH, WEST) the number of free cells ahead before the edge of the table or a pothole.
+    They are built the first time they are needed and updated row and column wise when a pothole changes.
+
+    version is incremented on every change of the potholes, so that results computed on the table
+    (e.g. cached paths) can tell whether they are still valid. toggled holds the indexes of the cells
+    that differ from the layout the table was created with, so that its state can be saved and restored.
+
+    If a cache directory is given, the component labels and ray tables are read from the cache file of
+    the layout when there is one, and written to it otherwise (see gridcache.py).
+
+    If another table of the same dimensions is given as layout, its cells, labels and ray tables are
+    shared instead of being built again, e.g. by the sessions of a server. The table takes its own copy
+    of them on its first change of the potholes, so the layout itself is never changed.
     """
-    def __init__(self, width, height, potholes):
+    # vectors to the adjacent cells a robot can step to
+    _steps = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+    # runs of free cells in a row of the table
+    _freeRun = compile(b"\x00+")
+
+    def __init__(self, width, height, potholes, cells=None, cache=None, layout=None):
         if width > 0 and height > 0:
+            self.width = width
+            self.height = height
             self.xmax = width - 1
             self.ymax = height - 1
-            self.potholes = potholes
             self.xmin = 0
             self.ymin = 0
+            self.version = 0
+            self.toggled = set()
+            if layout is not None:
+                if (layout.width, layout.height) != (width, height) or potholes or cells is not None:
+                    raise IllegalGridStructure("Table layout does not match the table dimensions.")
+                self._share(layout)
+                return
+            if cells is None:
+                cells = bytearray(width * height)
+            elif len(cells) != width * height:
+                raise IllegalGridStructure("Table layout does not match the table dimensions.")
+            self.cells = cells
+            self.rays = None
+            self.shared = False
+            for pos in potholes:
+                if not self.isOnTable(pos):
+                    raise IllegalGridStructure("Pothole " + str(pos) + " is out of the table.")
+                self.cells[self.index(pos)] = 1
+            if cache is None or not gridcache.loadGrid(self, cache):
+                self.labelComponents()
+                if cache is not None: gridcache.saveGrid(self, cache)
         else:
             raise IllegalGridStructure()
 
+    def _share(self, layout):
+        """
+        uses the cells and indexes of the layout table until the potholes change (see _own)
+        """
+        self.cells = layout.cells
+        self.components = layout.components
+        self._sizes = layout._sizes
+        self._nextLabel = layout._nextLabel
+        self.rays = layout.rays
+        if layout.rays is not None: self._counts = layout._counts
+        self.shared = True
+
+    def _own(self):
+        """
+        copies the cells and indexes shared with a layout table, before they are changed
+        """
+        if not self.shared: return
+        self.cells = bytearray(self.cells)
+        self.components = self.components[:]
+        self._sizes = self._sizes[:]
+        if self.rays is not None: self.rays = [rays[:] for rays in self.rays]
+        self.shared = False
+
+    def index(self, pos):
+        """
+        returns the index of the position in the cell array
+        """
+        x, y = pos
+        return y * self.width + x
+
+    def position(self, index):
+        """
+        returns the (x, y) position of an index of the cell array
+        """
+        y, x = divmod(index, self.width)
+        return (x, y)
+
+    def isOnTable(self, pos):
+        """
+        returns True if the position lies on the table
+        """
+        x, y = pos
+        return x >= self.xmin and x <= self.xmax and y >= self.ymin and y <= self.ymax
+
+    def isPothole(self, pos):
+        """
+        returns True if the position is on the table and is a pothole
+        """
+        return self.isOnTable(pos) and self.cells[self.index(pos)] == 1
+
+    def isFree(self, pos):
+        """
+        returns True if the position is on the table and is not a pothole
+        """
+        return self.isOnTable(pos) and self.cells[self.index(pos)] == 0
+
+    def potholes(self):
+        """
+        returns the list of all potholes on the table
+        """
+        cells = self.cells
+        return [self.position(i) for i in range(len(cells)) if cells[i]]
+
+    def _labelArray(self, count):
+        """
+        returns an empty label array with the smallest item size able to hold count labels
+        """
+        for typecode in ('B', 'H', 'I', 'L'):
+            if count < 1 << (8 * array(typecode).itemsize):
+                return array(typecode, bytes(array(typecode).itemsize * len(self.cells)))
+        raise IllegalGridStructure("Too many regions on the table.")
+
+    def labelComponents(self):
+        """
+        labels all the free cells of the table with their connected component.
+        The runs of free cells of each row are joined with the overlapping runs of the row below them
+        using union find, so the labelling costs one pass over the rows rather than one step per cell.
+        The runs are numbered in the order they are found, so the runs of a row follow the ones of the row
+        below, and their bounds and parents are kept in arrays of machine integers (24 bytes per run).
+        """
+        width = self.width
+        cells = self.cells
+        parent = array('q')
+        starts = array('q')
+        ends = array('q')
+
+        def find(r):
+            while parent[r] != r:
+                parent[r] = parent[parent[r]]
+                r = parent[r]
+            return r
+
+        # first run of the row below
+        below = 0
+        for y in range(self.height):
+            row = len(parent)
+            k = below
+            offset = y * width
+            for match in self._freeRun.finditer(cells, offset, offset + width):
+                a, b = match.span()
+                r = len(parent)
+                parent.append(r)
+                starts.append(a)
+                ends.append(b)
+                # join with the runs of the row below sharing at least one column
+                while k < row and ends[k] + width <= a:
+                    k += 1
+                j = k
+                while j < row and starts[j] + width < b:
+                    ra, rb = find(r), find(j)
+                    # the root with the larger number joins the other one, so a parent never follows its run
+                    if ra > rb: parent[ra] = rb
+                    elif ra < rb: parent[rb] = ra
+                    j += 1
+            below = row
+
+        # the parents are replaced by the negated labels of the runs in a single pass: the parent of a run
+        # that is not a root comes before it, so it already holds the label of the component
+        count = 0
+        for r in range(len(parent)):
+            p = parent[r]
+            if p == r:
+                count += 1
+                parent[r] = -count
+            else:
+                parent[r] = parent[p]
+        self.components = labels = self._labelArray(count + 1)
+        self._sizes = sizes = array('q', bytes(8 * (count + 1)))
+        fill = array(labels.typecode, [0])
+        for r, a, b in zip(parent, starts, ends):
+            fill[0] = -r
+            labels[a:b] = fill * (b - a)
+            sizes[-r] += b - a
+        self._nextLabel = count + 1
+
+    def _flood(self, start, label):
+        """
+        marks every free cell connected to start with the given label
+        """
+        width = self.width
+        cells = self.cells
+        labels = self.components
+        size = len(cells)
+        labels[start] = label
+        frontier = deque([start])
+        while frontier:
+            i = frontier.popleft()
+            x = i % width
+            for j in (i + width if i + width < size else -1,
+                      i + 1 if x < width - 1 else -1,
+                      i - width,
+                      i - 1 if x > 0 else -1):
+                if j >= 0 and labels[j] != label and cells[j] == 0:
+                    labels[j] = label
+                    frontier.append(j)
+
+    def _newLabel(self):
+        """
+        returns a fresh label, of a region of no cells so far. If the labels would overflow the label
+        array, the whole table is labelled again instead and None is returned.
+        """
+        if self._nextLabel >= 1 << (8 * self.components.itemsize):
+            self.labelComponents()
+            return None
+        label = self._nextLabel
+        self._nextLabel += 1
+        self._sizes.append(0)
+        return label
+
+    def _adjacent(self, i):
+        """
+        returns the free cells adjacent to cell i
+        """
+        width = self.width
+        cells = self.cells
+        x = i % width
+        return [j for j in (i + width if i + width < len(cells) else -1,
+                            i + 1 if x < width - 1 else -1,
+                            i - width,
+                            i - 1 if x > 0 else -1)
+                if j >= 0 and cells[j] == 0]
+
+    def _splitAt(self, i):
+        """
+        gives fresh labels to the parts of the region split by the new pothole at cell i.
+        A breadth first search is started from each free cell adjacent to i and the searches are expanded in
+        turns, one cell each: searches meeting each other are joined, and a group of joined searches that
+        runs out of cells has visited a whole part cut off from the others, which is labelled again. The
+        searches stop once a single group is left, so that the cost is in proportion to the smaller parts
+        (or to the detour around i) rather than to the size of the region, which keeps its label.
+        """
+        starts = self._adjacent(i)
+        if len(starts) < 2: return
+        labels = self.components
+        # label of the region being split, kept by the part of it the searches do not finish
+        old = labels[starts[0]]
+        owner = {j: s for s, j in enumerate(starts)}
+        frontiers = [deque([j]) for j in starts]
+        group = list(range(len(starts)))
+        active = set(group)
+
+        def find(s):
+            while group[s] != s:
+                group[s] = group[group[s]]
+                s = group[s]
+            return s
+
+        while len({find(s) for s in active}) > 1:
+            for s in list(active):
+                if not frontiers[s]: continue
+                for j in self._adjacent(frontiers[s].popleft()):
+                    if j not in owner:
+                        owner[j] = s
+                        frontiers[s].append(j)
+                    else:
+                        a, b = find(s), find(owner[j])
+                        if a != b: group[b] = a
+            for root in {find(s) for s in active}:
+                members = [s for s in active if find(s) == root]
+                if any(frontiers[s] for s in members): continue
+                # the group has no cells left to visit: it is a part of its own
+                active.difference_update(members)
+                label = self._newLabel()
+                if label is None: return
+                count = 0
+                for j, s in owner.items():
+                    if find(s) == root:
+                        labels[j] = label
+                        count += 1
+                self._sizes[label] = count
+                self._sizes[old] -= count
+
+    def component(self, pos):
+        """
+        returns the label of the component the position belongs to, None for potholes and off table positions
+        """
+        if not self.isFree(pos): return None
+        return self.components[self.index(pos)]
+
+    def sameRegion(self, a, b):
+        """
+        returns True if a path exists between the two positions
+        """
+        label = self.component(a)
+        return label is not None and label == self.component(b)
+
+    def rayTables(self):
+        """
+        returns the ray tables of the table, one array per heading indexed like the cells
+        """
+        if self.rays is None:
+            typecode = 'H' if max(self.width, self.height) <= 1 << 16 else 'I'
+            empty = bytes(array(typecode).itemsize * len(self.cells))
+            self.rays = [array(typecode, empty) for _ in self._steps]
+            # 0, 1, 2, ... sliced to fill the rays of each run of free cells
+            self._counts = array(typecode, range(max(self.width, self.height)))
+            for y in range(self.height):
+                self._rayRow(y, 0, self.width)
+            for x in range(self.width):
+                self._rayColumn(x, 0, self.height)
+        return self.rays
+
+    def _rayRow(self, y, a, b):
+        """
+        computes the EAST and WEST rays of the cells of row y between columns a (included) and b (excluded).
+        a and b have to be the edges of the table or potholes.
+        """
+        east, west = self.rays[1], self.rays[3]
+        offset = y * self.width
+        for match in self._freeRun.finditer(self.cells, offset + a, offset + b):
+            start, end = match.span()
+            east[start:end] = self._counts[end - start - 1::-1]
+            west[start:end] = self._counts[:end - start]
+
+    def _rayColumn(self, x, a, b):
+        """
+        computes the NORTH and SOUTH rays of the cells of column x between rows a (included) and b (excluded).
+        a and b have to be the edges of the table or potholes.
+        """
+        north, south = self.rays[0], self.rays[2]
+        width = self.width
+        column = self.cells[a * width + x:(b - 1) * width + x + 1:width]
+        for match in self._freeRun.finditer(column):
+            start, end = match.span()
+            cells = slice((a + start) * width + x, (a + end - 1) * width + x + 1, width)
+            north[cells] = self._counts[end - start - 1::-1]
+            south[cells] = self._counts[:end - start]
+
+    def _updateRays(self, pos):
+        """
+        updates the rays of the row and of the column of a position whose pothole has changed.
+        Only the free cells between the potholes nearest to the position are recomputed.
+        """
+        if self.rays is None: return
+        x, y = pos
+        i = self.index(pos)
+        if self.cells[i]:
+            for rays in self.rays: rays[i] = 0
+        offset = y * self.width
+        a = self.cells.rfind(1, offset, i)
+        b = self.cells.find(1, i + 1, offset + self.width)
+        self._rayRow(y, 0 if a == -1 else a + 1 - offset, self.width if b == -1 else b - offset)
+        column = self.cells[x::self.width]
+        a = column.rfind(1, 0, y) + 1
+        b = column.find(1, y + 1)
+        self._rayColumn(x, a, self.height if b == -1 else b)
+
+    def addPothole(self, pos):
+        """
+        adds a pothole to the table and updates the labelling of the region it may have split
+        """
+        if not self.isFree(pos): return
+        self._own()
+        i = self.index(pos)
+        self.cells[i] = 1
+        self.version += 1
+        self.toggled ^= {i}
+        self._sizes[self.components[i]] -= 1
+        self.components[i] = 0
+        self._updateRays(pos)
+        self._splitAt(i)
+
+    def removePothole(self, pos):
+        """
+        removes a pothole from the table and merges the regions it used to separate: the cell and the
+        smaller regions take the label of the largest one, so only the cells of the smaller ones are visited
+        """
+        if not self.isPothole(pos): return
+        self._own()
+        i = self.index(pos)
+        self.cells[i] = 0
+        self.version += 1
+        self.toggled ^= {i}
+        self._updateRays(pos)
+        labels = self.components
+        sizes = self._sizes
+        adjacent = self._adjacent(i)
+        if not adjacent:
+            # the cell is a region of its own
+            label = self._newLabel()
+            if label is None: return
+            labels[i] = label
+            sizes[label] = 1
+            return
+        keep = max({labels[j] for j in adjacent}, key=sizes.__getitem__)
+        labels[i] = keep
+        sizes[keep] += 1
+        for j in adjacent:
+            other = labels[j]
+            if other != keep:
+                sizes[keep] += sizes[other]
+                sizes[other] = 0
+                self._flood(j, keep)
+
 class Configuration:
     """
     A Configuration holds the (x,y) coordinate of a character, along with its
@@ -29,20 +438,48 @@ class Configuration:
 
     The convention for positions, like a graph, is that (0,0) is the lower left corner, x increases
     horizontally and y increases vertically.  Therefore, north is the direction of increasing y, or (0,1).
+
+    The position is kept packed as the index of its cell on a table of the given width (y * width + x,
+    constants.INIT_CELL when the character is not on the table) and the direction as its index in
+    constants.DIRECTIONS (constants.INIT_HEADING when there is none). The engine works on these integers
+    (getCell, getHeading, ...); getPosition and getDirection translate them to (x, y) and direction names.
     """
+    __slots__ = ('width', 'cell', 'heading')
 
-    def __init__(self, pos, direction):
-        self.pos = pos
-        self.direction = direction
+    # index of every direction in constants.DIRECTIONS
+    _headings = {dir: index for index, dir in enumerate(constants.DIRECTIONS)}
+
+    def __init__(self, pos, direction, width=constants.GRID_WIDTH):
+        self.width = width
+        self.setPosition(pos)
+        self.setDirection(direction)
 
     def getPosition(self):
-        return (self.pos)
+        if self.cell < 0: return constants.INIT_POSITION
+        y, x = divmod(self.cell, self.width)
+        return (x, y)
 
     def getDirection(self):
-        return self.direction
+        return constants.DIRECTIONS[self.heading] if self.heading >= 0 else constants.INIT_DIRECTION
 
     def setPosition(self, pos):
-        self.pos = pos
+        """
+        sets the position, which is either on the table or constants.INIT_POSITION
+        """
+        if pos == constants.INIT_POSITION: self.cell = constants.INIT_CELL
+        else: self.cell = pos[1] * self.width + pos[0]
 
     def setDirection(self, direction):
-        self.direction = direction
+        self.heading = self._headings[direction] if direction is not None else constants.INIT_HEADING
+
+    def getCell(self):
+        return self.cell
+
+    def getHeading(self):
+        return self.heading
+
+    def setCell(self, cell):
+        self.cell = cell
+
+    def setHeading(self, heading):
+        self.heading = heading
@@ -0,0 +1,81 @@
+# server.py
+# ------------------------------
+# Author: Ankita Dhar <githubid: ankitadhar>
+#
+# Server mode: the simulator is served over a TCP or Unix socket from one asyncio process.
+# Every connection is a session with its own Simulator; commands are sent one per line, may be
+# pipelined, and the results are sent back in the same format as the command line program prints them.
+
+import asyncio
+from commands import InvalidCommandFormatError
+from simulator import Simulator
+from sinks import SINKS
+
+class _WriterStream:
+    """
+    Text stream writing into an asyncio StreamWriter, as expected by the output sinks
+    """
+    def __init__(self, writer):
+        self.writer = writer
+
+    def write(self, text):
+        self.writer.write(text.encode())
+
+    def flush(self):
+        pass
+
+async def handleSession(reader, writer, factory=Simulator, format="text"):
+    """
+    runs one session: commands are read line by line until the client closes the connection or
+    sends 'exit'. Results are queued on the connection as soon as a command is run and the
+    connection is drained only when its write buffer is full, so pipelined commands are not
+    held back by the round trips of the previous ones. A line longer than the limit of the reader is
+    answered with an error and ends the session.
+    """
+    simulator = factory()
+    sink = SINKS[format](_WriterStream(writer), flush_every=1)
+    try:
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                # the line does not fit in the buffer of the reader
+                sink.error(InvalidCommandFormatError("Command line too long."))
+                await writer.drain()
+                break
+            if not line: break
+            clip = line.decode(errors="replace").rstrip('\r\n')
+            if "exit" == clip.lower(): break
+            try:
+                result = simulator.simulate(clip)
+                # in result code mode a rejected command returns its status code and is not reported
+                if type(result) is not int: sink.write(result)
+            except Exception as e:
+                sink.error(e)
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+async def startServer(host=None, port=None, path=None, factory=Simulator, format="text"):
+    """
+    starts a server listening on the Unix socket path if given, otherwise on host:port, and returns it
+    """
+    async def session(reader, writer):
+        await handleSession(reader, writer, factory, format)
+    if path:
+        return await asyncio.start_unix_server(session, path=path)
+    return await asyncio.start_server(session, host, port)
+
+async def serve(host=None, port=None, path=None, factory=Simulator, format="text"):
+    """
+    serves sessions until the process is stopped
+    """
+    server = await startServer(host, port, path, factory, format)
+    async with server:
+        await server.serve_forever()
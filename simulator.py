@@ -3,8 +3,14 @@
 # Author: Ankita Dhar <githubid: ankitadhar>
 
 
-from commands import Commands
+from commands import Commands, IllegalCoordinateError, InvalidCommandFormatError, NoPathToDestination
 from robo import Configuration
+from program import Program
+from tokenizer import tokenize, LINE_TOKENS
+from array import array
+from itertools import islice
+from re import compile
+from time import perf_counter
 import constants # constants for the program are defined here
 
 class CommandNotFoundError(Exception):
@@ -25,26 +31,70 @@ class RobotNotPlacedOnTable(Exception):
     """
     pass
 
+class StatsNotEnabledError(Exception):
+    """
+    Exception to handle STATS command when the simulator was created without statistics.
+    """
+    pass
+
 class Simulator:
     """
     Simulator class is an interface between the main function and the executable functions.
     This class accepts the command, removes all unnecessary spaces, extracts and identifies the commands
     and calls specific functions from the Commands class to execute the user's commands.
     After execution, the results are stored using Configuration class.
+
+    Streams of commands can also be compiled once into a Program of integer opcodes (compile) and
+    then run in a single loop (run), which skips the string handling done for each command by simulate.
+
+    If a Stats instance is given (see stats.py), every command is counted and timed, and the STATS
+    command returns the statistics collected so far.
+
+    In strict mode (the default) every rejected command produces an exception, raised by simulate and
+    written to the sink by run. With strict=False the simulator runs in result code mode: rejected
+    commands are checked without raising any exception and only counted, by status code (see
+    constants.STATUSES), in rejected; simulate returns the status code of a rejected command. A Program
+    is compiled for the mode of the simulator compiling it.
     """
-    def __init__(self):
-        grid_height = constants.GRID_HEIGHT
-        grid_width = constants.GRID_WIDTH
-        self.command = Commands(grid_width, grid_height, constants.GRID_POTHOLES)
+    # quarter turns to the right made by the turning commands
+    _turns = {constants.LEFTCOMMAND: -1, constants.RIGHTCOMMAND: 1}
+    # commands taking several destinations, and the spaces around the commas of their arguments
+    _targetCommands = (constants.TRAVELCOMMAND, constants.NEARESTCOMMAND)
+    _comma = compile(r"\s*,\s*")
+    # opcodes of the commands changing a cell of the table
+    _cellOpcodes = {constants.BLOCKCOMMAND: constants.OP_BLOCK, constants.UNBLOCKCOMMAND: constants.OP_UNBLOCK}
+    # commands of the opcodes, as counted by the statistics
+    _opCommands = {constants.OP_PLACE: constants.PLACECOMMAND, constants.OP_MOVE: constants.MOVECOMMAND,
+                   constants.OP_REPORT: constants.REPORTCOMMAND, constants.OP_TRAVEL: constants.TRAVELCOMMAND,
+                   constants.OP_TRAVEL_ERROR: constants.TRAVELCOMMAND, constants.OP_MOVE_ERROR: constants.MOVECOMMAND,
+                   constants.OP_BLOCK: constants.BLOCKCOMMAND, constants.OP_UNBLOCK: constants.UNBLOCKCOMMAND,
+                   constants.OP_STATS: constants.STATSCOMMAND, constants.OP_TRAVEL_MANY: constants.TRAVELCOMMAND,
+                   constants.OP_NEAREST: constants.NEARESTCOMMAND}
+
+    def __init__(self, width=constants.GRID_WIDTH, height=constants.GRID_HEIGHT,
+                 potholes=constants.GRID_POTHOLES, cells=None, path_cache_size=constants.PATH_CACHE_SIZE,
+                 search=constants.SEARCH_BFS, cluster_size=constants.HPA_CLUSTER_SIZE, stats=None, strict=True,
+                 grid_cache=None, layout=None):
+        self.command = Commands(width, height, potholes, cells, path_cache_size, search, cluster_size, grid_cache,
+                                layout)
         # instantiating Commands class with the grid height and width, on which commands are to be executed.
-        self.configuration = Configuration(constants.INIT_POSITION, constants.INIT_DIRECTION)
+        # the obstacle layout is given either as a list of potholes or as a bytearray of cells (see robo.Grid)
+        # and the table indexes are read from (or saved to) the grid_cache directory if one is given,
+        # or shared with the layout table until the first BLOCK or UNBLOCK
+        self.configuration = Configuration(constants.INIT_POSITION, constants.INIT_DIRECTION, width)
         # initializing the robot's position as out of the table and direction as None
+        self.stats = self.command.stats = stats
+        # statistics of the commands (see stats.py), None when instrumentation is disabled
+        self.strict = strict
+        self.rejected = array('q', bytes(8 * len(constants.STATUSES)))
+        # number of rejected commands by status code, counted in result code mode
 
     def executeCmd(self, cmd, cmd_str):
         """
         executeCmd identifies the commands and calls respective functions from Commands class instance.
         cmd <- command to execute
-        cmd_str <- arguments to the command (ignored if command is not PLACE)
+        cmd_str <- arguments to the command (ignored if command is not PLACE, MOVE, TRAVEL, BLOCK, UNBLOCK or NEAREST)
+        A TRAVEL command with several destinations returns the list of (destination, path) pairs.
         """
         # fetching current position and direction of the robot
         pos = self.configuration.getPosition()
@@ -52,18 +102,34 @@ class Simulator:
 
         if cmd == constants.REPORTCOMMAND:
             # if command is REPORT and the robot is not on the table, an exception is raised
-            # otherwise robot's position and direction is printed on the standard ouput
+            # otherwise robot's position and direction is returned to be reported
             if pos == constants.INIT_POSITION:
                 raise RobotNotPlacedOnTable("Robot not found on table.")
-            x, y = pos
-            print(str(x)+','+str(y)+','+dir)
         elif constants.TRAVELCOMMAND == cmd:
             # if command is TRAVEL and the robot is not on the table, an exception is raised
             # otherwise the path that can be travelled to reach the destination is returned
             if pos == constants.INIT_POSITION:
                 raise RobotNotPlacedOnTable("Robot not found on table.")
+            if self._severalTargets(cmd_str):
+                # the paths to all the destinations are found by one search
+                dests = self.command.parseTargets(cmd_str)
+                return list(zip(dests, self.command.travelMany(dests, pos)))
             path = self.command.travel(cmd_str, self.configuration)
             return path
+        elif constants.NEARESTCOMMAND == cmd:
+            # if command is NEAREST, the path to the nearest of the destinations is returned
+            if pos == constants.INIT_POSITION:
+                raise RobotNotPlacedOnTable("Robot not found on table.")
+            return self.command.nearest(self.command.parseTargets(cmd_str, cmd), pos)
+        elif constants.BLOCKCOMMAND == cmd:
+            # if command is BLOCK, a pothole is added to the table (whether the robot is placed or not)
+            self.command.block(self.command.parseTravel(cmd_str, cmd), pos)
+        elif constants.UNBLOCKCOMMAND == cmd:
+            # if command is UNBLOCK, a pothole is removed from the table
+            self.command.unblock(self.command.parseTravel(cmd_str, cmd), pos)
+        elif constants.STATSCOMMAND == cmd:
+            # if command is STATS, the statistics collected so far are returned
+            return self.statsReport()
         elif cmd != constants.PLACECOMMAND and pos == constants.INIT_POSITION:
             # All the commands (except PLACE command) are ignored until the robot is placed on the table.
             return (pos, dir)
@@ -74,8 +140,8 @@ class Simulator:
             # if command is RIGHT
             dir = self.command.turnRight(dir)
         elif constants.MOVECOMMAND == cmd:
-            # if command is MOVE
-            pos = self.command.move(pos, dir)
+            # if command is MOVE, the robot moves by the number of steps given in the argument (1 by default)
+            pos = self.command.moveBy(pos, dir, self.command.parseMove(cmd_str))
         elif constants.PLACECOMMAND == cmd:
             # if command is PLACE
             ret_val = self.command.place(cmd_str)
@@ -95,28 +161,369 @@ class Simulator:
         cmd = clip.split(" ",1)[0]
         if len(clip.split(" ",1)) > 1:
             cmd_str = clip.split(" ",1)[1]
-            cmd_str = "".join(cmd_str.split())
+            if cmd in self._targetCommands and cmd_str.count(",") > 1:
+                # several destinations, kept apart by single spaces
+                cmd_str = " ".join(self._comma.sub(",", cmd_str).split())
+            else:
+                cmd_str = "".join(cmd_str.split())
         
         return cmd, cmd_str
 
+    def _severalTargets(self, cmd_str):
+        """
+        returns True if the arguments extracted for a TRAVEL command hold several destinations
+        """
+        return cmd_str is not None and " " in cmd_str
+
+    def statsReport(self):
+        """
+        returns the statistics collected so far, with the counters of the path cache
+        """
+        if self.stats is None:
+            raise StatsNotEnabledError("Statistics are not enabled.")
+        report = self.stats.report()
+        report["path_cache"] = self.command.pathCache.stats()
+        if not self.strict: report["rejected"] = self.rejections()
+        return report
+
+    def rejections(self):
+        """
+        returns the number of commands rejected in result code mode, by name of the status code
+        """
+        return {constants.STATUSES[status]: count for status, count in enumerate(self.rejected) if count}
+
+    def _statusOf(self, error):
+        """
+        returns the status code of an exception
+        """
+        name = type(error).__name__
+        return constants.STATUSES.index(name) if name in constants.STATUSES else constants.STATUS_ERROR
+
     def simulate(self, clip):
         """
         simulate function takes the raw command from the main function and 
         co-ordinates between extractCmd function and executeCmd function.
+        Nothing is printed, the results of REPORT, TRAVEL and STATS commands are returned as (command, value)
+        tuples to be written to an output sink (see sinks.py); None is returned for the other commands.
+        If statistics are enabled, the command is counted and timed, and its error (if any) is counted.
+        In result code mode the command is compiled and run with the checks of run, so that no exception
+        is raised: a rejected command returns its status code (see constants.STATUSES) and is counted in
+        rejected.
         """
+        if not self.strict:
+            results, statuses = [], []
+            self._execute(self.compile((clip,)), results.append, self._failures(statuses.append))
+            if statuses: return statuses[0]
+            return results[0] if results else None
         cmd, cmd_str = self.extractCmd(clip)
+        stats = self.stats
+        if stats is None: return self.simulateCmd(cmd, cmd_str)
+        started = perf_counter()
+        try:
+            return self.simulateCmd(cmd, cmd_str)
+        except Exception as e:
+            stats.recordError(e)
+            raise
+        finally:
+            if stats is not None:
+                stats.record(cmd if cmd in constants.COMMANDS else constants.STATS_UNKNOWN, perf_counter() - started)
 
+    def simulateCmd(self, cmd, cmd_str):
+        """
+        simulateCmd executes an extracted command and returns its result as described in simulate.
+        """
         if cmd in constants.COMMANDS:
-            if cmd == constants.TRAVELCOMMAND:
-                # if command is TRAVEL a path will be returned
-                path = self.executeCmd(cmd, cmd_str)
-                print(f"path: {path}")
+            if cmd == constants.TRAVELCOMMAND or cmd == constants.STATSCOMMAND or cmd == constants.NEARESTCOMMAND:
+                # if command is TRAVEL (or NEAREST) a path will be returned, if it is STATS the statistics
+                value = self.executeCmd(cmd, cmd_str)
+                if cmd == constants.NEARESTCOMMAND: return (constants.TRAVELCOMMAND, value)
+                if cmd == constants.TRAVELCOMMAND and self._severalTargets(cmd_str):
+                    return (constants.PATHSRESULT, value)
+                return (cmd, value)
             else:
                 pos, dir = self.executeCmd(cmd, cmd_str)
                 # after executing the commands, update the configuration object 
                 # with new position and direction of the robot.
                 self.configuration.setPosition(pos)
                 self.configuration.setDirection(dir)
+                if cmd == constants.REPORTCOMMAND:
+                    return (cmd, (pos, dir))
         else:
             raise CommandNotFoundError(cmd + ": command not found.")
             
+
+
+    def compile(self, lines):
+        """
+        compile function turns an iterable of raw commands (strings, bytes encoded in UTF-8, or the
+        records of a binary log, see binlog.py) into a Program. Well formed lines are tokenized in a single pass (see tokenizer.py); the others go
+        through extractCmd and the patterns of Commands, with the same result. The arguments of PLACE and
+        TRAVEL commands are parsed once here; everything that depends on the table or on the robot
+        (potholes, robot not placed, ...) is checked when the program is run.
+        If statistics are enabled, runs of MOVE and LEFT/RIGHT commands are not merged, so that every
+        command keeps its own instruction to be counted and timed.
+        """
+        program = Program()
+        merge = self.stats is None
+        append = program.append
+        line_tokens = LINE_TOKENS
+        OP_MOVE, OP_TURN = constants.OP_MOVE, constants.OP_TURN
+        # run of MOVE or LEFT/RIGHT commands not appended to the program yet
+        run_op, run = None, 0
+        for clip in lines:
+            token = line_tokens.get(clip)
+            if token is None:
+                token = tokenize(clip)
+            if token is not None:
+                op = token[0]
+                if merge and (op == OP_MOVE or op == OP_TURN):
+                    if op == run_op:
+                        run += token[1]
+                        continue
+                    if run_op is not None: self._appendRun(program, run_op, run)
+                    run_op, run = op, token[1]
+                    continue
+            if run_op is not None:
+                self._appendRun(program, run_op, run)
+                run_op = None
+            if token is None:
+                if type(clip) is not str: clip = str(clip, 'utf-8')
+                self._compileLine(program, clip, merge)
+            elif op == OP_MOVE: append(OP_MOVE, token[1])
+            elif op == OP_TURN: append(OP_TURN, token[1] % 4)
+            else: append(*token)
+        if run_op is not None: self._appendRun(program, run_op, run)
+        return program
+
+    def _appendRun(self, program, op, run):
+        """
+        appends a run of MOVE commands (run steps) or of LEFT/RIGHT commands (run quarter turns to the right)
+        """
+        if op == constants.OP_MOVE: program.appendMove(run)
+        else: program.appendTurn(run)
+
+    def _compileLine(self, program, clip, merge):
+        """
+        compiles one raw command with the reference parser, appending it to the program. Rejected
+        commands are appended as their exception in strict mode and as their status code otherwise.
+        """
+        turns = self._turns
+        strict = self.strict
+        cmd, cmd_str = self.extractCmd(clip)
+        try:
+            if cmd == constants.MOVECOMMAND:
+                steps = self.command.matchMove(cmd_str)
+                if steps is None:
+                    program.appendError(constants.OP_MOVE_ERROR, InvalidCommandFormatError(
+                        "Invalid MOVE command argument format.") if strict else constants.STATUS_INVALID_FORMAT)
+                elif merge: program.appendMove(steps)
+                else: program.append(constants.OP_MOVE, min(steps, constants.MAX_STEPS))
+            elif cmd in turns:
+                if merge: program.appendTurn(turns[cmd])
+                else: program.append(constants.OP_TURN, turns[cmd] % 4)
+            elif cmd == constants.REPORTCOMMAND:
+                program.append(constants.OP_REPORT)
+            elif cmd == constants.STATSCOMMAND:
+                program.append(constants.OP_STATS)
+            elif cmd == constants.PLACECOMMAND:
+                place = self.command.matchPlace(cmd_str)
+                if place is None:
+                    program.appendError(constants.OP_ERROR, InvalidCommandFormatError(
+                        "Invalid PLACE command argument format.") if strict else constants.STATUS_INVALID_FORMAT,
+                        constants.COMMANDS.index(cmd))
+                else:
+                    x, y, dir = place
+                    program.append(constants.OP_PLACE, x, y, constants.DIRECTIONS.index(dir))
+            elif cmd == constants.NEARESTCOMMAND or (cmd == constants.TRAVELCOMMAND and self._severalTargets(cmd_str)):
+                targets = self.command.matchTargets(cmd_str)
+                if targets is None:
+                    program.appendError(constants.OP_TRAVEL_ERROR, InvalidCommandFormatError(
+                        "Invalid " + cmd + " command argument format.") if strict else constants.STATUS_INVALID_FORMAT,
+                        -1 if cmd == constants.TRAVELCOMMAND else constants.COMMANDS.index(cmd))
+                else:
+                    program.appendTargets(constants.OP_NEAREST if cmd == constants.NEARESTCOMMAND
+                                          else constants.OP_TRAVEL_MANY, targets)
+            elif cmd == constants.TRAVELCOMMAND or cmd in self._cellOpcodes:
+                pos = self.command.matchTravel(cmd_str)
+                travel = cmd == constants.TRAVELCOMMAND
+                op = constants.OP_TRAVEL_ERROR if travel else constants.OP_ERROR
+                if pos is None:
+                    program.appendError(op, InvalidCommandFormatError(
+                        "Invalid " + cmd + " command argument format.") if strict else constants.STATUS_INVALID_FORMAT,
+                        -1 if travel else constants.COMMANDS.index(cmd))
+                else:
+                    program.append(constants.OP_TRAVEL if travel else self._cellOpcodes[cmd], *pos)
+            else:
+                program.appendError(constants.OP_ERROR, CommandNotFoundError(cmd + ": command not found.")
+                                    if strict else constants.STATUS_COMMAND_NOT_FOUND)
+        except OverflowError:
+            # co-ordinates too large for a program, they can not be on the table
+            message = "Co-ordinates are not on the board." if cmd == constants.TRAVELCOMMAND else \
+                      "Co-ordinates are out of the table."
+            program.appendError(constants.OP_TRAVEL_ERROR if cmd == constants.TRAVELCOMMAND else constants.OP_ERROR,
+                                IllegalCoordinateError(message) if strict else constants.STATUS_ILLEGAL_COORDINATE,
+                                -1 if cmd == constants.TRAVELCOMMAND else constants.COMMANDS.index(cmd))
+        except Exception as e:
+            # e.g. numbers with too many digits to be converted
+            op = {constants.MOVECOMMAND: constants.OP_MOVE_ERROR, constants.TRAVELCOMMAND: constants.OP_TRAVEL_ERROR,
+                  constants.NEARESTCOMMAND: constants.OP_TRAVEL_ERROR}.get(cmd, constants.OP_ERROR)
+            program.appendError(op, e if strict else self._statusOf(e),
+                                -1 if cmd == constants.MOVECOMMAND or cmd == constants.TRAVELCOMMAND
+                                else constants.COMMANDS.index(cmd))
+
+    def run(self, program, sink=None):
+        """
+        run function executes a compiled Program from the current configuration of the robot, with the
+        same results as calling simulate for every command of the program.
+        Results and errors are written to the sink (see sinks.py); if no sink is given they are returned
+        as a list, where errors appear as exception instances.
+        If statistics are enabled, every instruction is counted and timed, and every error is counted.
+        In result code mode (a Program compiled with strict=False) no exception is raised: every command
+        is checked before it is executed, and rejected commands are only counted by status code in rejected.
+        Both modes share the loop below; they only differ in how a command is checked (by the status
+        functions of Commands, or by the exceptions of the commands themselves) and in what is done with
+        a failure (see _failures).
+        """
+        results = []
+        write = sink.write if sink is not None else results.append
+        error = sink.error if sink is not None else results.append
+        self._execute(program, write, self._failures(error if self.strict else None))
+        return results
+
+    def _execute(self, program, write, fail):
+        """
+        runs the loop of run over a Program, passing every result to write and every failure to fail
+        """
+        checked = not self.strict
+        ok = constants.STATUS_OK
+        stats = self.stats
+        command = self.command
+        directions = constants.DIRECTIONS
+        width, strides = command.width, command.strides
+        # rays of the table, fetched by the first MOVE and again after BLOCK and UNBLOCK
+        rays = None
+        ops, args, errors, targets = program.ops, program.args, program.errors, program.targets
+        # the robot is kept as its cell index and heading (see robo.Configuration), negative when not placed
+        cell = self.configuration.getCell()
+        heading = self.configuration.getHeading()
+        try:
+            for k in range(len(ops)):
+                op = ops[k]
+                if stats is not None: started = perf_counter()
+                try:
+                    if op == constants.OP_MOVE:
+                        if cell >= 0:
+                            if rays is None: rays = command.rayTables()
+                            steps = args[3 * k]
+                            ahead = rays[heading][cell]
+                            cell += strides[heading] * (steps if steps < ahead else ahead)
+                    elif op == constants.OP_TURN:
+                        if cell >= 0: heading = (heading + args[3 * k]) & 3
+                    elif op == constants.OP_MOVE_ERROR:
+                        if cell >= 0: fail(errors[args[3 * k]])
+                    elif op == constants.OP_ERROR:
+                        fail(errors[args[3 * k]])
+                    elif op == constants.OP_PLACE:
+                        a = 3 * k
+                        x, y = args[a], args[a + 1]
+                        status = command.placeStatus(x, y) if checked else ok
+                        # in strict mode placeAt raises the exception of a cell that is not free
+                        if not checked: command.placeAt(x, y, directions[args[a + 2]])
+                        if status: fail(status)
+                        else: cell, heading = y * width + x, args[a + 2]
+                    elif op == constants.OP_BLOCK or op == constants.OP_UNBLOCK:
+                        target = (args[3 * k], args[3 * k + 1])
+                        pos = self._position(cell)
+                        blocking = op == constants.OP_BLOCK
+                        status = command.cellStatus(target, pos, blocking) if checked else ok
+                        if status: fail(status)
+                        elif blocking: command.block(target, pos)
+                        else: command.unblock(target, pos)
+                        # a table sharing its layout takes its own ray tables on its first change
+                        rays = None
+                    elif op == constants.OP_STATS:
+                        if checked and stats is None: fail(constants.STATUS_STATS_NOT_ENABLED)
+                        else: write((constants.STATSCOMMAND, self.statsReport()))
+                    elif cell < 0:
+                        # the other commands need the robot on the table
+                        fail(constants.STATUS_NOT_PLACED if checked else RobotNotPlacedOnTable("Robot not found on table."))
+                    elif op == constants.OP_REPORT:
+                        write((constants.REPORTCOMMAND, ((cell % width, cell // width), directions[heading])))
+                    elif op == constants.OP_TRAVEL:
+                        dest = (args[3 * k], args[3 * k + 1])
+                        pos = (cell % width, cell // width)
+                        status = command.travelStatus(dest, pos) if checked else ok
+                        if status: fail(status)
+                        else: write((constants.TRAVELCOMMAND, command.travelTo(dest, pos)))
+                    elif op == constants.OP_TRAVEL_MANY or op == constants.OP_NEAREST:
+                        dests = targets[args[3 * k]]
+                        pos = (cell % width, cell // width)
+                        nearest = op == constants.OP_NEAREST
+                        status = command.targetsStatus(dests, pos, nearest) if checked else ok
+                        if status: fail(status)
+                        elif nearest: write((constants.TRAVELCOMMAND, command.nearest(dests, pos)))
+                        else: write((constants.PATHSRESULT, list(zip(dests, command.travelMany(dests, pos)))))
+                    else:
+                        # constants.OP_TRAVEL_ERROR, once the robot is placed
+                        fail(errors[args[3 * k]])
+                except Exception as e:
+                    # in result code mode only the commands the checks can not foresee get here
+                    # (e.g. TRAVEL to a cell of the same region with no path left)
+                    fail(self._statusOf(e) if checked else e)
+                if stats is not None: stats.record(self._opCommand(op, args[3 * k], args[3 * k + 1]),
+                                                   perf_counter() - started)
+        finally:
+            # the configuration is updated once, after the program has run
+            self.configuration.setCell(cell)
+            self.configuration.setHeading(heading)
+
+    def _position(self, cell):
+        """
+        returns the (x, y) position of a cell index of the robot, constants.INIT_POSITION if it is negative
+        """
+        if cell < 0: return constants.INIT_POSITION
+        y, x = divmod(cell, self.command.width)
+        return (x, y)
+
+    def _opCommand(self, op, a, b):
+        """
+        returns the command of an instruction with opcode op and first two operands a and b
+        """
+        if op == constants.OP_TURN:
+            return constants.LEFTCOMMAND if a == 3 else constants.RIGHTCOMMAND
+        if op == constants.OP_ERROR:
+            return constants.COMMANDS[b] if b >= 0 else constants.STATS_UNKNOWN
+        if op == constants.OP_TRAVEL_ERROR and b >= 0:
+            return constants.COMMANDS[b]
+        return self._opCommands[op]
+
+    def _failures(self, error):
+        """
+        returns the function run calls with every failure: in strict mode the exception is passed on to
+        error (and counted in the statistics if they are enabled), in result code mode the status code
+        is counted in rejected (and in the statistics) and passed on to error if it is not None
+        """
+        stats = self.stats
+        if self.strict:
+            if stats is None: return error
+            def countingError(e):
+                stats.recordError(e)
+                error(e)
+            return countingError
+        rejected = self.rejected
+        def reject(status):
+            rejected[status] += 1
+            if stats is not None: stats.recordError(constants.STATUSES[status])
+            if error is not None: error(status)
+        return reject
+
+    def runLines(self, lines, sink, chunk=constants.PROGRAM_CHUNK):
+        """
+        runLines compiles and runs an iterable of raw commands chunk lines at a time, writing the
+        results to the sink, so that only one chunk of the stream is held in memory.
+        """
+        lines = iter(lines)
+        while True:
+            program = self.compile(islice(lines, chunk))
+            if not len(program): break
+            self.run(program, sink)
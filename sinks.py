@@ -0,0 +1,139 @@
+# sinks.py
+# ------------------------------
+# Author: Ankita Dhar <githubid: ankitadhar>
+#
+# Output sinks for the results of the simulation. The simulator returns the results of REPORT,
+# TRAVEL and STATS commands instead of printing them; a sink formats those results and writes them out in
+# batches, so that the cost of writing and flushing is paid once per batch rather than once per command.
+
+import json
+import sys
+import constants
+
+class OutputSink:
+    """
+    Base class of the output sinks. Formatted records are buffered and written to the stream every
+    flush_every records (and when the sink is flushed or closed). flush_every = 1 writes every record
+    as soon as it is produced, which is what an interactive session needs.
+    """
+    def __init__(self, stream=None, flush_every=1024):
+        self.stream = stream if stream is not None else sys.stdout
+        self.flush_every = max(1, flush_every)
+        self.buffer = []
+
+    def formatReport(self, pos, dir):
+        raise NotImplementedError
+
+    def formatPath(self, path):
+        raise NotImplementedError
+
+    def formatPaths(self, paths):
+        raise NotImplementedError
+
+    def formatStats(self, report):
+        raise NotImplementedError
+
+    def formatError(self, error):
+        raise NotImplementedError
+
+    def formatBegin(self, name):
+        raise NotImplementedError
+
+    def _append(self, record):
+        self.buffer.append(record)
+        if len(self.buffer) >= self.flush_every:
+            self.flush()
+
+    def write(self, result):
+        """
+        writes a result returned by Simulator.simulate, None results are ignored
+        """
+        if result is None: return
+        cmd, value = result
+        if cmd == constants.REPORTCOMMAND:
+            self._append(self.formatReport(*value))
+        elif cmd == constants.TRAVELCOMMAND:
+            self._append(self.formatPath(value))
+        elif cmd == constants.PATHSRESULT:
+            self._append(self.formatPaths(value))
+        elif cmd == constants.STATSCOMMAND:
+            self._append(self.formatStats(value))
+
+    def error(self, error):
+        """
+        writes the exception raised by a command
+        """
+        self._append(self.formatError(error))
+
+    def begin(self, name):
+        """
+        starts the results of a named input, e.g. one file of a batch
+        """
+        self._append(self.formatBegin(name))
+
+    def extend(self, text):
+        """
+        writes results that were already formatted by a sink of the same kind
+        """
+        if text: self._append(text)
+
+    def flush(self):
+        if self.buffer:
+            self.stream.write("".join(self.buffer))
+            self.buffer = []
+        self.stream.flush()
+
+    def close(self):
+        self.flush()
+
+class TextSink(OutputSink):
+    """
+    Writes the results as plain text, in the same format the program has always printed them.
+    """
+    def formatReport(self, pos, dir):
+        x, y = pos
+        return str(x) + ',' + str(y) + ',' + dir + '\n'
+
+    def formatPath(self, path):
+        if path is not None and len(path) == 1:
+            return "Robot already at destination\npath: " + str(path) + '\n'
+        return "path: " + str(path) + '\n'
+
+    def formatPaths(self, paths):
+        return "".join("path to " + str(dest) + ": " + str(path) + '\n' for dest, path in paths)
+
+    def formatStats(self, report):
+        return "stats: " + json.dumps(report) + '\n'
+
+    def formatError(self, error):
+        return str(error) + '\n'
+
+    def formatBegin(self, name):
+        return "==> " + name + " <==\n"
+
+class JsonLinesSink(OutputSink):
+    """
+    Writes every result as one JSON object per line.
+    """
+    def formatReport(self, pos, dir):
+        x, y = pos
+        return json.dumps({"report": {"x": x, "y": y, "direction": dir}}) + '\n'
+
+    def formatPath(self, path):
+        if path is not None: path = [list(pos) for pos in path]
+        return json.dumps({"path": path}) + '\n'
+
+    def formatPaths(self, paths):
+        return json.dumps({"paths": [{"x": x, "y": y, "path": [list(pos) for pos in path] if path is not None else None}
+                                     for (x, y), path in paths]}) + '\n'
+
+    def formatStats(self, report):
+        return json.dumps({"stats": report}) + '\n'
+
+    def formatError(self, error):
+        return json.dumps({"error": type(error).__name__, "message": str(error)}) + '\n'
+
+    def formatBegin(self, name):
+        return json.dumps({"file": name}) + '\n'
+
+SINKS = {"text": TextSink, "jsonl": JsonLinesSink}
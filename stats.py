@@ -0,0 +1,98 @@
+# stats.py
+# ------------------------------
+# Author: Ankita Dhar <githubid: ankitadhar>
+#
+# Optional instrumentation of the simulator. A Simulator created with a Stats instance counts the
+# commands it runs and the errors they raise, keeps a histogram of their latencies, and records the
+# nodes expanded and the length of the path of every TRAVEL command. Without a Stats instance the
+# simulator only checks that its stats attribute is None.
+
+import json
+
+class Histogram:
+    """
+    Histogram with power of two buckets: bucket b counts the values v with v.bit_length() == b, i.e.
+    the values from 2**(b-1) to 2**b - 1 (bucket 0 counts the zeros).
+    """
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, value):
+        bucket = value.bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max: self.max = value
+
+    def report(self):
+        """
+        returns the histogram as a dictionary, every bucket is given by the largest value it counts
+        """
+        return {"count": self.count, "total": self.total, "max": self.max,
+                "mean": self.total / self.count if self.count else 0,
+                "buckets": [{"le": (1 << b) - 1, "count": self.buckets[b]} for b in sorted(self.buckets)]}
+
+class Stats:
+    """
+    Counters and histograms of a simulation:
+        counts    <- number of commands run, by command (constants.STATS_UNKNOWN for unknown commands)
+        errors    <- number of errors, by name of the exception
+        latencies <- histogram of the latencies of every command, in nanoseconds
+        expanded  <- histogram of the nodes expanded by the search of every TRAVEL command
+        lengths   <- histogram of the lengths of the paths returned by TRAVEL commands
+    """
+    def __init__(self):
+        self.counts = {}
+        self.errors = {}
+        self.latencies = {}
+        self.expanded = Histogram()
+        self.lengths = Histogram()
+
+    def record(self, cmd, seconds):
+        """
+        records a command that took seconds to run
+        """
+        self.counts[cmd] = self.counts.get(cmd, 0) + 1
+        histogram = self.latencies.get(cmd)
+        if histogram is None:
+            histogram = self.latencies[cmd] = Histogram()
+        histogram.add(int(seconds * 1e9))
+
+    def recordError(self, error):
+        """
+        records an error, given as an exception or as the name of a status code (see constants.STATUSES)
+        """
+        name = error if type(error) is str else type(error).__name__
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+    def recordTravel(self, expanded, length):
+        self.expanded.add(expanded)
+        self.lengths.add(length)
+
+    def recordTravels(self, expanded, lengths):
+        """
+        records one search finding the paths of several destinations, with the length of each path
+        """
+        self.expanded.add(expanded)
+        for length in lengths: self.lengths.add(length)
+
+    def report(self):
+        """
+        returns all the counters and histograms as a dictionary that can be serialized to JSON
+        """
+        return {"commands": dict(self.counts), "errors": dict(self.errors),
+                "latency_ns": {cmd: histogram.report() for cmd, histogram in self.latencies.items()},
+                "travel": {"expanded": self.expanded.report(), "path_length": self.lengths.report()}}
+
+    def dump(self, filepath, extra=None):
+        """
+        writes the report, updated with the extra dictionary if given, as JSON to filepath
+        """
+        report = self.report()
+        if extra: report.update(extra)
+        with open(filepath, 'w') as file:
+            json.dump(report, file, indent=2)
+            file.write('\n')
@@ -0,0 +1,134 @@
+# stream.py
+# ------------------------------
+# Author: Ankita Dhar <githubid: ankitadhar>
+#
+# Lazy readers for command streams. Commands are handed out one line at a time so that memory use
+# does not grow with the size of the input and the simulation can start with the first line.
+
+import mmap
+import constants
+
+def readLines(filepath, use_mmap=True, decode=True):
+    """
+    yields the lines of the command file one at a time, without the line ending.
+    With use_mmap the file is memory mapped and every line is decoded straight from a slice of the
+    mapping; otherwise the file is read through the regular buffered reader.
+    If decode is False, the lines of the mapping are handed out as bytes, for Simulator.compile to
+    tokenize them without decoding.
+    """
+    if not use_mmap:
+        with open(filepath, 'r') as file:
+            for line in file:
+                yield line.rstrip('\r\n')
+        return
+
+    with open(filepath, 'rb') as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files can not be mapped
+            return
+        if not decode:
+            try:
+                yield from _splitLines(mapped)
+            finally:
+                mapped.close()
+            return
+        view = memoryview(mapped)
+        try:
+            size = len(mapped)
+            start = 0
+            while start < size:
+                end = mapped.find(b'\n', start)
+                if end == -1: end = size
+                stop = end - 1 if end > start and mapped[end - 1] == 13 else end
+                yield str(view[start:stop], 'utf-8')
+                start = end + 1
+        finally:
+            view.release()
+            mapped.close()
+
+def _splitLines(mapped, block=constants.READ_BLOCK):
+    """
+    yields the lines of a memory mapped file as bytes, without the line ending. The mapping is split
+    block bytes at a time (up to the last line ending of the block), so that lines are cut in C.
+    """
+    size = len(mapped)
+    start = 0
+    while start < size:
+        end = mapped.rfind(b'\n', start, min(start + block, size))
+        if end == -1:
+            # a line longer than the block
+            end = mapped.find(b'\n', start)
+            if end == -1: end = size
+        chunk = mapped[start:end]
+        lines = chunk.split(b'\n')
+        if b'\r' in chunk:
+            lines = [line[:-1] if line.endswith(b'\r') else line for line in lines]
+        yield from lines
+        start = end + 1
+
+class MappedLines:
+    """
+    Lines of a memory mapped command file, handed out as bytes (without the line ending) in chunks,
+    starting from a byte offset. offset is the byte offset of the next line and line the number of
+    lines before it, so that a replay can be checkpointed between two chunks and resumed from there.
+    """
+    def __init__(self, filepath, offset=0, line=0):
+        self.file = open(filepath, 'rb')
+        try:
+            self.mapped = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files can not be mapped
+            self.mapped = b''
+        self.offset = offset
+        self.line = line
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def take(self, n, block=constants.READ_BLOCK):
+        """
+        returns the next n lines (fewer at the end of the file) and moves offset and line past them
+        """
+        lines = []
+        mapped = self.mapped
+        size = len(mapped)
+        while len(lines) < n and self.offset < size:
+            start = self.offset
+            end = mapped.rfind(b'\n', start, min(start + block, size))
+            if end == -1:
+                # a line longer than the block
+                end = mapped.find(b'\n', start)
+                if end == -1: end = size
+            chunk = mapped[start:end]
+            wanted = n - len(lines)
+            parts = chunk.split(b'\n', wanted)
+            if len(parts) > wanted:
+                # the chunk holds more lines than wanted, the rest is read by the next call
+                self.offset = start + len(chunk) - len(parts.pop())
+            else:
+                self.offset = end + 1 if end < size else size
+            if b'\r' in chunk:
+                parts = [line[:-1] if line.endswith(b'\r') else line for line in parts]
+            lines.extend(parts)
+        self.line += len(lines)
+        return lines
+
+    def close(self):
+        if isinstance(self.mapped, mmap.mmap): self.mapped.close()
+        self.file.close()
+
+def readStream(stream, stop="exit"):
+    """
+    yields the lines of a text stream (e.g. standard input) one at a time, without the line ending,
+    until the stop command is read (case insensitive) or the stream ends.
+    """
+    for line in stream:
+        line = line.rstrip('\r\n')
+        if stop is not None and stop == line.lower():
+            return
+        yield line
@@ -0,0 +1,72 @@
+import unittest
+import os
+import tempfile
+import time
+from batch import expandPatterns, runBatch, runFile
+
+class TestRobotBatch(unittest.TestCase):
+
+    def testExpandPatterns(self):
+        filepaths = expandPatterns(["data/input_[ab].txt", "missing.txt"])
+        assert filepaths == ["data/input_a.txt", "data/input_b.txt", "missing.txt"]
+
+    def testRunFile(self):
+        assert runFile("data/input_a.txt") == "0,1,NORTH\n"
+
+    def testRunBatch(self):
+        filepaths = ["data/input_b.txt", "missing.txt", "data/input_a.txt"]
+        results = list(runBatch(filepaths, workers=2))
+        assert [filepath for filepath, output, error in results] == filepaths
+        assert results[0][1:] == ("0,0,WEST\n", None)
+        assert isinstance(results[1][2], FileNotFoundError)
+        assert results[2][1:] == ("0,1,NORTH\n", None)
+
+    def testSettings(self):
+        handle, filepath = tempfile.mkstemp()
+        with os.fdopen(handle, 'w') as file:
+            file.write("REPORT\nJUMP\nPLACE 0,0,NORTH\nSTATS\nREPORT\n")
+        try:
+            rejected = {}
+            results = list(runBatch([filepath, filepath], workers=2, settings={"strict": False}, stats=True,
+                                    rejected=rejected))
+            assert all(error is None and output.endswith("0,0,NORTH\n") for _, output, error in results)
+            assert '"UNKNOWN": 1' in results[0][1] and "not found" not in results[0][1]
+            assert rejected == {"RobotNotPlacedOnTable": 2, "CommandNotFoundError": 2}
+        finally:
+            os.remove(filepath)
+
+    def testSlowFileTimesOut(self):
+        # a FIFO no one writes to blocks its worker forever
+        directory = tempfile.mkdtemp()
+        slow = os.path.join(directory, "slow.txt")
+        os.mkfifo(slow)
+        try:
+            started = time.monotonic()
+            results = list(runBatch([slow, "data/input_a.txt"], workers=2, timeout=0.5))
+            assert time.monotonic() - started < 5
+            assert isinstance(results[0][2], TimeoutError)
+            assert results[1][1:] == ("0,1,NORTH\n", None)
+        finally:
+            os.remove(slow)
+            os.rmdir(directory)
+
+    def testSlowFilesDoNotHoldSlots(self):
+        directory = tempfile.mkdtemp()
+        slow = [os.path.join(directory, "slow%d.txt" % n) for n in range(2)]
+        for filepath in slow: os.mkfifo(filepath)
+        try:
+            filepaths = [slow[0]] + ["data/input_a.txt"] * 4 + [slow[1]]
+            started = time.monotonic()
+            results = list(runBatch(filepaths, workers=2, timeout=1.5))
+            # the fast files run in the second slot while the first one is held, and the second
+            # slow file is timed from its own start, so both time out at about the same time
+            assert time.monotonic() - started < 2.8
+            assert [filepath for filepath, _, _ in results] == filepaths
+            assert isinstance(results[0][2], TimeoutError) and isinstance(results[5][2], TimeoutError)
+            assert all(result[1:] == ("0,1,NORTH\n", None) for result in results[1:5])
+        finally:
+            for filepath in slow: os.remove(filepath)
+            os.rmdir(directory)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from nose.tools import raises
+from simulator import Simulator
+from binlog import (encodeVarint, decodeVarint, encodeHeader, encodeLine, decodeRecords, readRecords, recordToText,
+                    encodeFile, decodeFile, isBinaryLog, BinaryLogError)
+
+class TestRobotBinlog(unittest.TestCase):
+    commands = ["PLACE 0,0,NORTH", "PLACE -3,100000,WEST", "MOVE", "MOVE 300", "LEFT", "RIGHT", "REPORT", "STATS",
+                "TRAVEL 4,4", "TRAVEL +1,-1", "BLOCK 2,2", "UNBLOCK 2,2", "MOVE x", "  MOVE  2", "PLACE 1,1,UP",
+                "JUMP", "", "LEFT now", "TRAVEL 1 , 2", "MOVE " + "9" * 30]
+
+    def setUp(self):
+        handle, self.filepath = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.filepath)
+
+    def encode(self, lines, width=5, height=5):
+        return encodeHeader(width, height) + b"".join(encodeLine(line) for line in lines)
+
+    def testVarints(self):
+        for value in (0, 1, 127, 128, 300, 2 ** 62):
+            assert decodeVarint(encodeVarint(value), 0) == (value, len(encodeVarint(value)))
+        for value in (0, -1, 1, -64, 64, -2 ** 62):
+            assert decodeVarint(encodeVarint(value, True), 0, True)[0] == value
+        assert len(encodeVarint(-1, True)) == 1
+
+    def testRunsLikeText(self):
+        rng = random.Random(3)
+        lines = [rng.choice(self.commands) for _ in range(2000)]
+        with open(self.filepath, 'wb') as file:
+            file.write(self.encode(lines))
+        assert isBinaryLog(self.filepath)
+        expected = Simulator()
+        expected = expected.run(expected.compile(lines))
+        simulator = Simulator()
+        actual = simulator.run(simulator.compile(readRecords(self.filepath, 5, 5)))
+        assert [str(result) for result in expected] == [str(result) for result in actual]
+
+    def testRecordSizes(self):
+        assert len(encodeLine("MOVE")) == 1 and len(encodeLine(b"REPORT")) == 1
+        assert len(encodeLine("PLACE 1,2,NORTH")) == 4
+        assert recordToText(next(decodeRecords(encodeLine("TRAVEL +1,-1"), 0))) == "TRAVEL 1,-1"
+        assert recordToText(next(decodeRecords(encodeLine("MOVE  2"), 0))) == "MOVE  2"
+
+    def testConvertFiles(self):
+        lines = ["PLACE 0,0,NORTH", "MOVE", "MOVE 3", "LEFT", "REPORT", "TRAVEL 1,0", "JUMP"]
+        with open(self.filepath, 'w') as file:
+            file.write("\n".join(lines) + "\n")
+        binary, text = self.filepath + ".bin", self.filepath + ".txt"
+        try:
+            encodeFile(self.filepath, binary)
+            decodeFile(binary, text)
+            with open(text) as file:
+                assert file.read().splitlines() == lines
+            assert os.path.getsize(binary) < os.path.getsize(self.filepath)
+        finally:
+            for path in (binary, text):
+                if os.path.exists(path): os.remove(path)
+
+    @raises(BinaryLogError)
+    def testOtherTable(self):
+        with open(self.filepath, 'wb') as file:
+            file.write(self.encode(["MOVE"], 10, 10))
+        readRecords(self.filepath, 5, 5)
+
+    def testMainReportsBadLogs(self):
+        # a log of another format version, one for another table, and one that breaks off in a record
+        header = encodeHeader(5, 5)
+        truncated = header + encodeLine("PLACE 1000,2,NORTH")[:2]
+        for data in (header[:-3] + bytes([99]) + header[-2:], self.encode(["MOVE"], 10, 10), truncated):
+            with open(self.filepath, 'wb') as file:
+                file.write(data)
+            main = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__main__.py")
+            finished = subprocess.run([sys.executable, main, "--inputfile", self.filepath],
+                                      capture_output=True, text=True)
+            assert finished.returncode == 2
+            assert "Traceback" not in finished.stderr and self.filepath + ": " in finished.stderr
+
+    @raises(BinaryLogError)
+    def testTruncated(self):
+        list(decodeRecords(encodeLine("PLACE 1000,2,NORTH")[:2], 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import io
+import os
+import random
+import tempfile
+from simulator import Simulator
+from sinks import TextSink
+from checkpoint import replay, readCheckpoints, findCheckpoint, restore, CheckpointMismatchError
+from nose.tools import raises
+
+class TestRobotCheckpoint(unittest.TestCase):
+    commands = ["PLACE 0,0,NORTH", "MOVE", "LEFT", "RIGHT", "REPORT", "TRAVEL 4,4", "TRAVEL 3,1", "BLOCK 2,2",
+                "UNBLOCK 2,2", "BLOCK 4,0", "UNBLOCK 1,1", "BLOCK 1,1", "MOVE 2", "JUMP"]
+
+    def setUp(self):
+        rng = random.Random(5)
+        self.lines = [rng.choice(self.commands) for _ in range(3000)]
+        handle, self.filepath = tempfile.mkstemp()
+        with os.fdopen(handle, 'w') as file:
+            file.write("\n".join(self.lines) + "\n")
+        self.checkpoints = self.filepath + ".checkpoints"
+
+    def tearDown(self):
+        os.remove(self.filepath)
+        if os.path.exists(self.checkpoints): os.remove(self.checkpoints)
+
+    def expected(self, start):
+        """
+        results of the lines from start on, after running the lines before it
+        """
+        simulator = Simulator()
+        simulator.run(simulator.compile(self.lines[:start]))
+        output = io.StringIO()
+        sink = TextSink(output)
+        simulator.run(simulator.compile(self.lines[start:]), sink)
+        sink.close()
+        return output.getvalue()
+
+    def replay(self, **kwargs):
+        output = io.StringIO()
+        sink = TextSink(output)
+        replay(Simulator(), self.filepath, sink, **kwargs)
+        sink.close()
+        return output.getvalue()
+
+    def testCheckpoints(self):
+        assert self.replay(checkpoint_path=self.checkpoints, every=400) == self.expected(0)
+        checkpoints = readCheckpoints(self.checkpoints)
+        assert [checkpoint["line"] for checkpoint in checkpoints] == list(range(400, 3000, 400))
+        assert findCheckpoint(checkpoints, 1000)["line"] == 800
+
+    def testResume(self):
+        self.replay(checkpoint_path=self.checkpoints, every=400)
+        with open(self.checkpoints) as file:
+            kept = file.readlines()[:3]
+        with open(self.checkpoints, 'w') as file:
+            # the replay was killed while writing the fourth checkpoint
+            file.writelines(kept + ['{"line": 16'])
+        assert self.replay(checkpoint_path=self.checkpoints, every=400, resume=True) == self.expected(1200)
+        assert len(readCheckpoints(self.checkpoints)) == 7
+
+    def testSeek(self):
+        self.replay(checkpoint_path=self.checkpoints, every=400)
+        for line in (0, 399, 1234, 2999, 5000):
+            assert self.replay(checkpoint_path=self.checkpoints, seek=line) == self.expected(line)
+
+    @raises(CheckpointMismatchError)
+    def testMismatch(self):
+        self.replay(checkpoint_path=self.checkpoints, every=400)
+        restore(Simulator(6, 6, []), readCheckpoints(self.checkpoints)[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 from nose.tools import raises
-from commands import Commands, IllegalCoordinateError, NoPathToDestination
+from commands import Commands, IllegalCoordinateError, InvalidCommandFormatError, NoPathToDestination
 from robo import Configuration
 from simulator import Simulator
 import constants
@@ -101,6 +101,23 @@ class TestRobotSetup(unittest.TestCase):
         assert pos == (x, y + dy)
         assert dir == direction
 
+    def testMOVECmdSteps(self):
+        simulator = Simulator(20, 20, [(5,12)])
+        simulator.simulate("PLACE 5,1,NORTH")
+        simulator.simulate("MOVE 7")
+        assert simulator.configuration.getPosition() == (5, 8)
+        simulator.simulate("MOVE 100")
+        assert simulator.configuration.getPosition() == (5, 11)
+        simulator.command.removePothole((5,12))
+        simulator.simulate("MOVE 100")
+        assert simulator.configuration.getPosition() == (5, 19)
+
+    @raises(InvalidCommandFormatError)
+    def testMOVECmdFormat(self):
+        simulator = Simulator()
+        simulator.simulate("PLACE 0,0,NORTH")
+        simulator.simulate("MOVE north")
+
     def testTurnLeft(self):
         x = 2
         y = 2
@@ -216,6 +233,19 @@ class TestRobotSetup(unittest.TestCase):
         path = self.simulator.executeCmd(constants.TRAVELCOMMAND, to_pos)
         assert path == [(0, 0), (1, 0)]
 
+    def testTravelShortestPath(self):
+        command = Commands(5, 5, [(1,0),(1,1),(1,2),(1,3)])
+        path = command.transit((0,0), (2,0))
+        assert len(path) == 11
+        assert path[0] == (0,0) and path[-1] == (2,0)
+
+    def testTravelLargeTable(self):
+        command = Commands(300, 300, [])
+        path = command.transit((0,0), (299,299))
+        assert len(path) == 599
+        for (x1,y1),(x2,y2) in zip(path, path[1:]):
+            assert abs(x1-x2) + abs(y1-y2) == 1
+
     def testGetSucc(self):
         x = 0
         y = 0
@@ -0,0 +1,77 @@
+import unittest
+import random
+from nose.tools import raises
+from commands import Commands, IllegalCoordinateError
+from dstar import DStarLite
+from simulator import Simulator
+
+class TestRobotDStar(unittest.TestCase):
+
+    def testPlanMatchesBreadthFirstSearch(self):
+        rng = random.Random(2)
+        for _ in range(100):
+            w, h = rng.randint(2, 10), rng.randint(2, 10)
+            command = Commands(w, h, [(rng.randrange(w), rng.randrange(h)) for _ in range(w * h // 4)])
+            free = [(x, y) for x in range(w) for y in range(h) if command.isFree((x, y))]
+            if len(free) < 2: continue
+            start, goal = rng.sample(free, 2)
+            plan = DStarLite(command, start, goal)
+            for _ in range(6):
+                path, expected = plan.path(start), command.transit(start, goal)
+                assert (path is None) == (expected is None)
+                if path is not None:
+                    assert len(path) == len(expected)
+                    assert path[0] == start and path[-1] == goal
+                    if len(path) > 2: start = path[1]
+                pos = (rng.randrange(w), rng.randrange(h))
+                if pos in (start, goal): continue
+                if command.isFree(pos): command.addPothole(pos)
+                else: command.removePothole(pos)
+                plan.updateCell(pos)
+
+    def testRepairIsIncremental(self):
+        wall = [(100, y) for y in range(199)]
+        command = Commands(200, 200, wall)
+        plan = DStarLite(command, (0, 0), (199, 0))
+        assert len(plan.path((0, 0))) == 598
+        first = plan.expanded
+        command.addPothole((0, 3))
+        plan.updateCell((0, 3))
+        assert len(plan.path((0, 0))) == 598
+        assert plan.expanded - first < 10
+        fresh = DStarLite(Commands(200, 200, wall + [(0, 3)]), (0, 0), (199, 0))
+        fresh.path((0, 0))
+        assert fresh.expanded > 1000
+
+    def testPlanCreatedByTravel(self):
+        simulator = Simulator(2000, 2000, [])
+        command = simulator.command
+        simulator.simulate("PLACE 0,0,NORTH")
+        assert len(simulator.simulate("TRAVEL 20,0")[1]) == 21
+        simulator.simulate("BLOCK 10,0")
+        assert command.plan is None and command.replan
+        assert len(simulator.simulate("TRAVEL 20,0")[1]) == 23
+        # the search from the destination stops once the robot's position is settled
+        assert command.plan.expanded < 1000 and len(command.plan.g) < 1000
+
+    def testBlockRepairsTravelPlan(self):
+        simulator = Simulator(10, 10, [])
+        simulator.simulate("PLACE 0,0,NORTH")
+        assert len(simulator.simulate("TRAVEL 9,0")[1]) == 10
+        simulator.simulate("BLOCK 5,0")
+        simulator.simulate("BLOCK 5,1")
+        assert simulator.command.plan is None
+        path = simulator.simulate("TRAVEL 9,0")[1]
+        assert simulator.command.plan is not None
+        assert len(path) == 14 and (5, 2) in path
+        simulator.simulate("UNBLOCK 5,1")
+        assert len(simulator.simulate("TRAVEL 9,0")[1]) == 12
+
+    @raises(IllegalCoordinateError)
+    def testBlockRobotPosition(self):
+        simulator = Simulator()
+        simulator.simulate("PLACE 0,0,NORTH")
+        simulator.simulate("BLOCK 0,0")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import random
+from array import array
+from nose.tools import raises
+from commands import Commands, IllegalCoordinateError, InvalidCommandFormatError
+from fleet import Fleet
+from simulator import RobotNotPlacedOnTable, CommandNotImplementedError
+import constants
+
+class TestRobotFleet(unittest.TestCase):
+
+    def testFleetMatchesCommands(self):
+        rng = random.Random(11)
+        command = Commands(12, 9, [(rng.randrange(12), rng.randrange(9)) for _ in range(25)])
+        fleet = Fleet(command, 200)
+        robots = {}
+        for robot in range(0, 200, 2):
+            pos = (rng.randrange(12), rng.randrange(9))
+            if command.isFree(pos):
+                dir = rng.choice(constants.DIRECTIONS)
+                fleet.place(robot, pos[0], pos[1], dir)
+                robots[robot] = (pos, dir)
+        for _ in range(30):
+            ops = array('B', [rng.choice((constants.OP_MOVE, constants.OP_TURN)) for _ in range(200)])
+            args = array('q', [rng.randrange(4) for _ in range(200)])
+            fleet.step(ops, args)
+            for robot, (pos, dir) in robots.items():
+                if ops[robot] == constants.OP_MOVE:
+                    for _ in range(args[robot]): pos = command.move(pos, dir)
+                else:
+                    for _ in range(args[robot]): dir = command.turnRight(dir)
+                robots[robot] = (pos, dir)
+        fleet.move(3)
+        fleet.turn(-1)
+        reports = fleet.reports()
+        for robot in range(200):
+            if robot in robots:
+                pos, dir = robots[robot]
+                for _ in range(3): pos = command.move(pos, dir)
+                assert reports[robot] == (pos, command.turnLeft(dir))
+            else:
+                assert reports[robot] is None
+
+    def testFleetCommandLines(self):
+        fleet = Fleet(Commands(5, 5, constants.GRID_POTHOLES), 3)
+        assert fleet.simulate("MOVE") == [] and fleet.simulate("REPORT") == []
+        fleet.simulate("PLACE 0,0,NORTH")
+        fleet.simulate("1: PLACE 4,4,SOUTH")
+        fleet.simulate("MOVE 2")
+        fleet.simulate("RIGHT")
+        fleet.simulate("2: MOVE")
+        assert fleet.simulate("REPORT") == [(constants.REPORTCOMMAND, ((0, 1), constants.EAST)),
+                                            (constants.REPORTCOMMAND, ((4, 2), constants.WEST)),
+                                            (constants.REPORTCOMMAND, ((0, 1), constants.EAST))]
+        assert fleet.simulate(" 1 : REPORT") == [(constants.REPORTCOMMAND, ((4, 2), constants.WEST))]
+        assert list(fleet.placed) == [0, 1, 2]
+
+    @raises(CommandNotImplementedError)
+    def testFleetTravel(self):
+        Fleet(Commands(5, 5, constants.GRID_POTHOLES), 3).simulate("TRAVEL 1,0")
+
+    @raises(InvalidCommandFormatError)
+    def testFleetRobotOutOfFleet(self):
+        Fleet(Commands(5, 5, constants.GRID_POTHOLES), 3).simulate("3: REPORT")
+
+    @raises(IllegalCoordinateError)
+    def testFleetPlacePothole(self):
+        fleet = Fleet(Commands(5, 5, constants.GRID_POTHOLES), 3)
+        fleet.place(1, 1, 1, constants.NORTH)
+
+    @raises(RobotNotPlacedOnTable)
+    def testFleetReportNoRobot(self):
+        fleet = Fleet(Commands(5, 5, constants.GRID_POTHOLES), 3)
+        fleet.report(2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import os
+import shutil
+import tempfile
+from robo import Grid
+from simulator import Simulator
+import gridcache
+
+class TestRobotGridCache(unittest.TestCase):
+    potholes = [(1,1),(2,0),(0,2),(1,2),(3,3),(5,4),(6,1)]
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testSaveAndLoad(self):
+        grid = Grid(8, 6, self.potholes, cache=self.directory)
+        files = os.listdir(self.directory)
+        assert files == [gridcache.layoutKey(8, 6, grid.cells) + gridcache.SUFFIX]
+        cached = Grid(8, 6, self.potholes, cache=self.directory)
+        fresh = Grid(8, 6, self.potholes)
+        assert cached.components == fresh.components and cached._nextLabel == fresh._nextLabel
+        assert cached.rays == fresh.rayTables()
+        assert os.listdir(self.directory) == files
+
+    def testLoadedGridUpdates(self):
+        Grid(8, 6, self.potholes, cache=self.directory)
+        cached = Grid(8, 6, self.potholes, cache=self.directory)
+        fresh = Grid(8, 6, self.potholes)
+        fresh.rayTables()
+        for grid in (cached, fresh):
+            grid.addPothole((4, 0))
+            grid.addPothole((4, 1))
+            grid.removePothole((1, 1))
+        assert cached.rays == fresh.rays
+        assert cached.sameRegion((0, 0), (7, 5)) == fresh.sameRegion((0, 0), (7, 5))
+        # the cache file keeps the layout the table was created with
+        assert Grid(8, 6, self.potholes, cache=self.directory).rays == Grid(8, 6, self.potholes).rayTables()
+
+    def testOtherLayoutMisses(self):
+        Grid(8, 6, self.potholes, cache=self.directory)
+        assert not gridcache.loadGrid(Grid(8, 6, self.potholes[:-1]), self.directory)
+        Grid(8, 6, self.potholes[:-1], cache=self.directory)
+        assert len(os.listdir(self.directory)) == 2
+
+    def testUnusableFileIsRebuilt(self):
+        grid = Grid(8, 6, self.potholes, cache=self.directory)
+        filepath = gridcache.cachePath(self.directory, 8, 6, grid.cells)
+        for data in (b"", b"JGRD", open(filepath, 'rb').read()[:-1]):
+            with open(filepath, 'wb') as file:
+                file.write(data)
+            assert not gridcache.loadGrid(Grid(8, 6, self.potholes), self.directory)
+            cached = Grid(8, 6, self.potholes, cache=self.directory)
+            assert cached.components == Grid(8, 6, self.potholes).components
+        assert gridcache.loadGrid(Grid(8, 6, self.potholes), self.directory)
+
+    def testSimulatorWithCache(self):
+        lines = ["PLACE 0,0,NORTH", "MOVE 4", "RIGHT", "MOVE 9", "REPORT", "TRAVEL 7,5", "BLOCK 7,4", "TRAVEL 7,5"]
+        def results(simulator):
+            return [(type(r), str(r)) if isinstance(r, Exception) else r for r in simulator.run(simulator.compile(lines))]
+        expected = results(Simulator(8, 6, self.potholes))
+        for _ in range(2):
+            assert results(Simulator(8, 6, self.potholes, grid_cache=self.directory)) == expected
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import random
+from commands import Commands
+from hpa import HierarchicalPlanner
+from simulator import Simulator
+import constants
+
+class TestRobotHPA(unittest.TestCase):
+
+    def assertValidPath(self, command, path, start, goal):
+        assert path[0] == start and path[-1] == goal
+        for (x1, y1), (x2, y2) in zip(path, path[1:]):
+            assert abs(x1 - x2) + abs(y1 - y2) == 1
+            assert command.isFree((x2, y2))
+
+    def testPathsMatchReachability(self):
+        rng = random.Random(4)
+        for _ in range(60):
+            w, h = rng.randint(1, 25), rng.randint(1, 25)
+            command = Commands(w, h, [(rng.randrange(w), rng.randrange(h)) for _ in range(w * h // 5)])
+            planner = HierarchicalPlanner(command, rng.randint(2, 8))
+            free = [(x, y) for x in range(w) for y in range(h) if command.isFree((x, y))]
+            for _ in range(5):
+                if not free: break
+                start, goal = rng.choice(free), rng.choice(free)
+                path = planner.path(start, goal)
+                assert (path is None) == (command.transit(start, goal) is None)
+                if path is not None: self.assertValidPath(command, path, start, goal)
+
+    def testRebuildAfterChange(self):
+        command = Commands(40, 40, [(20, y) for y in range(39)])
+        planner = HierarchicalPlanner(command, 8)
+        assert len(planner.path((0, 0), (39, 0))) == 118
+        command.removePothole((20, 0))
+        path = planner.path((0, 0), (39, 0))
+        self.assertValidPath(command, path, (0, 0), (39, 0))
+        assert len(path) == 40
+
+    def testTravelWithHierarchy(self):
+        simulator = Simulator(60, 60, [(30, y) for y in range(1, 60)], search=constants.SEARCH_HPA, cluster_size=10)
+        simulator.simulate("PLACE 0,59,EAST")
+        path = simulator.simulate("TRAVEL 59,59")[1]
+        self.assertValidPath(simulator.command, path, (0, 59), (59, 59))
+        stats = simulator.command.hierarchy.stats()
+        assert stats["clusters"] == 36 and stats["nodes"] > 0 and stats["memory_bytes"] > 0
+
+if __name__ == '__main__':
+    unittest.main()
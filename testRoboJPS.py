@@ -0,0 +1,43 @@
+import unittest
+import random
+from commands import Commands
+from jps import JumpPointSearch
+from simulator import Simulator
+import constants
+
+class TestRobotJPS(unittest.TestCase):
+
+    def testPathsAsShortAsBreadthFirstSearch(self):
+        rng = random.Random(9)
+        for _ in range(300):
+            w, h = rng.randint(1, 15), rng.randint(1, 15)
+            command = Commands(w, h, [(rng.randrange(w), rng.randrange(h))
+                                      for _ in range(int(w * h * rng.random() * 0.5))])
+            search = JumpPointSearch(command)
+            free = [(x, y) for x in range(w) for y in range(h) if command.isFree((x, y))]
+            for _ in range(5):
+                if not free: break
+                start, goal = rng.choice(free), rng.choice(free)
+                path, expected = search.path(start, goal), command.transit(start, goal)
+                assert (path is None) == (expected is None)
+                if path is None: continue
+                assert len(path) == len(expected)
+                assert path[0] == start and path[-1] == goal
+                for (x1, y1), (x2, y2) in zip(path, path[1:]):
+                    assert abs(x1 - x2) + abs(y1 - y2) == 1
+                    assert command.isFree((x2, y2))
+
+    def testFewExpansionsOnOpenTable(self):
+        rng = random.Random(1)
+        command = Commands(300, 300, [(rng.randrange(1, 299), rng.randrange(1, 299)) for _ in range(300)])
+        search = JumpPointSearch(command)
+        assert len(search.path((0, 0), (299, 299))) == 599
+        assert search.expanded < 1000
+
+    def testTravelWithJumpPoints(self):
+        simulator = Simulator(search=constants.SEARCH_JPS)
+        simulator.simulate("PLACE 0,0,NORTH")
+        assert simulator.simulate("TRAVEL 1,0") == (constants.TRAVELCOMMAND, [(0, 0), (1, 0)])
+
+if __name__ == '__main__':
+    unittest.main()
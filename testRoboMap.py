@@ -0,0 +1,91 @@
+import unittest
+import os
+import tempfile
+from nose.tools import raises
+from mapfile import loadMap, MapFormatError
+from simulator import Simulator
+import constants
+
+class TestRobotMap(unittest.TestCase):
+    grid = ["..#.",
+            "....",
+            "#..#"]
+
+    def setUp(self):
+        handle, self.filepath = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.filepath)
+
+    def writeMap(self, data):
+        with open(self.filepath, 'wb') as file:
+            file.write(data)
+
+    def testASCIIMap(self):
+        self.writeMap("\r\n".join(self.grid).encode() + b"\n\n")
+        for block in (1, 3, 1024):
+            width, height, cells = loadMap(self.filepath, block)
+            assert (width, height) == (4, 3)
+            assert bytes(cells) == b"\x01\x00\x00\x01" + b"\x00" * 4 + b"\x00\x00\x01\x00"
+
+    def testPGMMap(self):
+        pixels = bytes([255, 255, 0, 200, 255, 255, 255, 255, 10, 255, 255, 127])
+        self.writeMap(b"P5\n# floor\n4 3\n255\n" + pixels)
+        for block in (1, 4, 1024):
+            assert loadMap(self.filepath, block) == (4, 3, bytearray(b"\x01\x00\x00\x01" + b"\x00" * 4 + b"\x00\x00\x01\x00"))
+
+    def testPGMMap16Bit(self):
+        pixels = b"".join(value.to_bytes(2, 'big') for value in (65535, 0, 32767, 32768))
+        self.writeMap(b"P5 2 2 65535 " + pixels)
+        assert loadMap(self.filepath) == (2, 2, bytearray(b"\x01\x00\x00\x01"))
+
+    def testPGMMap16BitSmallMaximum(self):
+        # half of 1000 is 500, so the pixels 100, 400 and 499 are potholes
+        pixels = b"".join(value.to_bytes(2, 'big') for value in (100, 400, 900, 499, 500, 1000))
+        self.writeMap(b"P5 3 2 1000 " + pixels)
+        assert loadMap(self.filepath) == (3, 2, bytearray(b"\x01\x00\x00\x01\x01\x00"))
+
+    @raises(MapFormatError)
+    def testRaggedRows(self):
+        self.writeMap(b"...\n..\n")
+        loadMap(self.filepath)
+
+    @raises(MapFormatError)
+    def testUnknownCell(self):
+        self.writeMap(b"..\n.x\n")
+        loadMap(self.filepath)
+
+    @raises(MapFormatError)
+    def testEmptyRowInside(self):
+        self.writeMap(b"..\n\n..\n")
+        loadMap(self.filepath)
+
+    @raises(MapFormatError)
+    def testEmptyMap(self):
+        self.writeMap(b"\n")
+        loadMap(self.filepath)
+
+    @raises(MapFormatError)
+    def testShortPGM(self):
+        self.writeMap(b"P5\n4 3\n255\n" + bytes(11))
+        loadMap(self.filepath)
+
+    @raises(MapFormatError)
+    def testLongPGM(self):
+        self.writeMap(b"P5\n4 3\n255\n" + bytes(13))
+        loadMap(self.filepath)
+
+    def testSimulatorOnMap(self):
+        self.writeMap("\n".join(self.grid).encode())
+        width, height, cells = loadMap(self.filepath)
+        simulator = Simulator(width, height, [], cells)
+        results = simulator.run(simulator.compile(["PLACE 1,0,NORTH", "MOVE 5", "RIGHT", "MOVE 5", "REPORT",
+                                                   "TRAVEL 3,2"]))
+        # the pothole at (2, 2) is drawn on the first line of the map
+        assert results[0] == (constants.REPORTCOMMAND, ((1, 2), constants.EAST))
+        command, path = results[1]
+        assert command == constants.TRAVELCOMMAND and len(path) == 5 and (2, 2) not in path
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+from commands import Commands
+from pathcache import PathCache
+
+class TestRobotPathCache(unittest.TestCase):
+
+    def testTravelUsesCache(self):
+        command = Commands(10, 10, [(5, y) for y in range(9)], path_cache_size=2)
+        first = command.travelTo((9, 0), (0, 0))
+        second = command.travelTo((9, 0), (0, 0))
+        assert first == second and len(first) == 28
+        stats = command.pathCache.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+
+    def testCacheInvalidation(self):
+        command = Commands(10, 10, [(5, y) for y in range(9)])
+        assert len(command.travelTo((9, 0), (0, 0))) == 28
+        command.removePothole((5, 0))
+        assert len(command.travelTo((9, 0), (0, 0))) == 10
+        stats = command.pathCache.stats()
+        assert stats["hits"] == 0 and stats["invalidations"] == 1
+
+    def testCacheEviction(self):
+        cache = PathCache(2)
+        cache.put((0, 0), (1, 0), 0, [(0, 0), (1, 0)])
+        cache.put((0, 0), (2, 0), 0, [(0, 0), (1, 0), (2, 0)])
+        assert cache.get((0, 0), (1, 0), 0) is not None
+        cache.put((0, 0), (3, 0), 0, [(0, 0), (1, 0), (2, 0), (3, 0)])
+        assert cache.get((0, 0), (2, 0), 0) is None
+        assert cache.get((0, 0), (1, 0), 0) is not None
+        assert cache.stats()["evictions"] == 1
+
+if __name__ == '__main__':
+    unittest.main()
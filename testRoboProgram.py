@@ -0,0 +1,67 @@
+import unittest
+import random
+from simulator import Simulator
+import constants
+
+class TestRobotProgram(unittest.TestCase):
+    commands = ["PLACE 0,0,NORTH", "PLACE 3,1,WEST", "PLACE 2,0,NORTH", "PLACE 7,1,EAST", "PLACE 1,x,EAST",
+                "MOVE", "MOVE 3", "MOVE x", "LEFT", "RIGHT", "REPORT", "TRAVEL 4,4", "TRAVEL 0,1", "TRAVEL 1,1",
+                "TRAVEL 1;1", "TRAVEL", "BLOCK 0,1", "UNBLOCK 0,1", "UNBLOCK 1,1", "BLOCK 9,9", "BLOCK", "JUMP", ""]
+
+    def simulate(self, simulator, lines):
+        results = []
+        for line in lines:
+            try:
+                result = simulator.simulate(line)
+                if result is not None: results.append(result)
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def assertSameResults(self, expected, actual):
+        assert len(expected) == len(actual)
+        for e, a in zip(expected, actual):
+            if isinstance(e, Exception):
+                assert type(e) == type(a) and str(e) == str(a)
+            else:
+                assert e == a
+
+    def testRunMatchesSimulate(self):
+        rng = random.Random(7)
+        for _ in range(50):
+            lines = [rng.choice(self.commands) for _ in range(40)]
+            expected = self.simulate(Simulator(), lines)
+            simulator = Simulator()
+            actual = simulator.run(simulator.compile(lines))
+            self.assertSameResults(expected, actual)
+
+    def testRunLengths(self):
+        simulator = Simulator(50, 50, [(10, 40)])
+        lines = ["PLACE 10,0,NORTH"] + ["MOVE"] * 1000 + ["LEFT", "RIGHT", "RIGHT", "RIGHT", "REPORT"]
+        program = simulator.compile(lines)
+        assert list(program.ops) == [constants.OP_PLACE, constants.OP_MOVE, constants.OP_TURN, constants.OP_REPORT]
+        assert simulator.run(program) == [(constants.REPORTCOMMAND, ((10, 39), constants.SOUTH))]
+        expected = self.simulate(Simulator(50, 50, [(10, 40)]), lines)
+        assert expected == [(constants.REPORTCOMMAND, ((10, 39), constants.SOUTH))]
+
+    def testRunFromDifferentStates(self):
+        simulator = Simulator()
+        program = simulator.compile(["MOVE", "RIGHT", "MOVE", "REPORT"])
+        simulator.configuration.setPosition((0, 0))
+        simulator.configuration.setDirection(constants.NORTH)
+        assert simulator.run(program) == [(constants.REPORTCOMMAND, ((0, 1), constants.EAST))]
+        simulator.configuration.setPosition((3, 0))
+        simulator.configuration.setDirection(constants.NORTH)
+        assert simulator.run(program) == [(constants.REPORTCOMMAND, ((4, 1), constants.EAST))]
+        assert simulator.configuration.getPosition() == (4, 1)
+
+    def testRunOnNarrowTable(self):
+        # the packed cell of the robot must not wrap around the rows of the table
+        lines = ["PLACE 0,1,WEST", "MOVE", "LEFT", "MOVE 5", "LEFT", "MOVE 20", "REPORT", "TRAVEL 0,0"]
+        expected = self.simulate(Simulator(7, 3, [(6, 0)]), lines)
+        simulator = Simulator(7, 3, [(6, 0)])
+        assert simulator.run(simulator.compile(lines)) == expected
+        assert expected[0] == (constants.REPORTCOMMAND, ((5, 0), constants.EAST))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import random
+from simulator import Simulator
+from stats import Stats
+import constants
+
+class TestRobotResultCodes(unittest.TestCase):
+    commands = ["PLACE 0,0,NORTH", "PLACE 3,1,WEST", "PLACE 2,0,NORTH", "PLACE 7,1,EAST", "PLACE 1,x,EAST",
+                "MOVE", "MOVE 3", "MOVE x", "LEFT", "RIGHT", "REPORT", "TRAVEL 4,4", "TRAVEL 0,1", "TRAVEL 1,1",
+                "TRAVEL 1;1", "TRAVEL", "BLOCK 0,1", "UNBLOCK 0,1", "UNBLOCK 1,1", "BLOCK 9,9", "BLOCK", "JUMP", "",
+                "STATS", "TRAVEL 1,2", "BLOCK 1,0", "PLACE 99999999999999999999,0,NORTH", "TRAVEL 1," + "1" * 5000]
+
+    def strictResults(self, lines):
+        simulator = Simulator()
+        results = simulator.run(simulator.compile(lines))
+        errors = {}
+        for result in results:
+            if isinstance(result, Exception):
+                name = type(result).__name__
+                name = name if name in constants.STATUSES else "Error"
+                errors[name] = errors.get(name, 0) + 1
+        return [result for result in results if not isinstance(result, Exception)], errors
+
+    def testRunMatchesStrict(self):
+        rng = random.Random(9)
+        for _ in range(50):
+            lines = [rng.choice(self.commands) for _ in range(60)]
+            results, errors = self.strictResults(lines)
+            simulator = Simulator(strict=False)
+            assert simulator.run(simulator.compile(lines)) == results
+            assert simulator.rejections() == errors
+            assert all(type(error) is int for error in simulator.compile(lines).errors)
+
+    def testSimulateCounts(self):
+        simulator = Simulator(strict=False)
+        lines = ["REPORT", "PLACE 1,1,NORTH", "PLACE 0,0,NORTH", "JUMP", "MOVE x", "TRAVEL 2,0"]
+        assert [simulator.simulate(line) for line in lines] == [
+            constants.STATUS_NOT_PLACED, constants.STATUS_ILLEGAL_COORDINATE, None, constants.STATUS_COMMAND_NOT_FOUND,
+            constants.STATUS_INVALID_FORMAT, constants.STATUS_ILLEGAL_COORDINATE]
+        assert simulator.simulate("REPORT") == (constants.REPORTCOMMAND, ((0, 0), "NORTH"))
+        assert simulator.rejections() == {"RobotNotPlacedOnTable": 1, "IllegalCoordinateError": 2,
+                                          "CommandNotFoundError": 1, "InvalidCommandFormatError": 1}
+
+    def testSimulateMatchesRun(self):
+        rng = random.Random(4)
+        lines = [rng.choice(self.commands) for _ in range(300)]
+        expected = Simulator(stats=Stats(), strict=False)
+        results = expected.run(expected.compile(lines))
+        simulator = Simulator(stats=Stats(), strict=False)
+        returned = [simulator.simulate(line) for line in lines]
+        # the STATS results differ by their latencies
+        stripped = lambda results: [result for result in results if result[0] != constants.STATSCOMMAND]
+        assert stripped(result for result in returned if type(result) is tuple) == stripped(results)
+        assert sum(type(result) is int for result in returned) == sum(simulator.rejected)
+        assert simulator.rejections() == expected.rejections()
+        assert simulator.stats.counts == expected.stats.counts and simulator.stats.errors == expected.stats.errors
+
+    def testStats(self):
+        simulator = Simulator(stats=Stats(), strict=False)
+        simulator.run(simulator.compile(["REPORT", "PLACE 0,0,NORTH", "TRAVEL 4,4"]))
+        report = simulator.statsReport()
+        assert report["rejected"] == {"RobotNotPlacedOnTable": 1, "NoPathToDestination": 1}
+        assert report["errors"] == report["rejected"]
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import asyncio
+from server import startServer
+from simulator import Simulator
+from stats import Stats
+
+class TestRobotServer(unittest.TestCase):
+
+    async def session(self, port, commands):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write("".join(command + "\n" for command in commands).encode())
+        await writer.drain()
+        output = await reader.read()
+        writer.close()
+        return output.decode()
+
+    async def sessions(self):
+        server = await startServer("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await asyncio.gather(
+                self.session(port, ["PLACE 0,0,NORTH", "MOVE", "REPORT", "TRAVEL 1,0", "JUMP", "exit", "REPORT"]),
+                self.session(port, ["REPORT", "PLACE 4,4,SOUTH", "REPORT", "exit"]))
+
+    async def oversized(self):
+        server = await startServer("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            # longer than the 64 KiB limit of the reader
+            return await self.session(port, ["PLACE 0,0,NORTH", "MOVE " + "1" * 100000, "REPORT"])
+
+    def testOversizedLine(self):
+        assert asyncio.run(self.oversized()) == "Command line too long.\n"
+
+    async def resultCodes(self):
+        factory = lambda: Simulator(search="jps", stats=Stats(), strict=False)
+        server = await startServer("127.0.0.1", 0, factory=factory)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await self.session(port, ["REPORT", "JUMP", "PLACE 0,0,NORTH", "TRAVEL 1,0", "STATS", "exit"])
+
+    def testResultCodes(self):
+        lines = asyncio.run(self.resultCodes()).splitlines()
+        assert lines[0] == "path: [(0, 0), (1, 0)]" and len(lines) == 2
+        assert '"rejected": {"CommandNotFoundError": 1, "RobotNotPlacedOnTable": 1}' in lines[1]
+
+    def testSessions(self):
+        first, second = asyncio.run(self.sessions())
+        assert first == "0,1,NORTH\npath: [(0, 1), (0, 0), (1, 0)]\nJUMP: command not found.\n"
+        assert second == "Robot not found on table.\n4,4,SOUTH\n"
+
+if __name__ == '__main__':
+    unittest.main()
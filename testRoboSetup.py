@@ -1,6 +1,7 @@
 import unittest
+import random
 from nose.tools import raises
-from robo import Grid, IllegalGridStructure
+from robo import Grid, IllegalGridStructure, Configuration
 from commands import Commands, IllegalCoordinateError, InvalidCommandFormatError
 from simulator import Simulator, RobotNotPlacedOnTable, CommandNotFoundError
 import constants
@@ -19,6 +20,10 @@ class TestRobotSetup(unittest.TestCase):
     def testPlaceCmdFormat2(self):
         self.simulator.executeCmd("PLACE", "1,2,north")
 
+    @raises(InvalidCommandFormatError)
+    def testPlaceCmdFormat3(self):
+        self.simulator.executeCmd("PLACE", "1,2,NORTHEAST")
+
     @raises(IllegalCoordinateError)
     def testPlaceCmdPosition1(self):
         self.simulator.executeCmd("PLACE", "-1,2,NORTH")
@@ -45,6 +50,123 @@ class TestRobotSetup(unittest.TestCase):
     def testLegalGridSetup(self):
         Grid(5,5,constants.GRID_POTHOLES)
 
+    def testGridComponents(self):
+        grid = Grid(5,5,constants.GRID_POTHOLES)
+        assert grid.sameRegion((0,0), (1,0))
+        assert not grid.sameRegion((0,0), (4,4))
+        assert grid.component((1,1)) is None
+
+    def testGridComponentsUpdate(self):
+        grid = Grid(5,5,constants.GRID_POTHOLES)
+        grid.removePothole((2,0))
+        assert grid.sameRegion((0,0), (4,4))
+        grid.addPothole((3,0))
+        grid.addPothole((2,1))
+        assert not grid.sameRegion((0,0), (4,4))
+        assert grid.sameRegion((2,0), (0,1))
+
+    def testGridComponentsRandomUpdates(self):
+        rng = random.Random(3)
+        for _ in range(50):
+            w, h = rng.randint(2, 12), rng.randint(2, 12)
+            grid = Grid(w, h, [])
+            for _ in range(40):
+                pos = (rng.randrange(w), rng.randrange(h))
+                if grid.isFree(pos): grid.addPothole(pos)
+                else: grid.removePothole(pos)
+                fresh = Grid(w, h, grid.potholes())
+                free = [(x, y) for x in range(w) for y in range(h) if grid.isFree((x, y))]
+                for a in free:
+                    for b in free:
+                        assert grid.sameRegion(a, b) == fresh.sameRegion(a, b)
+                for label in range(1, grid._nextLabel):
+                    assert grid._sizes[label] == sum(1 for c in grid.components if c == label)
+
+    def testGridMergeMatchesFreshGrid(self):
+        # a wall splitting a 40 x 30 table into a column of 5 cells wide and the rest, and a pocket
+        wall = [(5, y) for y in range(30)] + [(20, 10), (21, 11), (20, 12), (19, 11)]
+        grid = Grid(40, 30, wall)
+        large = grid.component((30, 0))
+        grid.removePothole((5, 7))
+        grid.removePothole((21, 11))
+        fresh = Grid(40, 30, grid.potholes())
+        free = [(x, y) for x in range(40) for y in range(30) if grid.isFree((x, y))]
+        for a in free:
+            assert grid.sameRegion(a, (30, 0)) == fresh.sameRegion(a, (30, 0))
+            assert grid.sameRegion(a, (0, 0)) == fresh.sameRegion(a, (0, 0))
+        # the smaller regions joined the label of the largest one
+        assert grid.component((0, 0)) == grid.component((20, 11)) == large
+        assert grid._sizes[large] == len(free)
+
+    def testGridSplitVisitsSmallerPart(self):
+        grid = Grid(1000, 1000, [(1, y) for y in range(1, 1000)])
+        grid.addPothole((1, 0))
+        assert not grid.sameRegion((0, 0), (2, 0))
+        assert grid.sameRegion((2, 0), (999, 999))
+        # the large part keeps its label, only the column cut off is labelled again
+        assert grid.component((999, 999)) == grid.component((2, 5))
+        assert grid.component((0, 999)) != grid.component((2, 5))
+
+    def testGridSharedLayout(self):
+        layout = Grid(5, 5, [])
+        layout.rayTables()
+        first = Simulator(potholes=[], layout=layout)
+        second = Simulator(potholes=[], layout=layout)
+        assert first.command.cells is layout.cells and first.command.rays is layout.rays
+        first.simulate("PLACE 0,0,NORTH")
+        first.simulate("BLOCK 0,2")
+        assert first.command.cells is not layout.cells
+        first.simulate("MOVE 4")
+        assert first.simulate("REPORT")[1] == ((0, 1), "NORTH")
+        assert layout.isFree((0, 2)) and second.command.isFree((0, 2))
+        second.simulate("PLACE 0,0,NORTH")
+        second.simulate("MOVE 4")
+        assert second.simulate("REPORT")[1] == ((0, 4), "NORTH")
+        assert second.command.cells is layout.cells
+
+    def testSharedLayoutCompiledProgram(self):
+        layout = Grid(5, 5, [])
+        layout.rayTables()
+        simulator = Simulator(potholes=[], layout=layout)
+        program = simulator.compile(["PLACE 0,0,NORTH", "MOVE", "BLOCK 0,3", "MOVE 5", "REPORT"])
+        assert simulator.run(program) == [(constants.REPORTCOMMAND, ((0, 2), "NORTH"))]
+        assert layout.isFree((0, 3)) and layout.rays[0][0] == 4
+
+    @raises(IllegalGridStructure)
+    def testGridLayoutDimensions(self):
+        Grid(4, 5, [], layout=Grid(5, 5, []))
+
+    def testGridCells(self):
+        grid = Grid(4000,3000,[(3999,2999)])
+        assert len(grid.cells) == 4000 * 3000
+        assert grid.isPothole((3999,2999))
+        assert grid.isFree((0,0))
+        assert not grid.isFree((4000,0))
+        assert grid.sameRegion((0,0), (3998,2999))
+
+    @raises(IllegalGridStructure)
+    def testGridPotholeOutOfTable(self):
+        Grid(5,5,[(5,5)])
+
+    def testSimulatorDimensions(self):
+        simulator = Simulator(10, 2, [(9,1)])
+        pos, dir = simulator.executeCmd("PLACE", "8,1,EAST")
+        simulator.configuration.setPosition(pos)
+        simulator.configuration.setDirection(dir)
+        pos, dir = simulator.executeCmd("MOVE", None)
+        assert pos == (8,1)
+
+    def testConfigurationPacking(self):
+        configuration = Configuration(constants.INIT_POSITION, constants.INIT_DIRECTION, 10)
+        assert (configuration.getCell(), configuration.getHeading()) == (constants.INIT_CELL, constants.INIT_HEADING)
+        assert configuration.getPosition() == constants.INIT_POSITION and configuration.getDirection() is None
+        configuration.setPosition((3, 2))
+        configuration.setDirection(constants.WEST)
+        assert (configuration.getCell(), configuration.getHeading()) == (23, 3)
+        configuration.setCell(9)
+        assert configuration.getPosition() == (9, 0)
+        assert not hasattr(configuration, '__dict__')
+
     @raises(RobotNotPlacedOnTable)
     def testReportNoRobotOnTable(self):
         self.simulator.simulate("REPORT")
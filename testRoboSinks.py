@@ -0,0 +1,42 @@
+import unittest
+import io
+import json
+from simulator import Simulator, RobotNotPlacedOnTable
+from sinks import TextSink, JsonLinesSink
+import constants
+
+class TestRobotSinks(unittest.TestCase):
+
+    def testSimulateReturnsResults(self):
+        simulator = Simulator()
+        assert simulator.simulate("PLACE 0,0,NORTH") is None
+        assert simulator.simulate("MOVE") is None
+        assert simulator.simulate("REPORT") == (constants.REPORTCOMMAND, ((0, 1), "NORTH"))
+        assert simulator.simulate("TRAVEL 1,0") == (constants.TRAVELCOMMAND, [(0, 1), (0, 0), (1, 0)])
+
+    def testTextSink(self):
+        stream = io.StringIO()
+        sink = TextSink(stream, flush_every=2)
+        sink.write((constants.REPORTCOMMAND, ((0, 1), "NORTH")))
+        assert stream.getvalue() == ""
+        sink.write((constants.TRAVELCOMMAND, [(0, 0), (1, 0)]))
+        sink.write(None)
+        sink.error(RobotNotPlacedOnTable("Robot not found on table."))
+        assert stream.getvalue() == "0,1,NORTH\npath: [(0, 0), (1, 0)]\n"
+        sink.close()
+        assert stream.getvalue().endswith("Robot not found on table.\n")
+
+    def testJsonLinesSink(self):
+        stream = io.StringIO()
+        sink = JsonLinesSink(stream)
+        sink.write((constants.REPORTCOMMAND, ((0, 1), "NORTH")))
+        sink.write((constants.TRAVELCOMMAND, [(0, 0), (1, 0)]))
+        sink.error(RobotNotPlacedOnTable("Robot not found on table."))
+        sink.close()
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert records[0] == {"report": {"x": 0, "y": 1, "direction": "NORTH"}}
+        assert records[1] == {"path": [[0, 0], [1, 0]]}
+        assert records[2]["error"] == "RobotNotPlacedOnTable"
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from nose.tools import raises
+from simulator import Simulator, StatsNotEnabledError
+from stats import Stats, Histogram
+import constants
+
+class TestRobotStats(unittest.TestCase):
+    lines = ["REPORT", "PLACE 0,0,NORTH", "MOVE", "MOVE", "MOVE x", "LEFT", "RIGHT", "RIGHT", "JUMP",
+             "REPORT", "TRAVEL 4,4", "TRAVEL 1,1", "BLOCK 9,9"]
+
+    def simulate(self, simulator, lines):
+        for line in lines:
+            try:
+                simulator.simulate(line)
+            except Exception:
+                pass
+
+    def testSimulateCounts(self):
+        simulator = Simulator(stats=Stats())
+        self.simulate(simulator, self.lines)
+        report = simulator.statsReport()
+        assert report["commands"] == {"REPORT": 2, "PLACE": 1, "MOVE": 3, "LEFT": 1, "RIGHT": 2,
+                                      constants.STATS_UNKNOWN: 1, "TRAVEL": 2, "BLOCK": 1}
+        assert report["errors"] == {"RobotNotPlacedOnTable": 1, "InvalidCommandFormatError": 1,
+                                    "CommandNotFoundError": 1, "NoPathToDestination": 1,
+                                    "IllegalCoordinateError": 2}
+        assert report["latency_ns"]["MOVE"]["count"] == 3
+        assert report["travel"]["path_length"]["count"] == 0
+
+    def testRunMatchesSimulate(self):
+        expected = Simulator(stats=Stats())
+        self.simulate(expected, self.lines)
+        simulator = Simulator(stats=Stats())
+        simulator.run(simulator.compile(self.lines))
+        assert simulator.stats.counts == expected.stats.counts
+        assert simulator.stats.errors == expected.stats.errors
+
+    def testTravel(self):
+        simulator = Simulator(stats=Stats())
+        simulator.simulate("PLACE 0,0,NORTH")
+        simulator.simulate("TRAVEL 1,0")
+        simulator.simulate("TRAVEL 1,0")
+        travel = simulator.statsReport()["travel"]
+        assert travel["path_length"]["count"] == 2 and travel["path_length"]["max"] == 2
+        # the second path comes from the path cache, without any search
+        assert travel["expanded"]["count"] == 2 and travel["expanded"]["total"] > 0
+        assert travel["expanded"]["buckets"][0] == {"le": 0, "count": 1}
+        assert simulator.statsReport()["path_cache"]["hits"] == 1
+
+    def testStatsCommand(self):
+        simulator = Simulator(stats=Stats())
+        simulator.simulate("PLACE 0,0,NORTH")
+        cmd, report = simulator.simulate("STATS")
+        assert cmd == constants.STATSCOMMAND and report["commands"] == {"PLACE": 1}
+        [(cmd, report)] = simulator.run(simulator.compile(["MOVE", "STATS"]))
+        assert report["commands"] == {"PLACE": 1, "STATS": 1, "MOVE": 1}
+
+    def testHistogram(self):
+        histogram = Histogram()
+        for value in (0, 1, 5, 6, 100):
+            histogram.add(value)
+        report = histogram.report()
+        assert report["buckets"] == [{"le": 0, "count": 1}, {"le": 1, "count": 1},
+                                     {"le": 7, "count": 2}, {"le": 127, "count": 1}]
+        assert report["max"] == 100 and report["total"] == 112
+
+    @raises(StatsNotEnabledError)
+    def testStatsNotEnabled(self):
+        Simulator().simulate("STATS")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import io
+import os
+import tempfile
+import mmap
+from stream import readLines, readStream, _splitLines, MappedLines
+
+class TestRobotStream(unittest.TestCase):
+    commands = "PLACE 0,0,NORTH\r\nMOVE\n\nREPORT"
+
+    def setUp(self):
+        handle, self.filepath = tempfile.mkstemp()
+        with os.fdopen(handle, 'w', newline='') as file:
+            file.write(self.commands)
+
+    def tearDown(self):
+        os.remove(self.filepath)
+
+    def testReadLinesMapped(self):
+        lines = list(readLines(self.filepath))
+        assert lines == ["PLACE 0,0,NORTH", "MOVE", "", "REPORT"]
+
+    def testReadLinesBuffered(self):
+        lines = list(readLines(self.filepath, use_mmap=False))
+        assert lines == ["PLACE 0,0,NORTH", "MOVE", "", "REPORT"]
+
+    def testReadLinesBytes(self):
+        lines = list(readLines(self.filepath, decode=False))
+        assert lines == [b"PLACE 0,0,NORTH", b"MOVE", b"", b"REPORT"]
+
+    def testSplitLinesAcrossBlocks(self):
+        with open(self.filepath, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            for block in (1, 4, 16, 1024):
+                lines = list(_splitLines(mapped, block))
+                assert lines == [b"PLACE 0,0,NORTH", b"MOVE", b"", b"REPORT"]
+            mapped.close()
+
+    def testMappedLinesTake(self):
+        with MappedLines(self.filepath) as reader:
+            assert reader.take(1, block=4) == [b"PLACE 0,0,NORTH"]
+            assert (reader.offset, reader.line) == (17, 1)
+            assert reader.take(2) == [b"MOVE", b""]
+        with MappedLines(self.filepath, 17, 1) as reader:
+            assert reader.take(10) == [b"MOVE", b"", b"REPORT"]
+            assert reader.take(10) == [] and reader.line == 4
+
+    def testReadEmptyFile(self):
+        with open(self.filepath, 'w'):
+            pass
+        assert list(readLines(self.filepath)) == []
+
+    def testReadStreamStops(self):
+        lines = list(readStream(io.StringIO("MOVE\nExit\nREPORT\n")))
+        assert lines == ["MOVE"]
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import random
+from simulator import Simulator
+from program import Program
+from tokenizer import tokenize
+import constants
+
+class TestRobotTokenizer(unittest.TestCase):
+    names = ["PLACE", "MOVE", "LEFT", "RIGHT", "REPORT", "TRAVEL", "BLOCK", "UNBLOCK", "STATS", "place", "JUMP", ""]
+    numbers = ["0", "3", "12", "+1", "-2", "007", "x", "", "٣", "1" * 18, "9" * 19, "1" * 5000]
+    facings = ["NORTH", "EAST", "WEST", "SOUTH", "NORTHEAST", "north", ""]
+    spaces = ["", " ", "  ", "\t", "\x0b", "\x1c", " "]
+
+    def randomLine(self, rng):
+        space = lambda: rng.choice(self.spaces) if rng.random() < 0.3 else ""
+        name = rng.choice(self.names)
+        args = [rng.choice(self.numbers) for _ in range(rng.randrange(4))]
+        if rng.random() < 0.5: args.append(rng.choice(self.facings))
+        separator = " " if rng.random() < 0.8 else rng.choice(self.spaces)
+        line = space() + name
+        if args and rng.random() < 0.9:
+            line += separator + (space() + "," + space()).join(args) if rng.random() < 0.2 else separator + ",".join(args)
+        return line + space()
+
+    def reference(self, simulator, lines):
+        program = Program()
+        for line in lines:
+            simulator._compileLine(program, line, True)
+        return program
+
+    def assertSamePrograms(self, expected, actual):
+        assert expected.ops == actual.ops
+        assert expected.args == actual.args
+        assert [(type(e), str(e)) for e in expected.errors] == [(type(e), str(e)) for e in actual.errors]
+
+    def testMatchesReferenceParser(self):
+        rng = random.Random(11)
+        simulator = Simulator()
+        for _ in range(200):
+            lines = [self.randomLine(rng) for _ in range(30)]
+            expected = self.reference(simulator, lines)
+            self.assertSamePrograms(expected, simulator.compile(lines))
+            self.assertSamePrograms(expected, simulator.compile([line.encode('utf-8') for line in lines]))
+
+    def testTokens(self):
+        assert tokenize("PLACE 1,2,WEST") == (constants.OP_PLACE, 1, 2, 3)
+        assert tokenize(b" MOVE\t") == (constants.OP_MOVE, 1)
+        assert tokenize(b"MOVE 12") == (constants.OP_MOVE, 12)
+        assert tokenize(b"TRAVEL -1,+4") == (constants.OP_TRAVEL, -1, 4)
+        assert tokenize("RIGHT") == (constants.OP_TURN, 1)
+        # lines left to the reference parser
+        assert tokenize("LEFT now") is None
+        assert tokenize("MOVE  2") is None
+        assert tokenize(b"PLACE 1,2,NORTHEAST") is None
+
+if __name__ == '__main__':
+    unittest.main()
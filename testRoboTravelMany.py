@@ -0,0 +1,112 @@
+import unittest
+import io
+import random
+from nose.tools import raises
+from simulator import Simulator
+from commands import IllegalCoordinateError, NoPathToDestination
+from sinks import SINKS
+import constants
+
+class TestRobotTravelMany(unittest.TestCase):
+    size = 20
+
+    def randomSimulator(self, seed, search=constants.SEARCH_BFS, stats=None):
+        rng = random.Random(seed)
+        cells = bytearray(rng.random() < 0.25 for _ in range(self.size * self.size))
+        cells[0] = 0
+        simulator = Simulator(self.size, self.size, [], cells, path_cache_size=0, search=search, stats=stats)
+        simulator.simulate("PLACE 0,0,NORTH")
+        return simulator
+
+    def testPathsMatchSingleSearches(self):
+        rng = random.Random(3)
+        for seed in range(10):
+            simulator = self.randomSimulator(seed)
+            dests = [(rng.randrange(self.size), rng.randrange(self.size)) for _ in range(6)]
+            paths = simulator.command.travelMany(dests, (0, 0))
+            for dest, path in zip(dests, paths):
+                if simulator.command.sameRegion((0, 0), dest):
+                    assert path == simulator.command.transit((0, 0), dest)
+                else:
+                    assert path is None
+
+    def testOneSearchForAllPaths(self):
+        simulator = self.randomSimulator(1)
+        command = simulator.command
+        dests = [pos for pos in [(19, 19), (10, 10), (5, 15), (15, 5)] if command.sameRegion((0, 0), pos)]
+        command.travelMany(dests, (0, 0))
+        together = command.expanded
+        for dest in dests:
+            command.transit((0, 0), dest)
+        assert together < command.expanded - together
+
+    def testPathLengthsWithOtherSearch(self):
+        for seed in range(5):
+            simulator = self.randomSimulator(seed, constants.SEARCH_JPS)
+            dests = [(19, 19), (7, 3), (12, 0)]
+            for dest, path in zip(dests, simulator.command.travelMany(dests, (0, 0))):
+                if path is not None:
+                    assert len(path) == len(simulator.command.transit((0, 0), dest))
+
+    def testNearest(self):
+        simulator = Simulator(10, 10, [(1, 0), (1, 1), (1, 2)])
+        simulator.simulate("PLACE 0,0,NORTH")
+        assert simulator.simulate("NEAREST 2,0 0,5 9,9") == (constants.TRAVELCOMMAND,
+                                                             [(0, 0), (0, 1), (0, 2), (0, 3), (0, 4), (0, 5)])
+        assert simulator.simulate("NEAREST 1,1 9,9") == simulator.simulate("TRAVEL 9,9")
+
+    @raises(NoPathToDestination)
+    def testNearestNoPath(self):
+        simulator = Simulator()
+        simulator.simulate("PLACE 0,0,NORTH")
+        simulator.simulate("NEAREST 3,4 1,1")
+
+    @raises(IllegalCoordinateError)
+    def testTravelOffTable(self):
+        simulator = Simulator()
+        simulator.simulate("PLACE 0,0,NORTH")
+        simulator.simulate("TRAVEL 1,0 5,0")
+
+    def testExtractTargets(self):
+        simulator = Simulator()
+        assert simulator.extractCmd("TRAVEL 1 , 0   3,4\t2 ,2") == ("TRAVEL", "1,0 3,4 2,2")
+        assert simulator.extractCmd("TRAVEL 1 2, 3") == ("TRAVEL", "12,3")
+        assert simulator.extractCmd("NEAREST 1, 0") == ("NEAREST", "1,0")
+
+    def testRunMatchesSimulate(self):
+        commands = ["PLACE 0,0,NORTH", "TRAVEL 3,4 1,0", "TRAVEL 1,0 0,0 0,1 1,0", "TRAVEL 1,0 9,9", "TRAVEL 1,0 x",
+                    "NEAREST 4,4 0,1", "NEAREST 3,4", "NEAREST 1,0 x", "NEAREST", "BLOCK 1,0", "UNBLOCK 1,0", "MOVE"]
+        rng = random.Random(5)
+        for strict in (True, False):
+            for _ in range(30):
+                lines = [rng.choice(commands) for _ in range(20)]
+                expected = []
+                simulator = Simulator(strict=strict)
+                for line in lines:
+                    try:
+                        result = simulator.simulate(line)
+                        # in result code mode rejected commands return their status code
+                        if type(result) is tuple: expected.append(result)
+                    except Exception as e:
+                        expected.append((type(e), str(e)))
+                other = Simulator(strict=strict)
+                actual = [(type(r), str(r)) if isinstance(r, Exception) else r for r in other.run(other.compile(lines))]
+                assert actual == expected
+                assert other.rejections() == simulator.rejections()
+
+    def testSinks(self):
+        paths = [((1, 0), [(0, 0), (1, 0)]), ((3, 4), None)]
+        output = io.StringIO()
+        sink = SINKS["text"](output)
+        sink.write((constants.PATHSRESULT, paths))
+        sink.close()
+        assert output.getvalue() == "path to (1, 0): [(0, 0), (1, 0)]\npath to (3, 4): None\n"
+        output = io.StringIO()
+        sink = SINKS["jsonl"](output)
+        sink.write((constants.PATHSRESULT, paths))
+        sink.close()
+        assert output.getvalue() == ('{"paths": [{"x": 1, "y": 0, "path": [[0, 0], [1, 0]]}, '
+                                     '{"x": 3, "y": 4, "path": null}]}\n')
+
+if __name__ == '__main__':
+    unittest.main()
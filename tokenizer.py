@@ -0,0 +1,72 @@
+# tokenizer.py
+# ------------------------------
+# Author: Ankita Dhar <githubid: ankitadhar>
+#
+# Single pass tokenizer of command lines. A well formed line (the command in capitals, one space
+# before its arguments, spaces or tabs around it, at most 18 digits per number) is turned into its
+# opcode and integer operands with one match of one pattern, straight from bytes or from a string.
+# Every other line is left to the reference parser (Simulator.extractCmd and the patterns of
+# Commands), so the tokenizer accepts and rejects exactly the lines the reference parser does.
+
+from re import compile, X
+import constants
+
+_SOURCE = r"""
+    [ \t]*
+    (?:
+        (?P<place>PLACE\ ([-+]?[0-9]{1,18}),([-+]?[0-9]{1,18}),(NORTH|EAST|SOUTH|WEST)) # PLACE x,y,facing
+      | (?P<move>MOVE(?:\ ([0-9]{1,18}))?)                                               # MOVE [steps]
+      | (?P<cell>(TRAVEL|BLOCK|UNBLOCK)\ ([-+]?[0-9]{1,18}),([-+]?[0-9]{1,18}))          # TRAVEL x,y
+      | (?P<bare>LEFT|RIGHT|REPORT|STATS)                                                # no arguments
+    )
+    [ \t]*
+    """
+
+# the same pattern for lines given as strings and as bytes
+PATTERN_LINE = compile(_SOURCE, X)
+PATTERN_LINE_BYTES = compile(_SOURCE.encode('ascii'), X)
+
+def _keys(mapping):
+    """
+    returns the mapping with every key given both as a string and as bytes
+    """
+    both = dict(mapping)
+    both.update((key.encode('ascii'), value) for key, value in mapping.items())
+    return both
+
+_directions = _keys({dir: index for index, dir in enumerate(constants.DIRECTIONS)})
+_cellOpcodes = _keys({constants.TRAVELCOMMAND: constants.OP_TRAVEL, constants.BLOCKCOMMAND: constants.OP_BLOCK,
+                      constants.UNBLOCKCOMMAND: constants.OP_UNBLOCK})
+# tokens of the bare commands, turns are given as (OP_TURN, quarter turns to the right)
+_bareTokens = _keys({constants.LEFTCOMMAND: (constants.OP_TURN, -1), constants.RIGHTCOMMAND: (constants.OP_TURN, 1),
+                     constants.REPORTCOMMAND: (constants.OP_REPORT,), constants.STATSCOMMAND: (constants.OP_STATS,)})
+# tokens of the lines made of a bare command alone (the most common lines), looked up before any matching
+LINE_TOKENS = dict(_bareTokens)
+LINE_TOKENS.update(_keys({constants.MOVECOMMAND: (constants.OP_MOVE, 1)}))
+# the tokens are their own entries, so that the same tokens decoded from a binary log are found as well
+LINE_TOKENS.update((token, token) for token in list(LINE_TOKENS.values()))
+
+def tokenize(line):
+    """
+    given a command line (a string or bytes, without the line ending), returns its opcode and operands
+    as a tuple (op, a, b, c) for PLACE, (op, a, b) for TRAVEL, BLOCK and UNBLOCK, (OP_MOVE, steps),
+    (OP_TURN, quarters), (OP_REPORT,) or (OP_STATS,), or None if the line has to go through the
+    reference parser. A tuple is taken as a line that is already tokenized (e.g. a record of a binary
+    log, see binlog.py) and returned as it is.
+    """
+    if type(line) is tuple: return line
+    token = LINE_TOKENS.get(line)
+    if token is not None: return token
+    match = (PATTERN_LINE_BYTES if type(line) is not str else PATTERN_LINE).fullmatch(line)
+    if match is None: return None
+    kind = match.lastgroup
+    if kind == 'move':
+        steps = match.group(6)
+        return (constants.OP_MOVE, int(steps) if steps is not None else 1)
+    if kind == 'bare':
+        return _bareTokens[match.group(11)]
+    if kind == 'place':
+        x, y, dir = match.group(2, 3, 4)
+        return (constants.OP_PLACE, int(x), int(y), _directions[dir])
+    cmd, x, y = match.group(8, 9, 10)
+    return (_cellOpcodes[cmd], int(x), int(y))